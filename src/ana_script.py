@@ -4,28 +4,58 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
 import os
 from dotenv import load_dotenv
 import asyncio
 import json
 from scipy import stats
 import re
+from happygpt.aggregates import (correlation_matrix, country_averages, regional_averages, regional_trends,
+                                  top_countries, yearly_trend)
+from happygpt.anomalies import THRESHOLD as ANOMALY_THRESHOLD
+from happygpt.anomalies import anomaly_scores
+from happygpt.benchmarks import DIMENSION_LABELS as BENCHMARK_DIMENSION_LABELS
+from happygpt.benchmarks import METRIC_LABELS as BENCHMARK_METRIC_LABELS
+from happygpt.benchmarks import benchmarks, oriented_z
+from happygpt.breaks import get_store as get_break_store_instance
+from happygpt.cache import frame_fingerprint
+from happygpt.charts import METRIC_MAPPING, is_chart_command, parse_dynamic_chart_command
+from happygpt.clustering import get_store as get_cluster_store_instance
+from happygpt.dataset import get_dataset, get_manager
+from happygpt.forecasting import METRICS as FORECAST_METRICS
+from happygpt.forecasting import get_store as get_forecast_store_instance
+from happygpt.regression import MAX_LAG as REGRESSION_MAX_LAG
+from happygpt.regression import fixed_effects
+from happygpt.reports import ReportStore
+from happygpt.rankings import rank_answer, rank_index
+from happygpt.resampling import factor_interval
+from happygpt.scenarios import simulate as simulate_scenarios
+from happygpt.similarity import FACTOR_LABELS as PROFILE_LABELS
+from happygpt.similarity import build_index as build_similarity_index
+from happygpt.similarity import similar_countries, standardized_profiles
 # Load environment variables
 load_dotenv()
 
+# Oturum kopyaları yazılana kadar paylaşılan veri setiyle belleği paylaşır; yerinde yazım onu değiştiremez
+pd.set_option("mode.copy_on_write", True)
+
 # Configure Google API
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
 
 
 
-@st.cache_data(ttl=3)  # 1 saat önbellek
+@st.cache_resource
+def watch_dataset():
+    """Veri dosyasını süreç boyunca izle; yeni sürüm hazır olunca sonraki yeniden çalıştırmalar onu görür."""
+    return get_manager().start_watching()
+
+
 def load_data():
-    """Veri setini yükle ve önbellekle"""
+    """Süreçte paylaşılan, ön işlenmiş veri setini döndür (oturum başına kopya yok)"""
     try:
-        df = pd.read_csv('src/cleaned_dataset.csv')
-        return df
+        watch_dataset()
+        return get_dataset().frame
     except Exception as e:
         st.error(f"Veri yüklenirken hata oluştu: {str(e)}")
         return None
@@ -34,219 +64,87 @@ def load_data():
 
 
 
-@st.cache_data(ttl=3600)  # 1 saat önbellek
-def preprocess_data(df):
-    """Veri setini ön işle ve önbellekle"""
-    try:
-        # Ülke isimlerini standartlaştır
-        country_mapping = {
-                    'Turkey': 'Turkiye',
-                    'Türkiye': 'Turkiye',
-                    'Afganistan': 'Afghanistan',
-                    'Arnavutluk': 'Albania',
-                    'Cezayir': 'Algeria',
-                    'Angola': 'Angola',
-                    'Arjantin': 'Argentina',
-                    'Ermenistan': 'Armenia',
-                    'Avustralya': 'Australia',
-                    'Avusturya': 'Austria',
-                    'Azerbaycan': 'Azerbaijan',
-                    'Bahreyn': 'Bahrain',
-                    'Bangladeş': 'Bangladesh',
-                    'Belarus': 'Belarus',
-                    'Belçika': 'Belgium',
-                    'Beliz': 'Belize',
-                    'Benin': 'Benin',
-                    'Bolivya': 'Bolivia',
-                    'Bosna Hersek': 'Bosnia and Herzegovina',
-                    'Botsvana': 'Botswana',
-                    'Brezilya': 'Brazil',
-                    'Brazilya': 'Brazil',
-                    'Bulgaristan': 'Bulgaria',
-                    'Burkina Faso': 'Burkina Faso',
-                    'Burundi': 'Burundi',
-                    'Kamboçya': 'Cambodia',
-                    'Kanada': 'Canada',
-                    'Orta Afrika Cumhuriyeti': 'Central African Republic',
-                    'Çad': 'Chad',
-                    'Şili': 'Chile',
-                    'Çin': 'China',
-                    'Kolombiya': 'Colombia',
-                    'Komorlar': 'Comoros',
-                    'Kosta Rika': 'Costa Rica',
-                    'Hırvatistan': 'Croatia',
-                    'Küba': 'Cuba',
-                    'Kıbrıs': 'Cyprus',
-                    'Çekya': 'Czechia',
-                    'Danimarka': 'Denmark',
-                    'Cibuti': 'Djibouti',
-                    'Dominik Cumhuriyeti': 'Dominican Republic',
-                    'Ekvador': 'Ecuador',
-                    'El Salvador': 'El Salvador',
-                    'Estonya': 'Estonia',
-                    'Esvatini': 'Eswatini',
-                    'Etiyopya': 'Ethiopia',
-                    'Finlandiya': 'Finland',
-                    'Fransa': 'France',
-                    'Gabon': 'Gabon',
-                    'Gürcistan': 'Georgia',
-                    'Almanya': 'Germany',
-                    'Gana': 'Ghana',
-                    'Yunanistan': 'Greece',
-                    'Guatemala': 'Guatemala',
-                    'Gine': 'Guinea',
-                    'Guyana': 'Guyana',
-                    'Haiti': 'Haiti',
-                    'Honduras': 'Honduras',
-                    'Macaristan': 'Hungary',
-                    'İzlanda': 'Iceland',
-                    'Hindistan': 'India',
-                    'Endonezya': 'Indonesia',
-                    'Irak': 'Iraq',
-                    'İrlanda': 'Ireland',
-                    'İsrail': 'Israel',
-                    'İtalya': 'Italy',
-                    'Jamaika': 'Jamaica',
-                    'Japonya': 'Japan',
-                    'Ürdün': 'Jordan',
-                    'Kazakistan': 'Kazakhstan',
-                    'Kenya': 'Kenya',
-                    'Kosova': 'Kosovo',
-                    'Kuveyt': 'Kuwait',
-                    'Letonya': 'Latvia',
-                    'Lübnan': 'Lebanon',
-                    'Lesotho': 'Lesotho',
-                    'Liberya': 'Liberia',
-                    'Libya': 'Libya',
-                    'Litvanya': 'Lithuania',
-                    'Lüksemburg': 'Luxembourg',
-                    'Madagaskar': 'Madagascar',
-                    'Malavi': 'Malawi',
-                    'Malezya': 'Malaysia',
-                    'Maldivler': 'Maldives',
-                    'Mali': 'Mali',
-                    'Malta': 'Malta',
-                    'Moritanya': 'Mauritania',
-                    'Meksika': 'Mexico',
-                    'Moğolistan': 'Mongolia',
-                    'Karadağ': 'Montenegro',
-                    'Fas': 'Morocco',
-                    'Mozambik': 'Mozambique',
-                    'Myanmar': 'Myanmar',
-                    'Namibya': 'Namibia',
-                    'Hollanda': 'Netherlands',
-                    'Yeni Zelanda': 'New Zealand',
-                    'Nikaragua': 'Nicaragua',
-                    'Nijer': 'Niger',
-                    'Nijerya': 'Nigeria',
-                    'Kuzey Makedonya': 'North Macedonia',
-                    'Norveç': 'Norway',
-                    'Umman': 'Oman',
-                    'Pakistan': 'Pakistan',
-                    'Panama': 'Panama',
-                    'Paraguay': 'Paraguay',
-                    'Peru': 'Peru',
-                    'Filipinler': 'Philippines',
-                    'Polonya': 'Poland',
-                    'Portekiz': 'Portugal',
-                    'Katar': 'Qatar',
-                    'Romanya': 'Romania',
-                    'Ruanda': 'Rwanda',
-                    'Suudi Arabistan': 'Saudi Arabia',
-                    'Senegal': 'Senegal',
-                    'Sırbistan': 'Serbia',
-                    'Sierra Leone': 'Sierra Leone',
-                    'Singapur': 'Singapore',
-                    'Slovenya': 'Slovenia',
-                    'Somali': 'Somalia',
-                    'Güney Afrika': 'South Africa',
-                    'Güney Sudan': 'South Sudan',
-                    'İspanya': 'Spain',
-                    'Sri Lanka': 'Sri Lanka',
-                    'Sudan': 'Sudan',
-                    'Surinam': 'Suriname',
-                    'İsveç': 'Sweden',
-                    'İsviçre': 'Switzerland',
-                    'Tacikistan': 'Tajikistan',
-                    'Tanzanya': 'Tanzania',
-                    'Tayland': 'Thailand',
-                    'Togo': 'Togo',
-                    'Trinidad ve Tobago': 'Trinidad and Tobago',
-                    'Tunus': 'Tunisia',
-                    'Türkiye': 'Turkiye',
-                    'Turkey': 'Turkiye',
-                    'Türkmenistan': 'Turkmenistan',
-                    'Uganda': 'Uganda',
-                    'Ukrayna': 'Ukraine',
-                    'Birleşik Arap Emirlikleri': 'United Arab Emirates',
-                    'BAE': 'United Arab Emirates',
-                    'Birleşik Krallık': 'United Kingdom',
-                    'İngiltere': 'United Kingdom',
-                    'ABD': 'United States',
-                    'Amerika Birleşik Devletleri': 'United States',
-                    'Uruguay': 'Uruguay',
-                    'Özbekistan': 'Uzbekistan',
-                    'Zambiya': 'Zambia',
-                    'Zimbabve': 'Zimbabwe'
-        }
-        df['country_name'] = df['country_name'].replace(country_mapping)
-        
-        # Corruption değerlerini 0-1 arasına normalize et (eğer değilse)
-        if df['perceptions_of_corruption'].max() > 1:
-            df['perceptions_of_corruption'] = df['perceptions_of_corruption'] / df['perceptions_of_corruption'].max()
-        
-        # Yıl sütununu integer yap
-        df['year'] = df['year'].astype(int)
-        
-        return df
-    except Exception as e:
-        st.error(f"Veri ön işleme sırasında hata oluştu: {str(e)}")
-        return None
 
 
 
 
 
 
+@st.cache_resource
+def get_cluster_store(dataset_version, _df):
+    """Süreçte paylaşılan küme deposu; bu sürüm için sonuç yoksa arka planda hesaplanır."""
+    store = get_cluster_store_instance()
+    store.ensure(_df)
+    return store
+
+
+@st.cache_resource
+def get_break_store(dataset_version, _df):
+    """Süreçte paylaşılan kırılma deposu; bu sürüm için sonuç yoksa arka planda hesaplanır."""
+    store = get_break_store_instance()
+    store.ensure(_df)
+    return store
+
+
+@st.cache_resource
+def get_forecast_store(dataset_version, _df):
+    """Süreçte paylaşılan projeksiyon deposu; bu sürüm için sonuç yoksa arka planda hesaplanır."""
+    store = get_forecast_store_instance()
+    store.ensure(_df)
+    return store
+
+
+def add_forecast_traces(fig, df, country, metric, color='#00FFE7'):
+    """Seriye projeksiyonu (kesikli çizgi) ve %95 aralığını ekle; depo hazır değilse dokunma."""
+    projection = get_forecast_store(frame_fingerprint(df), df).forecast(country, metric, df)
+    if projection is None or projection.empty:
+        return False
+    last = df[(df['country_name'] == country) & df[metric].notna()].sort_values('year').tail(1)
+    # Projeksiyon son gözlemden başlasın diye çizgiler son gözlenen noktaya bağlanır
+    years = [*last['year'], *projection['year']]
+    fig.add_trace(go.Scatter(
+        x=years, y=[*last[metric], *projection['ci_high']],
+        mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=years, y=[*last[metric], *projection['ci_low']],
+        mode='lines', line=dict(width=0), fill='tonexty', fillcolor='rgba(0, 255, 231, 0.12)',
+        name=f'{country} %95 aralık', showlegend=False, hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(
+        x=years, y=[*last[metric], *projection['forecast']],
+        mode='lines', line=dict(color=color, width=2, dash='dash'),
+        name=f'{country} projeksiyon'
+    ))
+    return True
 
-def parse_dynamic_chart_command(command, valid_countries, metric_mapping):
-    """
-    Beklenen komut formatı: 
-      "chart_type: x=..., y=..., countries=..., [other_key=value,...]"
-    Örnek: "line: x=year, y=life_ladder, countries=ingiltere,iran"
-    """
-    command = command.strip()
-    # İlk kısmı (chart_type) ayır: örn. "line:" veya "scatter:" vb.
-    m = re.match(r'(\w+):\s*(.*)', command)
-    if not m:
-        return None
-    chart_type = m.group(1).lower()  # örn: "line", "scatter", "bar", "box" vs.
-    params_str = m.group(2)
-    params = {"chart_type": chart_type}
-    # Parametreleri virgül ile ayıralım
-    for part in params_str.split(","):
-        if "=" in part:
-            key, value = part.split("=", 1)
-            key = key.strip().lower()
-            value = value.strip().lower()
-            if key == "countries":
-                # Ülkeleri ayırıp baş harflerini büyük yapalım; geçerli ülkelere göre doğrulama yapalım
-                country_list = [c.strip().title() for c in value.split(",") if c.strip()]
-                valid = [c for c in country_list if c in valid_countries]
-                params[key] = valid
-            else:
-                # Eğer x veya y parametresi ise; metric_mapping ile eşleştirelim
-                if key in ["x", "y"]:
-                    for mk, mv in metric_mapping.items():
-                        if mk in value:
-                            params[key] = mv
-                            break
-                    else:
-                        params[key] = value
-                else:
-                    params[key] = value
-    return params
 
+def rank_hover_text(df, countries, year, metric='life_ladder'):
+    """Sıralama grafikleri için hover metni: yıl içi sıra ve bir önceki gözleme göre değişim."""
+    if year is None:
+        return ["Tüm yılların ortalaması"] * len(countries)
+    index = rank_index(df)
+    texts = []
+    for country in countries:
+        current = index.rank(country, metric, year)
+        if current is None:
+            texts.append("")
+            continue
+        text = f"Sıra: {current['rank']}/{current['total']}"
+        previous_year = index.latest_year(country, metric, before=year)
+        previous = index.rank(country, metric, previous_year) if previous_year is not None else None
+        if previous is not None:
+            text += f" ({previous_year}: {previous['rank']}, {previous['rank'] - current['rank']:+d})"
+        texts.append(text)
+    return texts
+
+
+@st.cache_resource
+def get_report_store(dataset_version, _df):
+    """Süreç başına hazır rapor deposu; eksik/eskimiş raporlar arka planda üretilir."""
+    store = ReportStore.shared()
+    store.ensure(_df)
+    return store
 
 
 
@@ -268,6 +166,7 @@ def create_dynamic_chart(params, df):
     x = params.get("x")
     y = params.get("y")
     countries = params.get("countries", None)
+    full_df = df
     # Eğer ülkeler belirtilmişse, veri kümesini filtreleyelim.
     if countries:
         df = df[df['country_name'].isin(countries)]
@@ -278,6 +177,11 @@ def create_dynamic_chart(params, df):
     elif chart_type in ["line", "trend"]:
         fig = px.line(df, x=x, y=y, color="country_name", template="plotly_dark",
                       title=f"Line Grafiği: {x} vs {y}")
+        # Yıllık ülke serilerine hazır projeksiyonlar eklenir
+        if x == "year" and countries and y in FORECAST_METRICS:
+            colors = {trace.name: trace.line.color for trace in fig.data}
+            for country in countries:
+                add_forecast_traces(fig, full_df, country, y, colors.get(country, '#00FFE7'))
     elif chart_type == "bar":
         fig = px.bar(df, x=x, y=y, color="country_name", template="plotly_dark",
                      title=f"Bar Grafiği: {x} vs {y}")
@@ -310,15 +214,7 @@ def process_llm_response(response, df):
         
         # Geçerli ülke listesi ve metrik eşleştirmesi:
         valid_countries = df['country_name'].unique().tolist()
-        metric_mapping = {
-            'mutluluk': 'life_ladder',
-            'sosyal destek': 'social_support',
-            'özgürlük': 'freedom_to_make_life_choices',
-            'gdp': 'gdp_per_capita',
-            'yaşam beklentisi': 'life_expectancy',
-            'işsizlik': 'unemployment_rate',
-            'internet': 'internet_users_percent'
-        }
+        metric_mapping = METRIC_MAPPING
         chart_type_mapping = {
             'line': 'line',
             'trend': 'line',
@@ -335,10 +231,7 @@ def process_llm_response(response, df):
                 continue
             
             # Eğer satır grafik komutuyla başlıyorsa:
-            lower_line = line.lower()
-            if lower_line.startswith("line:") or lower_line.startswith("trend:") or \
-               lower_line.startswith("bar:") or lower_line.startswith("scatter:") or \
-               lower_line.startswith("box:"):
+            if is_chart_command(line):
                 # Komut satırını parse edelim:
                 params = parse_dynamic_chart_command(line, valid_countries, metric_mapping)
                 if params is None:
@@ -772,17 +665,12 @@ def main():
     """, unsafe_allow_html=True)
 
     try:
-        # Veri yükleme ve işleme
+        # Veri yükleme (ön işleme çekirdekte, süreç başına bir kez yapılır)
         df = load_data()
         if df is None:
             st.error("Veri yüklenemedi! Lütfen 'cleaned_dataset.csv' dosyasının varlığını kontrol edin.")
             return
 
-        df = preprocess_data(df)
-        if df is None:
-            st.error("Veri işlenemedi!")
-            return
-
         # Session state başlangıcı
         if 'current_page' not in st.session_state:
             st.session_state.current_page = 'Ana-Sayfa'
@@ -917,7 +805,7 @@ def main():
                     year_text = str(selected_year)
                 else:
                     # Tüm yılların ortalamasını al
-                    map_data = df.groupby('country_name')['life_ladder'].mean().reset_index()
+                    map_data = country_averages(df, 'life_ladder')
                     year_text = "Tüm Yıllar"
 
                 # Ülke isimlerini harita için uygun formata dönüştür
@@ -934,7 +822,8 @@ def main():
                     'Eswatini': 'Swaziland'
                 }
                 
-                map_data['country_name'] = map_data['country_name'].replace(country_name_mapping)
+                # assign: 'Tümü' dalındaki önbellekli country_averages sonucu yerinde değiştirilmez
+                map_data = map_data.assign(country_name=map_data['country_name'].astype(str).replace(country_name_mapping))
 
                 # Grafik renk paleti ve tema ayarları
                 CHART_THEME = {
@@ -1143,18 +1032,13 @@ def main():
                 """, unsafe_allow_html=True)
                 
                 # Bölgesel ortalamaları hesapla
-                if selected_year != 'Tümü':
-                    regional_avg = df[df['year'] == selected_year].groupby('regional_indicator')['life_ladder'].mean().reset_index()
-                    year_text = str(selected_year)
-                else:
-                    regional_avg = df.groupby('regional_indicator')['life_ladder'].mean().reset_index()
-                    year_text = "Tüm Yıllar"
-                
-                # Ortalamalara göre sırala (en mutludan en mutsuza)
-                regional_avg = regional_avg.sort_values('life_ladder', ascending=True)
+                # (ortalamalara göre küçükten büyüğe sıralı gelir)
+                year_filter = None if selected_year == 'Tümü' else selected_year
+                regional_avg = regional_averages(df, 'life_ladder', year_filter)
+                year_text = "Tüm Yıllar" if year_filter is None else str(selected_year)
                 
                 # Bölge isimlerini kısalt (sadece görüntüleme için)
-                display_names = regional_avg['regional_indicator'].copy()
+                display_names = regional_avg['regional_indicator'].astype(str)
                 display_names = display_names.replace({
                     'Commonwealth of Independent States': 'Independent States'
                 })
@@ -1303,13 +1187,8 @@ def main():
                 """, unsafe_allow_html=True)
 
                 # En mutlu 10 ülkeyi seç
-                if selected_year != 'Tümü':
-                    top_10 = df[df['year'] == selected_year].nlargest(10, 'life_ladder')
-                else:
-                    top_10 = df.groupby('country_name')['life_ladder'].mean().nlargest(10).reset_index()
-
-                # Mutluluk skoruna göre azalan sırada sırala (en mutlu en üstte olacak)
-                top_10 = top_10.sort_values('life_ladder', ascending=False)
+                # (mutluluk skoruna göre azalan sırada gelir; en mutlu en üstte olacak)
+                top_10 = top_countries(df, 'life_ladder', 10, year_filter)
 
                 # Top 10 grafiği
                 fig_top = go.Figure()
@@ -1332,7 +1211,8 @@ def main():
                     ),
                     text=top_10['life_ladder'].round(2),
                     textposition='auto',
-                    hovertemplate='<b>%{y}</b><br>Mutluluk Skoru: %{x:.2f}<extra></extra>'
+                    customdata=rank_hover_text(df, top_10['country_name'], year_filter),
+                    hovertemplate='<b>%{y}</b><br>Mutluluk Skoru: %{x:.2f}<br>%{customdata}<extra></extra>'
                 ))
 
                 # Top 10 grafik düzeni
@@ -1395,13 +1275,8 @@ def main():
                 """, unsafe_allow_html=True)
 
                 # En mutsuz 10 ülkeyi seç
-                if selected_year != 'Tümü':
-                    bottom_10 = df[df['year'] == selected_year].nsmallest(10, 'life_ladder')
-                else:
-                    bottom_10 = df.groupby('country_name')['life_ladder'].mean().nsmallest(10).reset_index()
-
-                # Mutluluk skoruna göre artan sırada sırala (en mutsuz en üstte olacak)
-                bottom_10 = bottom_10.sort_values('life_ladder', ascending=True)
+                # (mutluluk skoruna göre artan sırada gelir; en mutsuz en üstte olacak)
+                bottom_10 = top_countries(df, 'life_ladder', 10, year_filter, ascending=True)
 
                 # Bottom 10 grafiği
                 fig_bottom = go.Figure()
@@ -1424,7 +1299,8 @@ def main():
                     ),
                     text=bottom_10['life_ladder'].round(2),
                     textposition='auto',
-                    hovertemplate='<b>%{y}</b><br>Mutluluk Skoru: %{x:.2f}<extra></extra>'
+                    customdata=rank_hover_text(df, bottom_10['country_name'], year_filter),
+                    hovertemplate='<b>%{y}</b><br>Mutluluk Skoru: %{x:.2f}<br>%{customdata}<extra></extra>'
                 ))
 
                 # Bottom 10 grafik düzeni
@@ -1490,7 +1366,7 @@ def main():
                 """, unsafe_allow_html=True)
                 
                 # Yıllara göre global ortalama
-                global_trend = df.groupby('year')['life_ladder'].agg(['mean', 'std']).reset_index()
+                global_trend = yearly_trend(df, 'life_ladder')
                 
                 fig_global = go.Figure()
                 
@@ -1677,7 +1553,7 @@ def main():
                 """, unsafe_allow_html=True)
                 
                 # Bölgelere göre yıllık ortalamalar
-                regional_trend = df.groupby(['year', 'regional_indicator'])['life_ladder'].mean().reset_index()
+                regional_trend = regional_trends(df, 'life_ladder')
                 
                 fig_regional = go.Figure()
                 
@@ -1719,6 +1595,113 @@ def main():
                 )
                 
                 st.plotly_chart(fig_regional, use_container_width=True)
+
+                # Yapısal kırılmalar (toplu işte önceden hesaplanır; istek anında tarama yapılmaz)
+                st.markdown("""
+                    <div class="chart-container">
+                        <h3 style="
+                            text-align: center;
+                            font-size: 28px;
+                            font-weight: 600;
+                            color: #00c6ff;
+                            margin-top: 2rem;
+                            font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                            letter-spacing: -0.5px;
+                            padding: 0;
+                        ">📍 Yapısal Kırılmalar</h3>
+                        <p style="
+                            text-align: center;
+                            color: rgba(255, 255, 255, 0.9);
+                            font-size: 16px;
+                            margin-top: 0.5rem;
+                            max-width: 600px;
+                            margin-left: auto;
+                            margin-right: auto;
+                        ">Ülke serilerinde düzeyin ya da eğimin kalıcı olarak değiştiği yıllar, anomaliler ve projeksiyonlar</p>
+                    </div>
+                """, unsafe_allow_html=True)
+
+                break_store = get_break_store(frame_fingerprint(df), df)
+                if not break_store.ready(df):
+                    st.info("Yapısal kırılmalar arka planda hesaplanıyor; sayfa yenilendiğinde hazır olacak.")
+                else:
+                    break_col1, break_col2 = st.columns(2)
+                    with break_col1:
+                        break_countries = sorted(df['country_name'].astype(str).unique())
+                        break_country = st.selectbox(
+                            'Ülke', break_countries,
+                            index=break_countries.index('Turkiye') if 'Turkiye' in break_countries else 0,
+                            key='break_country'
+                        )
+                    with break_col2:
+                        break_metric_label = st.selectbox('Metrik', list(METRIC_MAPPING), key='break_metric')
+                    break_metric = METRIC_MAPPING[break_metric_label]
+
+                    series = df[df['country_name'] == break_country].sort_values('year')
+                    fig_breaks = go.Figure(go.Scatter(
+                        x=series['year'],
+                        y=series[break_metric],
+                        mode='lines+markers',
+                        name=break_country,
+                        line=dict(color='#00FFE7', width=3),
+                        marker=dict(size=8, color='#007AFF')
+                    ))
+                    # Robust z-skoru eşiği aşan yıllar kırmızı işaretlenir
+                    anomaly_series = anomaly_scores(df).series(break_country, break_metric)
+                    anomalous = anomaly_series[anomaly_series['anomaly']]
+                    if not anomalous.empty:
+                        fig_breaks.add_trace(go.Scatter(
+                            x=anomalous['year'],
+                            y=anomalous['value'],
+                            mode='markers',
+                            name='Anomali',
+                            marker=dict(size=14, color='#FF3B30', symbol='circle-open', line=dict(width=3)),
+                            customdata=anomalous[['z_year', 'z_country']].fillna(0).to_numpy(),
+                            hovertemplate="%{x}: %{y:.3g}<br>Yıl içi z: %{customdata[0]:.1f}"
+                                          "<br>Ülke içi z: %{customdata[1]:.1f}<extra>Anomali</extra>"
+                        ))
+                    has_projection = add_forecast_traces(fig_breaks, df, break_country, break_metric)
+                    country_breaks = break_store.breaks(break_country, break_metric, df)
+                    for row in country_breaks.itertuples():
+                        fig_breaks.add_vline(
+                            x=row.year - 0.5, line_dash='dash', line_color='#AA00FF',
+                            annotation_text=f"{row.year}: {row.change:+.3g}", annotation_font_color='#FFFFFF'
+                        )
+                    fig_breaks.update_layout(
+                        **CHART_THEME,
+                        height=400,
+                        yaxis_title=break_metric_label.title(),
+                        showlegend=False
+                    )
+                    fig_breaks.update_layout(title_text=f"{break_country}: {break_metric_label.title()} ve Kırılma Noktaları")
+                    st.plotly_chart(fig_breaks, use_container_width=True)
+                    if country_breaks.empty:
+                        st.caption("Bu seride yapısal kırılma tespit edilmedi.")
+                    if has_projection:
+                        st.caption("Kesikli çizgi: son gözlemden sonraki yıllar için projeksiyon ve %95 aralığı "
+                                   "(mutlulukta faktörlü AR, diğer metriklerde sönümlü trend).")
+                    if not anomalous.empty:
+                        st.caption(f"Kırmızı halkalar: aynı yıldaki ülkelere ya da ülkenin kendi geçmişine göre "
+                                   f"robust z-skoru {ANOMALY_THRESHOLD} üzerindeki yıllar.")
+
+                    with st.expander("Mutlulukta en büyük kırılmalar"):
+                        st.dataframe(
+                            break_store.largest(df=df)[['country_name', 'year', 'before', 'after', 'change']].rename(columns={
+                                'country_name': 'Ülke', 'year': 'Yıl', 'before': 'Önce', 'after': 'Sonra', 'change': 'Değişim'
+                            }).round(3),
+                            hide_index=True, use_container_width=True
+                        )
+                    with st.expander("Eşik etkileri (faktör - mutluluk ilişkisinin değiştiği değerler)"):
+                        thresholds = break_store.threshold_table(df)
+                        st.dataframe(
+                            thresholds.assign(factor=thresholds['factor'].map(lambda f: PROFILE_LABELS.get(f, f)))[
+                                ['factor', 'threshold', 'slope_below', 'slope_above', 'f_stat', 'p_value']
+                            ].rename(columns={
+                                'factor': 'Faktör', 'threshold': 'Eşik', 'slope_below': 'Eğim (altında)',
+                                'slope_above': 'Eğim (üstünde)', 'f_stat': 'F', 'p_value': 'p (bootstrap)'
+                            }),
+                            hide_index=True, use_container_width=True
+                        )
                 
                 st.markdown('</div>', unsafe_allow_html=True)
             
@@ -1766,7 +1749,7 @@ def main():
                 }
                 
                 # Korelasyon matrisi
-                corr_matrix = df[factors].corr()
+                corr_matrix = correlation_matrix(df, factors)
                 
                 # Heatmap
                 fig_corr = go.Figure(data=go.Heatmap(
@@ -1858,8 +1841,9 @@ def main():
                         text=df['country_name']
                     ))
                     
-                    # Trend çizgisi
+                    # Trend çizgisi (aralıklar ülke kümeli bootstrap ile)
                     slope, intercept, r_value, p_value, std_err = stats.linregress(df[factor], df['life_ladder'])
+                    factor_corr, factor_slope = factor_interval(df, factor)
                     line_x = np.array([df[factor].min(), df[factor].max()])
                     line_y = slope * line_x + intercept
                     
@@ -1870,7 +1854,8 @@ def main():
                             mode='lines',
                             name='Trend',
                             line=dict(color='#AA00FF', width=2, dash='dash'),
-                            hovertemplate=f'R² = {r_value**2:.3f}<extra></extra>'
+                            hovertemplate=f'R² = {r_value**2:.3f}<br>Eğim = {slope:.4g} '
+                                          f'[{factor_slope.ci_low:.4g}, {factor_slope.ci_high:.4g}]<extra></extra>'
                         )
                     )
                     
@@ -1898,8 +1883,9 @@ def main():
 
                     st.plotly_chart(fig_scatter, use_container_width=True)
                     
-                    # Korelasyon metriği
+                    # Korelasyon metriği ve %95 bootstrap aralığı
                     correlation = df['life_ladder'].corr(df[factor])
+                    p_text = f"{factor_corr.p_value:.3f}" if factor_corr.p_value >= 0.001 else "< 0.001"
                     st.markdown(f"""
                         <div style="
                             background: rgba(18, 18, 18, 0.8);
@@ -1925,6 +1911,7 @@ def main():
                                     -webkit-background-clip: text;
                                     -webkit-text-fill-color: transparent;
                                 ">{correlation:.3f}</span>
+                                <span style="color: rgba(255, 255, 255, 0.5); font-size: 0.9rem;">[{factor_corr.ci_low:.3f}, {factor_corr.ci_high:.3f}]</span>
                             </div>
                             <div style="
                                 display: flex;
@@ -1940,9 +1927,406 @@ def main():
                                     -webkit-text-fill-color: transparent;
                                 ">{r_value**2:.3f}</span>
                             </div>
+                            <div style="
+                                display: flex;
+                                align-items: center;
+                                gap: 0.5rem;
+                            ">
+                                <span style="color: rgba(255, 255, 255, 0.7);">p (bootstrap):</span>
+                                <span style="
+                                    font-size: 1.2rem;
+                                    font-weight: 600;
+                                    background: linear-gradient(135deg, #00FFE7 0%, #007AFF 50%, #AA00FF 100%);
+                                    -webkit-background-clip: text;
+                                    -webkit-text-fill-color: transparent;
+                                ">{p_text}</span>
+                            </div>
                         </div>
                     """, unsafe_allow_html=True)
                 
+                # Benzer ülkeler (standartlaştırılmış faktör profillerine göre k-NN)
+                st.markdown("""
+                    <div class="chart-container">
+                        <h3 style="
+                            text-align: center;
+                            font-size: 28px;
+                            font-weight: 600;
+                            color: #00c6ff;
+                            margin-top: 2rem;
+                            font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                            letter-spacing: -0.5px;
+                            padding: 0;
+                        ">🧭 Benzer Ülkeler</h3>
+                        <p style="
+                            text-align: center;
+                            color: rgba(255, 255, 255, 0.9);
+                            font-size: 16px;
+                            margin-top: 0.5rem;
+                            max-width: 600px;
+                            margin-left: auto;
+                            margin-right: auto;
+                        ">Sosyal destek, özgürlük, cömertlik, yolsuzluk algısı, GDP, yaşam beklentisi ve internet kullanımı profiline göre en yakın ülkeler</p>
+                    </div>
+                """, unsafe_allow_html=True)
+
+                similarity_index = build_similarity_index(df, year_filter)
+                similar_options = sorted(similarity_index.countries)
+                if similar_options:
+                    sim_col1, sim_col2 = st.columns([3, 1])
+                    with sim_col1:
+                        similar_to = st.selectbox(
+                            'Ülke Seçin', similar_options,
+                            index=similar_options.index('Turkiye') if 'Turkiye' in similar_options else 0,
+                            key='similar_country'
+                        )
+                    with sim_col2:
+                        similar_k = st.slider('Komşu Sayısı', 3, 10, 5, key='similar_k')
+
+                    neighbours = similar_countries(df, similar_to, similar_k, year_filter)
+
+                    fig_similar = go.Figure(go.Bar(
+                        y=neighbours['country_name'],
+                        x=neighbours['similarity'],
+                        orientation='h',
+                        marker=dict(color=neighbours['similarity'], colorscale=MAP_COLOR_SCALE, showscale=False),
+                        text=neighbours['distance'].round(2),
+                        textposition='auto',
+                        hovertemplate='<b>%{y}</b><br>Benzerlik: %{x:.2f}<br>Uzaklık: %{text}<extra></extra>'
+                    ))
+                    fig_similar.update_layout(
+                        **CHART_THEME,
+                        height=350,
+                        xaxis_title="Benzerlik (1 / (1 + uzaklık))",
+                        showlegend=False
+                    )
+                    fig_similar.update_yaxes(autorange='reversed')  # En benzer ülke en üstte
+                    fig_similar.update_layout(title_text=f"{similar_to} ile En Benzer Ülkeler ({year_text})")
+                    st.plotly_chart(fig_similar, use_container_width=True)
+                else:
+                    st.info("Seçilen yıl için tüm faktörleri eksiksiz ülke bulunamadı.")
+
+                # Akran grubu karşılaştırması (farklar veri sürümü başına bir kez hesaplanır)
+                st.markdown("""
+                    <div class="chart-container">
+                        <h3 style="
+                            text-align: center;
+                            font-size: 28px;
+                            font-weight: 600;
+                            color: #00c6ff;
+                            margin-top: 2rem;
+                            font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                            letter-spacing: -0.5px;
+                            padding: 0;
+                        ">🏁 Akran Grubu Karşılaştırması</h3>
+                        <p style="
+                            text-align: center;
+                            color: rgba(255, 255, 255, 0.9);
+                            font-size: 16px;
+                            margin-top: 0.5rem;
+                            max-width: 600px;
+                            margin-left: auto;
+                            margin-right: auto;
+                        ">Seçilen ülkenin bölge, kıta, gelir düzeyi ve G20/OECD/BRICS akranlarının ortalamasına, medyanına ve liderine göre konumu</p>
+                    </div>
+                """, unsafe_allow_html=True)
+
+                peer_index = benchmarks(df)
+                peer_options = sorted(df['country_name'].astype(str).unique())
+                peer_col1, peer_col2 = st.columns(2)
+                with peer_col1:
+                    peer_country = st.selectbox(
+                        'Ülke Seçin', peer_options,
+                        index=peer_options.index('Turkiye') if 'Turkiye' in peer_options else 0,
+                        key='peer_country'
+                    )
+                peer_table = peer_index.benchmark(peer_country, year_filter)
+                peer_dimensions = peer_table['dimension'].unique().tolist()
+                if peer_dimensions:
+                    peer_choices = {
+                        f"{BENCHMARK_DIMENSION_LABELS[dim]}: {peer_table.loc[peer_table['dimension'] == dim, 'group'].iloc[0]}": dim
+                        for dim in peer_dimensions
+                    }
+                    with peer_col2:
+                        peer_choice = st.selectbox('Akran Grubu', list(peer_choices), key='peer_dimension')
+                    peer_dimension = peer_choices[peer_choice]
+                    peer_rows = peer_table[peer_table['dimension'] == peer_dimension]
+                    peer_rows = peer_rows.assign(score=oriented_z(peer_rows)).dropna(subset=['score'])
+                    peer_labels = [BENCHMARK_METRIC_LABELS.get(m, m) for m in peer_rows['metric']]
+                    peer_group = peer_rows['group'].iloc[0] if len(peer_rows) else ''
+
+                    fig_peer = go.Figure(go.Bar(
+                        y=peer_labels,
+                        x=peer_rows['score'],
+                        orientation='h',
+                        marker=dict(color=np.where(peer_rows['score'] >= 0, '#00c6ff', '#ff6b6b')),
+                        customdata=np.stack([peer_rows['value'], peer_rows['mean'], peer_rows['leader'],
+                                             peer_rows['leader_value']], axis=-1) if len(peer_rows) else None,
+                        hovertemplate='<b>%{y}</b><br>Değer: %{customdata[0]:.3g}<br>Grup ortalaması: %{customdata[1]:.3g}'
+                                      '<br>Lider: %{customdata[2]} (%{customdata[3]:.3g})<extra></extra>'
+                    ))
+                    fig_peer.update_layout(
+                        **CHART_THEME,
+                        height=450,
+                        xaxis_title="Grup ortalamasına uzaklık (std, pozitif: daha iyi)",
+                        showlegend=False
+                    )
+                    fig_peer.update_yaxes(autorange='reversed')
+                    fig_peer.update_layout(title_text=f"{peer_country} - {peer_group} Akranları ({year_text})")
+                    st.plotly_chart(fig_peer, use_container_width=True)
+
+                    with st.expander("Akran grubu tablosu"):
+                        st.dataframe(
+                            peer_rows.assign(metric=peer_labels)[
+                                ['metric', 'value', 'mean', 'median', 'leader', 'leader_value', 'gap_mean', 'gap_leader', 'n']
+                            ].rename(columns={
+                                'metric': 'Metrik', 'value': 'Değer', 'mean': 'Ortalama', 'median': 'Medyan',
+                                'leader': 'Lider', 'leader_value': 'Lider Değeri', 'gap_mean': 'Ortalamaya Fark',
+                                'gap_leader': 'Lidere Fark', 'n': 'Ülke Sayısı'
+                            }).round(3),
+                            hide_index=True, use_container_width=True
+                        )
+                else:
+                    st.info("Seçilen ülke için bu yılda veri bulunamadı.")
+
+                # Ülke tipolojisi (önceden hesaplanan kümeler; istek anında kümeleme yapılmaz)
+                st.markdown("""
+                    <div class="chart-container">
+                        <h3 style="
+                            text-align: center;
+                            font-size: 28px;
+                            font-weight: 600;
+                            color: #00c6ff;
+                            margin-top: 2rem;
+                            font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                            letter-spacing: -0.5px;
+                            padding: 0;
+                        ">🧩 Ülke Tipolojisi</h3>
+                        <p style="
+                            text-align: center;
+                            color: rgba(255, 255, 255, 0.9);
+                            font-size: 16px;
+                            margin-top: 0.5rem;
+                            max-width: 600px;
+                            margin-left: auto;
+                            margin-right: auto;
+                        ">Standartlaştırılmış faktör profillerine göre ülke kümeleri ve küme merkezlerinin karşılaştırması</p>
+                    </div>
+                """, unsafe_allow_html=True)
+
+                cluster_store = get_cluster_store(frame_fingerprint(df), df)
+                cluster_col1, cluster_col2 = st.columns(2)
+                with cluster_col1:
+                    cluster_methods = {'K-Means': 'kmeans', 'Hiyerarşik (Ward)': 'hierarchical'}
+                    cluster_method = cluster_methods[st.selectbox('Yöntem', list(cluster_methods), key='cluster_method')]
+                k_options = cluster_store.available_k(year_filter, cluster_method)
+                best_cluster = cluster_store.get(year_filter, None, cluster_method, df)
+                with cluster_col2:
+                    cluster_k = st.selectbox(
+                        'Küme Sayısı', k_options or [None],
+                        index=k_options.index(best_cluster['k']) if best_cluster and best_cluster['k'] in k_options else 0,
+                        key='cluster_k'
+                    )
+                clusters = cluster_store.get(year_filter, cluster_k, cluster_method, df) if k_options else None
+
+                if clusters is None:
+                    st.info("Ülke kümeleri arka planda hesaplanıyor; sayfa yenilendiğinde hazır olacak.")
+                else:
+                    axis_labels = [PROFILE_LABELS.get(f, f) for f in clusters['factors']]
+
+                    # Küme merkezleri radar grafiği (standart sapma birimi)
+                    fig_radar = go.Figure()
+                    for label, centroid in enumerate(clusters['centroids']):
+                        fig_radar.add_trace(go.Scatterpolar(
+                            r=centroid + centroid[:1],
+                            theta=axis_labels + axis_labels[:1],
+                            name=f"Küme {label} ({clusters['sizes'][label]} ülke)",
+                            fill='toself',
+                            opacity=0.5
+                        ))
+                    fig_radar.update_layout(
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        font={'color': '#FFFFFF'},
+                        polar=dict(bgcolor='rgba(0,0,0,0)', radialaxis=dict(gridcolor='rgba(255,255,255,0.2)')),
+                        title_text=f"Küme Merkezleri ({year_text})",
+                        height=500
+                    )
+                    st.plotly_chart(fig_radar, use_container_width=True)
+
+                    # Paralel koordinatlar: her çizgi bir ülke, renk küme
+                    _, profile_matrix, profile_factors, _ = standardized_profiles(df, year_filter)
+                    profile_frame = pd.DataFrame(profile_matrix, columns=[PROFILE_LABELS.get(f, f) for f in profile_factors])
+                    profile_frame['Küme'] = clusters['labels']
+                    # Kademeli renk ölçeği: her küme kimliği radar grafiğindeki rengine düşer (ara renk yok)
+                    n_clusters = len(clusters['sizes'])
+                    palette = px.colors.qualitative.Plotly
+                    cluster_scale = [(step / n_clusters, palette[label % len(palette)])
+                                     for label in range(n_clusters) for step in (label, label + 1)]
+                    fig_parallel = px.parallel_coordinates(
+                        profile_frame,
+                        color='Küme',
+                        dimensions=axis_labels,
+                        color_continuous_scale=cluster_scale,
+                        range_color=[-0.5, n_clusters - 0.5]
+                    )
+                    fig_parallel.update_coloraxes(colorbar=dict(title='Küme', tickvals=list(range(n_clusters))))
+                    fig_parallel.update_layout(
+                        paper_bgcolor='rgba(0,0,0,0)',
+                        font={'color': '#FFFFFF'},
+                        title_text=f"Çok Boyutlu Ülke Profilleri ({year_text})",
+                        height=500
+                    )
+                    st.plotly_chart(fig_parallel, use_container_width=True)
+
+                    with st.expander("Küme üyeleri"):
+                        members = cluster_store.assignments(year_filter, cluster_k, cluster_method, df)
+                        st.dataframe(
+                            members.sort_values(['cluster', 'distance']).rename(columns={
+                                'country_name': 'Ülke', 'cluster': 'Küme', 'distance': 'Merkeze Uzaklık'
+                            }),
+                            hide_index=True, use_container_width=True
+                        )
+
+                # What-if senaryo simülasyonu (model veri sürümü başına bir kez kurulur)
+                st.markdown("""
+                    <div class="chart-container">
+                        <h3 style="
+                            text-align: center;
+                            font-size: 28px;
+                            font-weight: 600;
+                            color: #00c6ff;
+                            margin-top: 2rem;
+                            font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                            letter-spacing: -0.5px;
+                            padding: 0;
+                        ">🧪 Senaryo Simülasyonu</h3>
+                        <p style="
+                            text-align: center;
+                            color: rgba(255, 255, 255, 0.9);
+                            font-size: 16px;
+                            margin-top: 0.5rem;
+                            max-width: 600px;
+                            margin-left: auto;
+                            margin-right: auto;
+                        ">Faktörler değişirse mutluluk skoru nasıl değişir? Çok değişkenli model tahmini ve %95 bootstrap aralığı</p>
+                    </div>
+                """, unsafe_allow_html=True)
+
+                scen_col1, scen_col2 = st.columns(2)
+                with scen_col1:
+                    scen_gdp = st.slider('GDP Değişimi (%)', -30, 30, 10, key='scenario_gdp')
+                    scen_social = st.slider('Sosyal Destek Değişimi', -0.10, 0.10, 0.0, 0.01, key='scenario_social')
+                with scen_col2:
+                    scen_freedom = st.slider('Özgürlük Değişimi', -0.10, 0.10, 0.0, 0.01, key='scenario_freedom')
+                    scen_corruption = st.slider('Yolsuzluk Algısı Değişimi', -0.10, 0.10, 0.0, 0.01, key='scenario_corruption')
+                scenario_changes = {
+                    'gdp_per_capita': f"{scen_gdp:+d}%",
+                    'social_support': f"{scen_social:+.2f}",
+                    'freedom_to_make_life_choices': f"{scen_freedom:+.2f}",
+                    'perceptions_of_corruption': f"{scen_corruption:+.2f}",
+                }
+
+                scenario_result = simulate_scenarios(df, scenario_changes, year=year_filter)
+                if scenario_result.empty:
+                    st.info("Seçilen yıl için tüm faktörleri eksiksiz ülke bulunamadı.")
+                else:
+                    scenario_options = sorted(scenario_result['country_name'])
+                    default_scenario = [c for c in ['Turkiye', 'Germany', 'Brazil', 'India', 'Nigeria'] if c in scenario_options]
+                    scenario_countries = st.multiselect('Ülkeler', scenario_options,
+                                                        default=default_scenario or scenario_options[:5],
+                                                        key='scenario_countries')
+                    st.metric("Ortalama Etki (tüm ülkeler)", f"{scenario_result['delta'].mean():+.3f}",
+                              help="Senaryonun tüm ülkelerdeki tahmini mutluluk skoru değişiminin ortalaması")
+
+                    shown = scenario_result[scenario_result['country_name'].isin(scenario_countries)]
+                    fig_scenario = go.Figure(go.Bar(
+                        x=shown['country_name'],
+                        y=shown['delta'],
+                        error_y=dict(type='data', symmetric=False,
+                                     array=shown['ci_high'] - shown['delta'],
+                                     arrayminus=shown['delta'] - shown['ci_low']),
+                        marker_color=np.where(shown['delta'] >= 0, '#00c6ff', '#ff6b6b'),
+                        customdata=np.column_stack([shown['life_ladder'], shown['life_ladder'] + shown['delta'], shown['year']]),
+                        hovertemplate='<b>%{x}</b> (%{customdata[2]})<br>Değişim: %{y:+.3f}<br>'
+                                      'Mevcut: %{customdata[0]:.2f} → Tahmini: %{customdata[1]:.2f}<extra></extra>'
+                    ))
+                    fig_scenario.update_layout(
+                        **CHART_THEME,
+                        height=400,
+                        yaxis_title="Mutluluk Skoru Değişimi",
+                        showlegend=False
+                    )
+                    fig_scenario.update_layout(title_text="Senaryonun Tahmini Etkisi")
+                    st.plotly_chart(fig_scenario, use_container_width=True)
+
+                # Sabit etkili panel regresyonu: ülke içi değişimlerin etkisi ve gecikmeler
+                st.markdown("""
+                    <div class="chart-container">
+                        <h3 style="
+                            text-align: center;
+                            font-size: 28px;
+                            font-weight: 600;
+                            color: #00c6ff;
+                            margin-top: 2rem;
+                            font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                            letter-spacing: -0.5px;
+                            padding: 0;
+                        ">⏳ Gecikmeli Etkiler</h3>
+                        <p style="
+                            text-align: center;
+                            color: rgba(255, 255, 255, 0.9);
+                            font-size: 16px;
+                            margin-top: 0.5rem;
+                            max-width: 600px;
+                            margin-left: auto;
+                            margin-right: auto;
+                        ">Ülke ve yıl sabit etkili panel regresyonu: bir ülkede faktör değiştiğinde mutluluk aynı yıl ve sonraki yıllarda nasıl değişiyor?</p>
+                    </div>
+                """, unsafe_allow_html=True)
+
+                fe_lag = st.selectbox('En Büyük Gecikme (yıl)', list(range(REGRESSION_MAX_LAG + 1)),
+                                      index=REGRESSION_MAX_LAG, key='fe_max_lag')
+                fe_result = fixed_effects(df, fe_lag)
+                fe_table = fe_result.table()
+                # Standartlaştırılmış katsayılar faktörleri aynı ölçekte karşılaştırır
+                fe_scale = pd.Series(fe_result.x_std / fe_result.y_std, index=fe_table.index)
+
+                fig_fe = go.Figure()
+                for lag, lag_rows in fe_table.groupby('lag'):
+                    scale = fe_scale.loc[lag_rows.index]
+                    fig_fe.add_trace(go.Bar(
+                        x=[PROFILE_LABELS.get(f, f) for f in lag_rows['factor']],
+                        y=lag_rows['standardized'],
+                        name='Aynı yıl' if lag == 0 else f'{lag} yıl önce',
+                        error_y=dict(type='data', symmetric=False,
+                                     array=(lag_rows['ci_high'] - lag_rows['coef']) * scale,
+                                     arrayminus=(lag_rows['coef'] - lag_rows['ci_low']) * scale),
+                        customdata=np.column_stack([lag_rows['coef'], lag_rows['p_value']]),
+                        hovertemplate='<b>%{x}</b><br>Standart katsayı: %{y:.3f}<br>'
+                                      'Katsayı: %{customdata[0]:.4g}<br>p: %{customdata[1]:.3f}<extra></extra>'
+                    ))
+                fig_fe.update_layout(
+                    **CHART_THEME,
+                    height=450,
+                    barmode='group',
+                    yaxis_title="Standartlaştırılmış Katsayı",
+                    showlegend=True
+                )
+                fig_fe.update_layout(title_text=f"Faktör Etkileri ({fe_result.n_obs} gözlem, "
+                                                f"{fe_result.n_countries} ülke, within R² = {fe_result.r2_within:.2f})")
+                st.plotly_chart(fig_fe, use_container_width=True)
+
+                if fe_lag:
+                    with st.expander("Uzun dönem etkileri (gecikme katsayıları toplamı)"):
+                        long_run = fe_result.long_run()
+                        long_run['factor'] = long_run['factor'].map(lambda f: PROFILE_LABELS.get(f, f))
+                        st.dataframe(
+                            long_run[['factor', 'effect', 'ci_low', 'ci_high', 'p_value']].rename(columns={
+                                'factor': 'Faktör', 'effect': 'Etki', 'ci_low': 'Alt (%95)',
+                                'ci_high': 'Üst (%95)', 'p_value': 'p'
+                            }).round(4),
+                            hide_index=True, use_container_width=True
+                        )
+
                 st.markdown('</div>', unsafe_allow_html=True)
 
         elif st.session_state.current_page == 'Soru-Cevap':
@@ -1969,17 +2353,29 @@ def main():
 
             # Gönder butonu
             if st.button("GÖNDER", key="submit_button", use_container_width=True):
-                if question:
+                # Sıralama soruları sıralama indeksinden, tek ülke/bölge hakkındaki genel sorular
+                # hazır rapordan anında yanıtlanır
+                ranked = rank_answer(df, question) if question else None
+                canned = get_report_store(frame_fingerprint(df), df).lookup(question, df) if question and not ranked else None
+                if ranked:
+                    st.markdown(ranked)
+                elif canned:
+                    st.markdown(canned.get("llm_answer") or canned["report"])
+                    for params in canned.get("llm_charts") or canned["charts"]:
+                        st.plotly_chart(create_dynamic_chart(params, df), use_container_width=True)
+                elif question:
                     # Önce agent tipini belirle
-                    from llm_agents import MultiAgentSystem
-                    multi_agent = MultiAgentSystem(df)
+                    from llm_agents import get_multi_agent_system
+                    multi_agent = get_multi_agent_system(df)
                     agent_type = multi_agent.route_question(question)
                     
                     # Agent tipi açıklamaları
                     agent_descriptions = {
                         "data": "📊 Veri Analizi Uzmanı",
                         "causal": "🔍 Nedensellik Analisti",
-                        "qa": "💡 Genel Bilgi Uzmanı"
+                        "qa": "💡 Genel Bilgi Uzmanı",
+                        "query": "🔎 Veri Sorgu Aracı",
+                        "compound": "🧠 Birden Fazla Uzman (paralel)"
                     }
                     
                     # Agent yönlendirme bilgisini göster
@@ -0,0 +1,34 @@
+"""happyGPT çekirdek paketi.
+
+Streamlit'ten bağımsız veri ve agent katmanı. Ağır bağımlılıklar (LangChain,
+scikit-learn, Plotly) ilk kullanımda yüklenir; bu sayede paket batch işlerden
+ve API sunucusundan hızlıca import edilebilir.
+"""
+
+import importlib
+
+__all__ = [
+    "AgentType",
+    "MultiAgentSystem",
+    "calculate_analysis_inputs",
+    "get_dataset",
+    "load_dataset",
+    "load_llm_model",
+]
+
+# İsim -> modül eşlemesi; modüller yalnızca erişildiğinde import edilir
+_LAZY_ATTRS = {
+    "AgentType": "happygpt.agents",
+    "MultiAgentSystem": "happygpt.agents",
+    "calculate_analysis_inputs": "happygpt.agents",
+    "get_dataset": "happygpt.dataset",
+    "load_dataset": "happygpt.data",
+    "load_llm_model": "happygpt.llm",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'happygpt' has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name), name)
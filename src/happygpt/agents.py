@@ -0,0 +1,463 @@
+"""Multi-agent sistemi (Streamlit'ten bağımsız çekirdek)."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import (anomalies, benchmarks, breaks, clustering, forecasting, planner, query, rankings, regression,
+               resampling, scenarios, similarity)
+from .cache import SharedCache, frame_fingerprint, memoize
+from .coalesce import SingleFlight
+from .config import use_query_tool
+from .countries import dataset_alias_index, extract_entities
+from .llm import load_llm_model
+from .panel import get_panel
+from .ratelimit import get_limiter
+from .reports import country_report, region_report
+from .resilience import DEGRADED_ERRORS, CircuitOpenError, get_caller
+from .templates import (DATA_ANALYSIS_TEMPLATE, FINAL_CAUSAL_ANALYSIS_TEMPLATE, GENERAL_QA_TEMPLATE,
+                        QUERY_ANSWER_TEMPLATE, QUERY_TOOL_TEMPLATE, SYNTHESIS_TEMPLATE)
+
+
+# Süreç genelinde (tüm oturumlar) paylaşılan yanıt önbelleği ve süren üretimler.
+# Anahtarlar veri sürümünü içerir; sürüm değişince eski kayıtlar silinir (bkz. dataset).
+ANSWER_CACHE = SharedCache(maxsize=2048)
+_in_flight = SingleFlight()
+
+# (df, soru) -> ek bağlam metni ya da None; sonuçlar soruya "Ek veri bağlamı" olarak eklenir
+CONTEXT_PROVIDERS = [similarity.question_context, clustering.question_context, scenarios.question_context,
+                     resampling.question_context, regression.question_context, breaks.question_context,
+                     anomalies.question_context, forecasting.question_context,
+                     rankings.question_context, benchmarks.question_context]
+
+# Yönlendirme anahtar kelimeleri
+CAUSAL_KEYWORDS = ["neden", "niye", "sebebi", "etkisi", "faktör"]
+DATA_KEYWORDS = ["trend", "analiz", "karşılaştır", "grafik", "veri", "istatistik"]
+
+# LLM devre dışıyken verilen deterministik yanıtların başlığı
+FALLBACK_NOTICE = "⚠️ Yapay zeka servisi şu an yoğun; yanıt doğrudan veri setinden üretildi."
+
+# Araç modunda hatalı sorgu, hata mesajıyla en fazla bu kadar kez yeniden yazdırılır
+QUERY_ATTEMPTS = 2
+
+
+# 🎯 Agent Tipleri
+class AgentType:
+    DATA = "data"
+    CAUSAL = "causal"
+    QA = "qa"
+    QUERY = "query"
+    COMPOUND = "compound"
+
+
+AGENT_LABELS = {
+    AgentType.DATA: "Veri Analizi",
+    AgentType.CAUSAL: "Nedensel Analiz",
+    AgentType.QA: "Genel Bilgi",
+    AgentType.QUERY: "Sorgu Sonucu",
+}
+
+
+@memoize(maxsize=16)
+def calculate_analysis_inputs(df):
+    return {
+        "total_countries": int(df['country_name'].nunique()),
+        "year_range": f"{df['year'].min()} - {df['year'].max()}",
+        "metrics_count": len(df.columns),
+        "metrics": ", ".join(df.columns),
+        "regions": ", ".join(sorted(set(df['regional_indicator'].unique()))),
+        "global_mean": float(df['life_ladder'].mean()),
+        "mean_gdp_per_capita": float(df['gdp_per_capita'].mean()),
+        "mean_life_expectancy": float(df['life_expectancy'].mean()),
+        "mean_unemployment_rate": float(df['unemployment_rate'].mean()),
+        "mean_internet_users_percent": float(df['internet_users_percent'].mean()),
+        # Satır değil ülke sayısı
+        "g20_count": int(df.loc[df['g20_member'] == 1, 'country_name'].nunique()),
+        "oecd_count": int(df.loc[df['oecd_member'] == 1, 'country_name'].nunique()),
+        "brics_count": int(df.loc[df['brics_member'] == 1, 'country_name'].nunique()),
+        "happiest": df.loc[df['life_ladder'].idxmax(), 'country_name'],
+        "unhappiest": df.loc[df['life_ladder'].idxmin(), 'country_name'],
+        "variables": ", ".join(df.columns)
+    }
+
+
+@memoize(maxsize=64)
+def calculate_trend_analysis(df, metric):
+    """Zaman serisi trend analizini önbelleğe alarak hesapla."""
+    if metric not in df.columns:
+        return {}
+
+    yearly_data = get_panel(df).trend(metric)
+    if len(yearly_data) < 2:
+        return {}
+
+    from sklearn.linear_model import LinearRegression
+
+    X = np.arange(len(yearly_data)).reshape(-1, 1)
+    y = yearly_data['mean'].values
+    trend_model = LinearRegression().fit(X, y)
+
+    return {
+        "trend_direction": "artış" if trend_model.coef_[0] > 0 else "düşüş",
+        "trend_strength": trend_model.score(X, y),
+    }
+
+
+# 🚀 Multi-Agent Sistemi
+class MultiAgentSystem:
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.analysis_inputs = calculate_analysis_inputs(df)
+
+        self.agents = {
+            AgentType.DATA: self._create_data_agent(),
+            AgentType.CAUSAL: self._create_causal_agent(),
+            AgentType.QA: self._create_qa_agent(),
+            AgentType.QUERY: self._create_query_agent(),
+        }
+        self.query_writer = self._create_query_writer()
+        self.synthesizer = self._create_synthesizer()
+
+    def _calculate_trend_analysis(self, metric):
+        """Zaman serisi trend analizini önbelleğe alarak hesapla."""
+        return calculate_trend_analysis(self.df, metric)
+
+    def _create_visualizations(self, analysis_type: str, metric: str):
+        """Çeşitli veri analiz görsellerini oluştur."""
+        if metric not in self.df.columns:
+            return None
+
+        import plotly.express as px
+        import plotly.graph_objects as go
+
+        fig = go.Figure()
+
+        if analysis_type == "trend":
+            yearly_data = get_panel(self.df).trend(metric).rename(columns={'mean': metric})
+            fig = px.line(yearly_data, x="year", y=metric, title=f"{metric} Trend Analizi", template="plotly_dark")
+
+        elif analysis_type == "comparison":
+            latest_year = self.df["year"].max()
+            latest_data = self.df[self.df["year"] == latest_year]
+            fig = px.box(latest_data, x='regional_indicator', y=metric, title=f"{metric} Bölgesel Dağılım", template="plotly_dark")
+
+        elif analysis_type == "correlation":
+            fig = px.scatter_matrix(self.df, dimensions=["life_ladder", "gdp_per_capita", metric], title="Korelasyon Matrisi")
+
+        return fig
+
+    def _create_data_agent(self):
+        """Veri analizi agent'ı oluştur."""
+        from langchain.chains import LLMChain
+        from langchain.prompts import PromptTemplate
+
+        prompt = PromptTemplate(
+            template=DATA_ANALYSIS_TEMPLATE,
+            input_variables=[
+                    "total_countries",
+                    "year_range",
+                    "metrics_count",
+                    "metrics",
+                    "regions",
+                    "global_mean",
+                    "mean_gdp_per_capita",
+                    "mean_life_expectancy",
+                    "mean_unemployment_rate",
+                    "mean_internet_users_percent",
+                    "g20_count",
+                    "oecd_count",
+                    "brics_count",
+                    "happiest",
+                    "unhappiest",
+        ]
+        )
+        return LLMChain(llm=load_llm_model(), prompt=prompt)
+
+    def _create_causal_agent(self):
+        """Nedensel analiz agent'ı oluştur."""
+        from langchain.chains import LLMChain
+        from langchain.prompts import PromptTemplate
+
+        prompt = PromptTemplate(
+            template=FINAL_CAUSAL_ANALYSIS_TEMPLATE,
+            input_variables=["question", "variables"]
+        )
+        # Daha spesifik veri analizi yönlendirmeleri ekleyelim
+        prompt.template += "\n\nÖNEMLİ: Her iddia mutlaka sayısal bir veri ile desteklenmeli. Korelasyon katsayıları, ortalamalar ve yüzdelik değişimler kullanılmalı."
+        return LLMChain(llm=load_llm_model(), prompt=prompt)
+
+    def _create_qa_agent(self):
+        """Genel soru-cevap agent'ı oluştur."""
+        from langchain.chains import LLMChain
+        from langchain.prompts import PromptTemplate
+
+        prompt = PromptTemplate(template=GENERAL_QA_TEMPLATE, input_variables=["question", "variables"])
+        return LLMChain(llm=load_llm_model(), prompt=prompt)
+
+    def _create_query_writer(self):
+        """Araç modunda soruyu SQL sorgusuna çeviren zincir."""
+        from langchain.chains import LLMChain
+        from langchain.prompts import PromptTemplate
+
+        prompt = PromptTemplate(template=QUERY_TOOL_TEMPLATE, input_variables=["schema", "error", "question"])
+        return LLMChain(llm=load_llm_model(), prompt=prompt)
+
+    def _create_query_agent(self):
+        """Sorgu sonucundan kısa yanıt üreten agent."""
+        from langchain.chains import LLMChain
+        from langchain.prompts import PromptTemplate
+
+        prompt = PromptTemplate(template=QUERY_ANSWER_TEMPLATE, input_variables=["sql", "result", "question"])
+        return LLMChain(llm=load_llm_model(), prompt=prompt)
+
+    def _create_synthesizer(self):
+        """Bileşik sorularda alt yanıtları birleştiren zincir."""
+        from langchain.chains import LLMChain
+        from langchain.prompts import PromptTemplate
+
+        prompt = PromptTemplate(template=SYNTHESIS_TEMPLATE, input_variables=["parts", "question"])
+        return LLMChain(llm=load_llm_model(), prompt=prompt)
+
+    @staticmethod
+    def _route_signal(question_lower: str):
+        """Anahtar kelimeye göre agent tipi; eşleşme yoksa None."""
+        if any(kw in question_lower for kw in CAUSAL_KEYWORDS):
+            return AgentType.CAUSAL
+        elif any(kw in question_lower for kw in DATA_KEYWORDS):
+            return AgentType.QUERY if use_query_tool() else AgentType.DATA
+        return None
+
+    def plan(self, question: str):
+        """Bileşik soruyu agent başına alt görevlere böl (bkz. planner)."""
+        return planner.plan(question, lambda part: self._route_signal(part.lower()))
+
+    def route_question(self, question: str) -> str:
+        """Soruyu ilgili agent'a yönlendir; birden fazla agent gerekiyorsa COMPOUND."""
+        if len(self.plan(question)) > 1:
+            return AgentType.COMPOUND
+        # Sorgu aracı (açıksa) yalnızca veri analizi sorularına kullanılır; plan() ile aynı kurallar
+        question_lower = question.lower()
+        return self._route_signal(question_lower) or self._route_analysis(question_lower)
+
+    @staticmethod
+    def _route_analysis(question_lower: str) -> str:
+        """Nedensel olmayan sorular için veri analizi / genel soru-cevap ayrımı."""
+        if any(kw in question_lower for kw in DATA_KEYWORDS):
+            return AgentType.DATA
+        return AgentType.QA
+
+    def run_query_tool(self, question: str):
+        """LLM'e sorgu yazdır ve yerelde çalıştır; (sql, sonuç metni) ya da başarısızsa None.
+
+        Hatalı sorgular hata mesajıyla birlikte yeniden yazdırılır.
+        """
+        engine = query.get_engine(self.df)
+        error = ""
+        for _ in range(QUERY_ATTEMPTS):
+            text = self._invoke(self.query_writer, {"schema": engine.schema_text(), "error": error,
+                                                    "question": question}, "query_writer")
+            sql = query.extract_sql(text)
+            if sql is None:
+                error = "\nÖnceki yanıtta sorgu bulunamadı; yalnızca ```sql bloğu döndür.\n"
+                continue
+            try:
+                frame, truncated = engine.run(sql)
+            except query.QueryError as e:
+                error = f"\nÖnceki sorgu hata verdi ({e}):\n{sql}\n"
+                continue
+            return sql, query.format_result(frame, truncated)
+        return None
+
+    def _prepare_inputs(self, question: str, agent_type=None):
+        """Soruyu yönlendir (ya da verilen agent'ı kullan); (agent tipi, agent girdileri) döndür."""
+        agent_type = agent_type or self.route_question(question)
+        if agent_type == AgentType.QUERY:
+            # Sorgu sonucu uzun bağlamın yerini alır; araç başarısızsa normal agent'a düşülür
+            found = self.run_query_tool(question)
+            if found is not None:
+                sql, result = found
+                return agent_type, {"question": question, "sql": sql, "result": result}
+            agent_type = self._route_analysis(question.lower())
+
+        # analysis_inputs sözlüğünün kopyasını alıp gerekli girişleri ekliyoruz
+        inputs = self.analysis_inputs.copy()
+        inputs["question"] = question
+        context = self._question_context(question)
+        if context:
+            inputs["question"] = f"{question}\n\nEk veri bağlamı:\n{context}"
+
+        # Eğer CAUSAL agent seçilmişse, "variables" anahtarını kesin olarak ekliyoruz.
+        if agent_type == AgentType.CAUSAL:
+            inputs["variables"] = ", ".join(self.df.columns)
+        return agent_type, inputs
+
+    def _question_context(self, question: str):
+        """Kayıtlı bağlam sağlayıcılarının soruya özel çıktıları."""
+        parts = [provider(self.df, question) for provider in CONTEXT_PROVIDERS]
+        return "\n".join(part for part in parts if part)
+
+    def fallback_answer(self, question: str) -> str:
+        """LLM kullanılamazken deterministik yanıt: sıralama, hazır ülke/bölge raporu ya da veri bağlamı."""
+        ranked = rankings.rank_answer(self.df, question)
+        if ranked is not None:
+            return f"{FALLBACK_NOTICE}\n\n{ranked}"
+        entities = extract_entities(question, dataset_alias_index(self.df))
+        if entities:
+            kind, name, _ = entities[0]
+            text, _ = (country_report if kind == "country" else region_report)(self.df, name)
+            return f"{FALLBACK_NOTICE}\n\n{text}"
+        context = self._question_context(question)
+        inputs = self.analysis_inputs
+        summary = (f"- {inputs['total_countries']} ülke, {inputs['year_range']}; küresel mutluluk ortalaması "
+                   f"{inputs['global_mean']:.2f}; en mutlu: {inputs['happiest']}, en mutsuz: {inputs['unhappiest']}")
+        return f"{FALLBACK_NOTICE}\n\n{context or summary}"
+
+    def answer_key(self, question: str):
+        """Yanıt önbelleği / birleştirme anahtarı: (veri sürümü, agent tipi, normalize soru)."""
+        normalized = " ".join(question.split()).casefold()
+        return (frame_fingerprint(self.df), self.route_question(question), normalized)
+
+    @staticmethod
+    def _query_note(agent_type, inputs):
+        """Araç modunda yanıtın sonuna eklenen, çalıştırılan sorgu."""
+        return f"\n\n```sql\n{inputs['sql']}\n```" if agent_type == AgentType.QUERY else ""
+
+    @staticmethod
+    def _acquire(name):
+        """Süreçler arası hız sınırlayıcıdan token al (kapalıysa hemen döner).
+
+        Devre açıksa sıraya girilmez; token harcanmadan CircuitOpenError fırlatılır.
+        """
+        get_caller().check()
+        limiter = get_limiter()
+        if limiter is not None:
+            limiter.acquire(name)
+        return limiter
+
+    def _invoke(self, chain, inputs, name) -> str:
+        """LLM çağrısı: hız sınırı, hedge, süre sınırı ve devre kesici ile (bkz. ratelimit, resilience).
+
+        Hedge isteği yalnızca sırada bekleyen yokken ve token varsa gönderilir.
+        """
+        limiter = self._acquire(name)
+        hedge_gate = (lambda: limiter.try_acquire(name)) if limiter is not None else None
+        return get_caller().call(lambda: chain.invoke(inputs)["text"], hedge_gate)
+
+    def _run_agent(self, question: str, agent_type=None) -> str:
+        agent_type, inputs = self._prepare_inputs(question, agent_type)
+        agent = self.agents.get(agent_type)
+        return self._invoke(agent, inputs, agent_type) + self._query_note(agent_type, inputs)
+
+    async def _fan_out(self, question: str, tasks):
+        """Alt görevleri eşzamanlı çalıştır; sentez girdilerini döndür."""
+        degraded = []
+
+        def run(task):
+            try:
+                return self._run_agent(task.question(question), task.agent_type)
+            except DEGRADED_ERRORS as e:
+                degraded.append(e)
+                raise
+
+        results = await planner.fan_out(tasks, run)
+        parts = planner.synthesis_parts(tasks, results, AGENT_LABELS)
+        if not parts:
+            # Hız sınırı/devre hatası yukarı taşınır ki çağıran deterministik yanıta düşsün
+            if degraded:
+                raise degraded[0]
+            if get_caller().breaker.is_open():
+                raise CircuitOpenError("LLM sağlayıcısı geçici olarak devre dışı")
+            raise RuntimeError("Alt görevlerin hiçbiri yanıt üretemedi")
+        return {"parts": parts, "question": question}
+
+    def _compound_inputs(self, question: str):
+        tasks = self.plan(question)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._fan_out(question, tasks))
+        # Çağıran thread'de çalışan bir döngü var (ör. ASGI): fan-out ayrı thread'de kendi döngüsüyle yürür
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, self._fan_out(question, tasks)).result()
+
+    def _generate_answer(self, question: str) -> str:
+        if self.route_question(question) == AgentType.COMPOUND:
+            return self._invoke(self.synthesizer, self._compound_inputs(question), AgentType.COMPOUND)
+        return self._run_agent(question)
+
+    def _generate_stream(self, question: str):
+        if self.route_question(question) == AgentType.COMPOUND:
+            # Alt görevler paralel tamamlanır, yalnızca sentez akış halinde gelir
+            agent_type, agent, inputs, note = AgentType.COMPOUND, self.synthesizer, self._compound_inputs(question), ""
+        else:
+            agent_type, inputs = self._prepare_inputs(question)
+            agent, note = self.agents.get(agent_type), self._query_note(agent_type, inputs)
+        self._acquire(agent_type)
+        for chunk in get_caller().stream(lambda: (agent.prompt | agent.llm).stream(inputs)):
+            # Chat modelleri mesaj parçası, düz LLM'ler metin döndürür
+            text = getattr(chunk, "content", chunk)
+            if text:
+                yield text
+        if note:
+            yield note
+
+    def get_answer(self, question: str, allow_fallback=True) -> str:
+        """Soruyu uygun agent'a yönlendir ve yanıt al.
+
+        Aynı soru için süren bir üretim varsa yeni istek atılmaz, onun sonucu beklenir.
+        LLM devre dışıysa, çağrı süresi dolarsa ya da hız sınırında token alınamazsa `allow_fallback` ile
+        deterministik yanıt döner (önbelleğe alınmaz); False ise hata fırlatılır
+        (ör. toplu üretimde yer tutucu metin kalıcı yanıt olarak kaydedilmesin diye).
+        """
+        key = self.answer_key(question)
+        cached = ANSWER_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        def generate():
+            answer = self._generate_answer(question)
+            ANSWER_CACHE.set(key, answer)
+            return answer
+
+        try:
+            return _in_flight.do(key, generate)
+        except DEGRADED_ERRORS:
+            if not allow_fallback:
+                raise
+            return self.fallback_answer(question)
+
+    def stream_answer(self, question: str):
+        """Yanıtı LLM'den geldikçe metin parçaları halinde üret.
+
+        Aynı soruyu eşzamanlı soran tüm istemciler tek üretimin parçalarını alır.
+        """
+        key = self.answer_key(question)
+        cached = ANSWER_CACHE.get(key)
+        if cached is not None:
+            return iter([cached])
+        if get_caller().breaker.is_open():
+            return iter([self.fallback_answer(question)])
+        degraded = []
+        return _in_flight.stream(key, lambda: self._stream_or_fallback(question, degraded),
+                                 on_complete=lambda answer: None if degraded else ANSWER_CACHE.set(key, answer))
+
+    def _stream_or_fallback(self, question: str, degraded: list):
+        """Akışı başlat; token alınamaz ya da devre açılırsa (ilk parçadan önce) deterministik yanıt ver.
+
+        Token alma, bileşik soruların alt görevleri ve devre kontrolü ilk parça istenirken çalışır;
+        bu hatalar istemciye hata olayı olarak değil yedek yanıt olarak gider. `degraded` işaretlenir
+        ki yedek yanıt önbelleğe yazılmasın.
+        """
+        stream = self._generate_stream(question)
+        try:
+            first = next(stream, None)
+        except DEGRADED_ERRORS:
+            degraded.append(True)
+            yield self.fallback_answer(question)
+            return
+        if first is not None:
+            yield first
+        yield from stream
@@ -0,0 +1,66 @@
+"""Dashboard ve API'nin ortak kullandığı özet hesaplamalar."""
+
+import pandas as pd
+
+from .cache import memoize
+from .panel import get_panel
+from .rankings import rank_index
+
+
+@memoize(maxsize=64)
+def regional_averages(df, metric='life_ladder', year=None):
+    """Bölge ortalamaları (küçükten büyüğe sıralı)."""
+    data = df if year is None else df[df['year'] == year]
+    return data.groupby('regional_indicator', observed=True)[metric].mean().reset_index().sort_values(metric)
+
+
+@memoize(maxsize=128)
+def top_countries(df, metric='life_ladder', n=10, year=None, ascending=False):
+    """En yüksek (ascending=True ise en düşük) n ülke; yıl verilmezse tüm yılların ortalaması."""
+    if year is None:
+        return get_panel(df).ranking(metric, ascending=ascending, n=n)
+    # İndekslenen metriklerde sıralı diziden O(k) dilim
+    index = rank_index(df)
+    if metric in index.metric_index and int(year) in index.panel.year_index:
+        return index.top(metric, year, n, ascending=ascending)[['country_name', metric]]
+    data = df[df['year'] == year][['country_name', metric]]
+    data = data.nsmallest(n, metric) if ascending else data.nlargest(n, metric)
+    return data.sort_values(metric, ascending=ascending)
+
+
+@memoize(maxsize=64)
+def yearly_trend(df, metric='life_ladder', country=None, region=None):
+    """Yıllara göre ortalama ve standart sapma; ülke verilirse bölge yok sayılır."""
+    return get_panel(df).trend(metric, region=region, country=country)[['year', 'mean', 'std']]
+
+
+@memoize(maxsize=32)
+def regional_trends(df, metric='life_ladder'):
+    """Bölge ve yıla göre ortalamalar (uzun format)."""
+    return get_panel(df).region_trends(metric)
+
+
+@memoize(maxsize=32)
+def country_averages(df, metric='life_ladder'):
+    """Ülkelerin tüm yıllar ortalaması."""
+    panel = get_panel(df)
+    return pd.DataFrame({'country_name': panel.countries, metric: panel.country_means(metric)}).dropna()
+
+
+@memoize(maxsize=32)
+def correlation_matrix(df, factors):
+    """Faktörler arası korelasyon matrisi."""
+    return df[list(factors)].corr()
+
+
+def filter_rows(df, country=None, region=None, year=None, columns=None):
+    """Satırları ülke/bölge/yıl ile süz ve istenen sütunları seç."""
+    mask = pd.Series(True, index=df.index)
+    if country is not None:
+        mask &= df['country_name'] == country
+    if region is not None:
+        mask &= df['regional_indicator'] == region
+    if year is not None:
+        mask &= df['year'] == year
+    data = df[mask]
+    return data[list(columns)] if columns else data
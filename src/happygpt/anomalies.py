@@ -0,0 +1,265 @@
+"""Panel üzerinde vektörel anomali tespiti.
+
+Her ülke × yıl × metrik hücresi iki robust z-skoru alır:
+
+    z_year     aynı yıldaki ülkelere göre: (x - medyan) / (1.4826 · MAD)
+    z_country  ülkenin kendi geçmişine göre: yıllık değişimin, ülkenin
+               yıllık değişimlerinin medyanı ve MAD'iyle ölçeklenmiş hali
+
+GDP ve sağlık harcaması log ölçeğinde puanlanır. Skor ikisinin mutlak
+değerce büyüğüdür; eşiği aşan hücreler anomalidir.
+Tüm metrikler ve yıllar tek geçişte, (ülke, yıl, metrik) dizisi üzerinde
+hesaplanır. Veri seti yalnızca yeni yıllar eklenerek güncellenmişse önceki
+skorlar korunur ve yalnızca yeni yıllar puanlanır (ülke ölçekleri önceki
+sürümden alınır). İsteğe bağlı olarak yıl içi z-skorları üzerinde
+IsolationForest ile çok değişkenli satır skorları da üretilir.
+"""
+
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .countries import dataset_alias_index, extract_entities
+from .panel import Panel, get_panel
+from .schema import LOG_METRICS, METRICS
+
+# Iglewicz-Hoaglin'in değiştirilmiş z-skoru için önerdiği eşik
+THRESHOLD = 3.5
+# Ülke ölçeği, metriğin ülkeler arası medyan ölçeğinin bu oranından küçük olamaz
+# (doğrusal doldurulmuş seriler sabit değişim verir; MAD≈0 her yılı anomali yapar)
+SCALE_FLOOR = 0.25
+CONTAMINATION = 0.02
+RANDOM_STATE = 42
+
+# Soruda bu kelimeler geçerse agent bağlamına anomaliler eklenir
+ANOMALY_WORDS = ("anomali", "aykırı", "olağandışı", "sıra dışı", "beklenmedik", "outlier", "tuhaf")
+
+
+def robust_scale(values, axis):
+    """(medyan, ölçek); ölçek 1.4826 · MAD, MAD sıfırsa ortalama mutlak sapmadan."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # Tamamen boş dilimler
+        center = np.nanmedian(values, axis=axis, keepdims=True)
+        deviation = np.abs(values - center)
+        scale = 1.4826 * np.nanmedian(deviation, axis=axis, keepdims=True)
+        fallback = 1.2533 * np.nanmean(deviation, axis=axis, keepdims=True)
+    scale = np.where(scale > 0, scale, fallback)
+    return center, np.where(scale > 0, scale, np.nan)
+
+
+def _country_scale(changes):
+    """Ülke başına yıllık değişim merkezi ve tabanlanmış ölçeği."""
+    center, scale = robust_scale(changes, axis=1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        floor = SCALE_FLOOR * np.nanmedian(scale, axis=0, keepdims=True)
+    return center, np.fmax(scale, floor)
+
+
+def _values(panel: Panel, metrics):
+    """Puanlanan (ülke, yıl, metrik) değerleri; LOG_METRICS log ölçeğinde."""
+    values = panel.values[:, :, [panel.metric_index[m] for m in metrics]].copy()
+    for j, metric in enumerate(metrics):
+        if metric in LOG_METRICS:
+            values[:, :, j] = np.log(np.clip(values[:, :, j], 1e-9, None))
+    return values
+
+
+def _changes(values):
+    """Bir önceki takvim yılına göre fark, (ülke, yıl, metrik)."""
+    diff = np.full_like(values, np.nan)
+    diff[:, 1:] = values[:, 1:] - values[:, :-1]
+    return diff
+
+
+class AnomalyScores:
+    """Panel hizalı z-skorları ve ülke ölçekleri."""
+
+    def __init__(self, panel: Panel, metrics, z_year, z_country, center, scale):
+        self.panel = panel
+        self.metrics = list(metrics)
+        self.z_year = z_year
+        self.z_country = z_country
+        self.center = center
+        self.scale = scale
+        self.metric_index = {name: i for i, name in enumerate(self.metrics)}
+
+    @classmethod
+    def fit(cls, panel: Panel, metrics=tuple(METRICS)):
+        metrics = [m for m in metrics if m in panel.metric_index]
+        values = _values(panel, metrics)
+        year_center, year_scale = robust_scale(values, axis=0)
+        changes = _changes(values)
+        center, scale = _country_scale(changes)
+        return cls(panel, metrics, (values - year_center) / year_scale, (changes - center) / scale, center, scale)
+
+    def extend(self, panel: Panel):
+        """Yeni panel yalnızca yeni yıllar ekliyorsa onları puanla; aksi halde None."""
+        old = self.panel
+        if (len(panel.years) < len(old.years) or panel.years[0] != old.years[0]
+                or any(m not in panel.metric_index for m in self.metrics)):
+            return None
+        rows = np.array([panel.country_index.get(c, -1) for c in old.countries])
+        if (rows < 0).any():
+            return None
+        n_old = len(old.years)
+        old_values = _values(old, self.metrics)
+        values = _values(panel, self.metrics)
+        # Eski yıllarda değişen (ya da yeni ülke eklenen) hücre varsa yıl içi dağılımlar değişmiştir
+        known = np.zeros(len(panel.countries), dtype=bool)
+        known[rows] = True
+        old_part = values[:, :n_old]
+        if not np.array_equal(old_part[rows], old_values, equal_nan=True) or not np.isnan(old_part[~known]).all():
+            return None
+
+        new = slice(n_old, None)
+        year_center, year_scale = robust_scale(values[:, new], axis=0)
+        changes = _changes(values)
+        # Bilinen ülkeler önceki ölçeklerini korur; yeni ülkeler kendi değişimlerinden ölçeklenir
+        center, scale = _country_scale(changes)
+        center[rows], scale[rows] = self.center, self.scale
+
+        z_year = np.full(values.shape, np.nan)
+        z_country = np.full(values.shape, np.nan)
+        z_year[rows, :n_old], z_country[rows, :n_old] = self.z_year, self.z_country
+        z_year[:, new] = (values[:, new] - year_center) / year_scale
+        z_country[:, new] = (changes[:, new] - center) / scale
+        return AnomalyScores(panel, self.metrics, z_year, z_country, center, scale)
+
+    @property
+    def score(self):
+        with np.errstate(invalid='ignore'):
+            return np.fmax(np.abs(self.z_year), np.abs(self.z_country))
+
+    def frame(self, threshold=THRESHOLD, metric=None, country=None, year=None):
+        """Eşiği aşan hücreler: country_name, year, metric, value, z_year, z_country, score (skora göre)."""
+        score = self.score
+        mask = np.nan_to_num(score) > threshold
+        mask &= self.panel.observed[:, :, None]
+        if metric is not None:
+            mask[:, :, [i for i, m in enumerate(self.metrics) if m != metric]] = False
+        if country is not None:
+            keep = self.panel.countries == country
+            mask &= keep[:, None, None]
+        if year is not None:
+            mask &= (self.panel.years == int(year))[None, :, None]
+        c, y, m = np.nonzero(mask)
+        metric_cols = np.array([self.panel.metric_index[name] for name in self.metrics])
+        result = pd.DataFrame({
+            'country_name': self.panel.countries[c],
+            'year': self.panel.years[y],
+            'metric': np.array(self.metrics, dtype=object)[m],
+            'value': self.panel.values[c, y, metric_cols[m]],
+            'z_year': self.z_year[c, y, m],
+            'z_country': self.z_country[c, y, m],
+            'score': score[c, y, m],
+        })
+        return result.sort_values('score', ascending=False, ignore_index=True)
+
+    def series(self, country, metric, threshold=THRESHOLD):
+        """Bir ülke serisinin yıl, değer, skor ve anomali bayrağı (gözlenen yıllar)."""
+        i, j = self.panel.country_index[country], self.metric_index[metric]
+        observed = self.panel.observed[i]
+        score = self.score[i, :, j]
+        return pd.DataFrame({
+            'year': self.panel.years[observed],
+            'value': self.panel.metric(metric)[i, observed],
+            'z_year': self.z_year[i, observed, j],
+            'z_country': self.z_country[i, observed, j],
+            'score': score[observed],
+            'anomaly': np.nan_to_num(score[observed]) > threshold,
+        })
+
+    def flags(self, df: pd.DataFrame, metric, threshold=THRESHOLD) -> pd.Series:
+        """df satırlarıyla hizalı anomali bayrakları."""
+        c = df['country_name'].astype(str).map(self.panel.country_index).to_numpy()
+        y = df['year'].to_numpy(dtype=int) - self.panel.years[0]
+        return pd.Series(np.nan_to_num(self.score[c, y, self.metric_index[metric]]) > threshold, index=df.index)
+
+
+_last = None
+_last_lock = threading.Lock()
+
+
+@memoize(maxsize=4)
+def anomaly_scores(df: pd.DataFrame) -> AnomalyScores:
+    """Veri sürümü başına skorlar; önceki sürüme yalnızca yıl eklenmişse artımlı hesaplanır."""
+    global _last
+    panel = get_panel(df)
+    with _last_lock:
+        result = _last.extend(panel) if _last is not None else None
+        if result is None:
+            result = AnomalyScores.fit(panel)
+        _last = result
+    return result
+
+
+@memoize(maxsize=4)
+def isolation_scores(df: pd.DataFrame, contamination=CONTAMINATION) -> pd.DataFrame:
+    """Yıl içi z-skorları üzerinde IsolationForest; country_name, year, score, anomaly (gözlenen satırlar)."""
+    from sklearn.ensemble import IsolationForest
+
+    scores = anomaly_scores(df)
+    c, y = np.nonzero(scores.panel.observed)
+    # Eksik metrikler yıl medyanında (z=0) kabul edilir
+    features = np.nan_to_num(scores.z_year[c, y], nan=0.0)
+    model = IsolationForest(contamination=contamination, random_state=RANDOM_STATE).fit(features)
+    return pd.DataFrame({
+        'country_name': scores.panel.countries[c],
+        'year': scores.panel.years[y],
+        'score': -model.score_samples(features),
+        'anomaly': model.predict(features) == -1,
+    }).sort_values('score', ascending=False, ignore_index=True)
+
+
+def robust_flags(df: pd.DataFrame, column, threshold=THRESHOLD) -> pd.Series:
+    """Tek metrik için df ile hizalı bayraklar (özellik hattında kullanılır).
+
+    Skorlar `AnomalyScores.fit` ile aynıdır; panel metin pivotu yerine ülke
+    kodlarıyla tek sütun için kurulur ve satırlar koddan doğrudan okunur.
+    Ülke ölçek tabanı tüm ülkelere bağlı olduğundan tek hücre değişse de
+    her satır yeniden puanlanır.
+    """
+    countries = pd.factorize(df['country_name'])[0]
+    years = df['year'].to_numpy(dtype=int)
+    years = years - years.min()
+    values = np.full((countries.max() + 1, years.max() + 1, 1), np.nan)
+    values[countries, years, 0] = df[column].to_numpy(dtype='float64', na_value=np.nan)
+    if column in LOG_METRICS:
+        values = np.log(np.clip(values, 1e-9, None))
+    year_center, year_scale = robust_scale(values, axis=0)
+    changes = _changes(values)
+    center, scale = _country_scale(changes)
+    z_year = (values - year_center) / year_scale
+    z_country = (changes - center) / scale
+    with np.errstate(invalid='ignore'):
+        score = np.fmax(np.abs(z_year), np.abs(z_country))[countries, years, 0]
+    return pd.Series(np.nan_to_num(score) > threshold, index=df.index)
+
+
+def _describe(row):
+    basis = "aynı yıldaki ülkelere göre" if abs(row.z_year) >= abs(np.nan_to_num(row.z_country)) else "ülkenin kendi geçmişine göre"
+    return f"{row.country_name} {row.year}, {row.metric}={row.value:.4g} ({basis} robust z={max(abs(row.z_year), abs(np.nan_to_num(row.z_country))):.1f})"
+
+
+def question_context(df: pd.DataFrame, question: str, limit=8):
+    """Anomali sorularına bahsedilen ülkelerin (yoksa son yılın) en belirgin anomalileri."""
+    lowered = question.lower()
+    if not any(word in lowered for word in ANOMALY_WORDS):
+        return None
+    scores = anomaly_scores(df)
+    countries = [name for kind, name, _ in extract_entities(question, dataset_alias_index(df)) if kind == "country"]
+    lines = []
+    for country in countries:
+        found = scores.frame(country=country).head(limit)
+        lines.extend(f"- {_describe(row)}" for row in found.itertuples())
+        if found.empty:
+            lines.append(f"- {country}: robust z > {THRESHOLD} olan anomali yok")
+    if not countries:
+        latest = int(scores.panel.years[scores.panel.observed.any(axis=0)].max())
+        lines.append(f"- {latest} yılının en belirgin anomalileri (robust z > {THRESHOLD}):")
+        lines.extend(f"  {_describe(row)}" for row in scores.frame(year=latest).head(limit).itertuples())
+    return "\n".join(lines)
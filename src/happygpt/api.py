@@ -0,0 +1,409 @@
+"""Özet veriler ve agent yanıtları için hafif ASGI HTTP servisi.
+
+Harici framework gerektirmez; herhangi bir ASGI sunucusuyla çalışır:
+    python -m happygpt.api --port 8000          (uvicorn kuruluysa)
+    HAPPYGPT_LLM=mock python -m happygpt.api    (API anahtarı olmadan)
+
+Uç noktalar (/v1 altındaki GET yanıtları veri seti sürümüne bağlı ETag taşır):
+    GET  /health
+    GET  /v1/aggregates/regions?metric=&year=
+    GET  /v1/aggregates/top?metric=&n=&year=&order=desc|asc
+    GET  /v1/rows?country=&region=&year=&columns=a,b&limit=&offset=
+    GET  /v1/trends?metric=&country=&region=
+    GET  /v1/correlations?factors=a,b,c
+    GET  /v1/ranks?country=&metric=&year=&group=
+    GET  /v1/ranks/changes?metric=&from=&to=&group=&n=
+    GET  /v1/benchmarks?country=&year=&dimension=
+    GET  /v1/scenarios/model
+    POST /v1/scenarios       {"scenarios": {"ad": {"gdp_per_capita": "+10%"}}, "countries": [...], "year": ...}
+    POST /v1/query           {"sql": "SELECT ...", "limit": 100} (salt okunur, bkz. query)
+    POST /v1/answer          {"question": "..."} -> JSON
+    POST /v1/answer/stream   {"question": "..."} -> text/event-stream
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import sys
+import threading
+from urllib.parse import parse_qs
+
+import numpy as np
+import pandas as pd
+
+from . import aggregates, benchmarks, rankings, scenarios
+from .cache import frame_fingerprint
+from .charts import extract_chart_specs
+from .dataset import get_dataset, get_manager
+from .query import QueryError, get_engine
+from .ratelimit import get_limiter
+from .resilience import get_caller
+from .schema import LOG_METRICS
+
+GZIP_MIN_SIZE = 1024
+MAX_ROWS = 1000
+MAX_SCENARIOS = 5000
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _records(frame):
+    """DataFrame -> JSON uyumlu kayıt listesi (NaN -> null)."""
+    return json.loads(frame.to_json(orient="records", force_ascii=False))
+
+
+class HappyAPI:
+    """ASGI uygulaması. Veri seti ve agent sistemi ilk istekte yüklenir."""
+
+    def __init__(self, df=None):
+        self._df = df
+        self._system = None
+        self._lock = threading.Lock()
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/v1/aggregates/regions"): self.regions,
+            ("GET", "/v1/aggregates/top"): self.top,
+            ("GET", "/v1/rows"): self.rows,
+            ("GET", "/v1/trends"): self.trends,
+            ("GET", "/v1/correlations"): self.correlations,
+            ("GET", "/v1/ranks"): self.ranks,
+            ("GET", "/v1/ranks/changes"): self.rank_changes,
+            ("GET", "/v1/benchmarks"): self.benchmarks,
+            ("GET", "/v1/scenarios/model"): self.scenario_model,
+            ("POST", "/v1/scenarios"): self.simulate_scenarios,
+            ("POST", "/v1/query"): self.run_query,
+            ("POST", "/v1/answer"): self.answer,
+            ("POST", "/v1/answer/stream"): self.answer_stream,
+        }
+
+    # -- Veri katmanı --------------------------------------------------------
+
+    @property
+    def df(self):
+        # Sabit bir çerçeve verilmediyse süreçte paylaşılan veri seti kullanılır
+        return self._df if self._df is not None else get_dataset().frame
+
+    @property
+    def dataset_version(self):
+        return frame_fingerprint(self.df)
+
+    @property
+    def system(self):
+        with self._lock:
+            if self._system is None or self._system.df is not self.df:
+                from .agents import MultiAgentSystem
+
+                self._system = MultiAgentSystem(self.df)
+            return self._system
+
+    def _column(self, name, default=None):
+        name = name or default
+        if name not in self.df.columns:
+            raise HTTPError(400, f"Bilinmeyen sütun: {name}")
+        return name
+
+    @staticmethod
+    def _int(value, name, default=None):
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise HTTPError(400, f"{name} tam sayı olmalı")
+
+    @classmethod
+    def _count(cls, value, name, default):
+        """Negatif olamayan tam sayı parametresi (n, limit, offset)."""
+        number = cls._int(value, name, default)
+        if number < 0:
+            raise HTTPError(400, f"{name} negatif olamaz")
+        return number
+
+    # -- Uç noktalar ---------------------------------------------------------
+
+    def health(self, query):
+        payload = {"status": "ok", "dataset_version": self.dataset_version}
+        if self._df is None:
+            payload["memory"] = get_dataset().memory_report()
+        payload["llm"] = get_caller().snapshot()
+        limiter = get_limiter()
+        if limiter is not None:
+            payload["rate_limit"] = limiter.stats()
+        return payload
+
+    def regions(self, query):
+        metric = self._column(query.get("metric"), "life_ladder")
+        data = aggregates.regional_averages(self.df, metric, self._int(query.get("year"), "year"))
+        return {"metric": metric, "regions": _records(data)}
+
+    def top(self, query):
+        metric = self._column(query.get("metric"), "life_ladder")
+        n = min(self._count(query.get("n"), "n", 10), MAX_ROWS)
+        ascending = query.get("order", "desc") == "asc"
+        data = aggregates.top_countries(self.df, metric, n, self._int(query.get("year"), "year"), ascending)
+        return {"metric": metric, "countries": _records(data)}
+
+    def rows(self, query):
+        columns = [self._column(c) for c in query["columns"].split(",")] if query.get("columns") else None
+        data = aggregates.filter_rows(self.df, query.get("country"), query.get("region"),
+                                      self._int(query.get("year"), "year"), columns)
+        limit = min(self._count(query.get("limit"), "limit", 100), MAX_ROWS)
+        offset = self._count(query.get("offset"), "offset", 0)
+        return {"total": len(data), "offset": offset, "rows": _records(data.iloc[offset:offset + limit])}
+
+    def trends(self, query):
+        metric = self._column(query.get("metric"), "life_ladder")
+        data = aggregates.yearly_trend(self.df, metric, query.get("country"), query.get("region"))
+        return {"metric": metric, "trend": _records(data)}
+
+    def correlations(self, query):
+        factors = query.get("factors", "life_ladder,gdp_per_capita,social_support,freedom_to_make_life_choices")
+        factors = tuple(self._column(f) for f in factors.split(","))
+        corr = aggregates.correlation_matrix(self.df, factors)
+        return {"factors": list(factors), "matrix": np.round(corr.to_numpy(), 4).tolist()}
+
+    def ranks(self, query):
+        country = query.get("country")
+        if not country:
+            raise HTTPError(400, "country parametresi zorunlu")
+        metric = self._column(query.get("metric"), "life_ladder")
+        try:
+            found = rankings.rank_index(self.df).rank(country, metric, self._int(query.get("year"), "year"),
+                                                      query.get("group", rankings.GLOBAL))
+        except rankings.RankError as e:
+            raise HTTPError(400, str(e))
+        if found is None:
+            raise HTTPError(404, f"{country} için {metric} sıralaması yok")
+        return found
+
+    def rank_changes(self, query):
+        metric = self._column(query.get("metric"), "life_ladder")
+        index = rankings.rank_index(self.df)
+        year_to = self._int(query.get("to"), "to", int(index.panel.years[-1]))
+        year_from = self._int(query.get("from"), "from", year_to - 1)
+        n = min(self._count(query.get("n"), "n", 10), MAX_ROWS)
+        try:
+            data = index.changes(metric, year_from, year_to, query.get("group", rankings.GLOBAL))
+        except rankings.RankError as e:
+            raise HTTPError(400, str(e))
+        return {"metric": metric, "from": year_from, "to": year_to,
+                "risers": _records(data.head(n)), "fallers": _records(data.tail(n).iloc[::-1])}
+
+    def benchmarks(self, query):
+        country = query.get("country")
+        if not country:
+            raise HTTPError(400, "country parametresi zorunlu")
+        data = benchmarks.benchmarks(self.df).benchmark(country, self._int(query.get("year"), "year"))
+        if data.empty:
+            raise HTTPError(404, f"{country} için karşılaştırma verisi yok")
+        if query.get("dimension"):
+            data = data[data["dimension"] == query["dimension"]]
+        return {"country": country, "benchmarks": _records(data)}
+
+    def scenario_model(self, query):
+        model = scenarios.fit_model(self.df)
+        return {"r2": model.r2, "observations": model.n_obs, "countries": model.n_countries,
+                "log_factors": [f for f in model.factors if f in LOG_METRICS], "coefficients": _records(model.summary())}
+
+    async def simulate_scenarios(self, body):
+        try:
+            request = json.loads(body or b"{}")
+            specs = request.get("scenarios") or ({"senaryo": request["changes"]} if request.get("changes") else None)
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            raise HTTPError(400, "Geçersiz JSON gövdesi")
+        if not isinstance(specs, dict) or not specs:
+            raise HTTPError(400, "scenarios ya da changes alanı zorunlu")
+        if len(specs) > MAX_SCENARIOS:
+            raise HTTPError(400, f"En fazla {MAX_SCENARIOS} senaryo gönderilebilir")
+        year = self._int(request.get("year"), "year")
+        try:
+            result = await asyncio.to_thread(scenarios.simulate, self.df, specs, request.get("countries"), year)
+        except scenarios.ScenarioError as e:
+            raise HTTPError(400, str(e))
+        summary = result.groupby("scenario", sort=False)["delta"].agg(["mean", "min", "max"]).reset_index()
+        payload = {"dataset_version": self.dataset_version, "summary": _records(summary)}
+        if not request.get("summary_only"):
+            payload["results"] = _records(result)
+        return payload
+
+    async def run_query(self, body):
+        try:
+            request = json.loads(body or b"{}")
+            sql = (request.get("sql") or "").strip()
+        except (json.JSONDecodeError, AttributeError):
+            raise HTTPError(400, "Geçersiz JSON gövdesi")
+        if not sql:
+            raise HTTPError(400, "sql alanı zorunlu")
+        engine = get_engine(self.df)
+        try:
+            frame, truncated = await asyncio.to_thread(engine.run, sql, self._int(request.get("limit"), "limit"))
+        except QueryError as e:
+            raise HTTPError(400, str(e))
+        # Sütun adları tekrarlanabildiği için satırlar liste olarak döner
+        return {"columns": list(frame.columns), "rows": json.loads(frame.to_json(orient="values")),
+                "truncated": truncated}
+
+    def _question(self, body):
+        try:
+            question = (json.loads(body or b"{}").get("question") or "").strip()
+        except (json.JSONDecodeError, AttributeError):
+            raise HTTPError(400, "Geçersiz JSON gövdesi")
+        if not question:
+            raise HTTPError(400, "question alanı zorunlu")
+        return question
+
+    async def answer(self, body):
+        question = self._question(body)
+        # Sıralama soruları LLM'e gitmeden indeksten yanıtlanır
+        ranked = rankings.rank_answer(self.df, question)
+        if ranked is not None:
+            return {"question": question, "agent_type": "rank", "answer": ranked, "charts": []}
+        system = self.system
+        text = await asyncio.to_thread(system.get_answer, question)
+        return {
+            "question": question,
+            "agent_type": system.route_question(question),
+            "answer": text,
+            "charts": extract_chart_specs(text, self.df['country_name'].unique().tolist()),
+        }
+
+    async def answer_stream(self, body, send):
+        question = self._question(body)
+        system = self.system
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        done = object()
+
+        def produce():
+            # Senkron LLM akışını thread'de tüketip olay döngüsüne aktar
+            try:
+                for chunk in system.stream_answer(question):
+                    loop.call_soon_threadsafe(queue.put_nowait, ("chunk", chunk))
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, ("error", f"{type(e).__name__}: {e}"))
+            loop.call_soon_threadsafe(queue.put_nowait, (done, None))
+
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"),
+            (b"cache-control", b"no-cache"),
+        ]})
+        await _send_event(send, "meta", {"agent_type": system.route_question(question)})
+        loop.run_in_executor(None, produce)
+        while True:
+            kind, payload = await queue.get()
+            if kind is done:
+                break
+            await _send_event(send, kind, {"text": payload} if kind == "chunk" else {"error": payload})
+        await _send_event(send, "done", {})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    # -- ASGI ----------------------------------------------------------------
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    if self._df is None:
+                        # Veri dosyası değişince yeni sürüm yeniden başlatmadan devreye girer
+                        await asyncio.to_thread(lambda: get_manager().start_watching())
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    if self._df is None:
+                        get_manager().stop_watching()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+        handler = self.routes.get((method, path))
+        try:
+            if handler is None:
+                known = any(p == path for _, p in self.routes)
+                raise HTTPError(405 if known else 404, "Desteklenmeyen yöntem" if known else "Bulunamadı")
+            if method == "POST":
+                body = await _read_body(receive)
+                if handler == self.answer_stream:
+                    return await handler(body, send)
+                payload, etag = await handler(body), None
+            else:
+                query = {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+                etag = self._etag(path, query) if path.startswith("/v1/") else None
+                if etag and etag in _split_etags(headers.get("if-none-match", "")):
+                    return await _respond(send, 304, b"", headers, etag=etag)
+                payload = await asyncio.to_thread(handler, query)
+        except HTTPError as e:
+            return await _respond(send, e.status, _dumps({"error": e.message}), headers)
+        except Exception as e:
+            return await _respond(send, 500, _dumps({"error": f"{type(e).__name__}: {e}"}), headers)
+        await _respond(send, 200, _dumps(payload), headers, etag=etag)
+
+    def _etag(self, path, query):
+        key = f"{self.dataset_version}|{path}|{sorted(query.items())}"
+        return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+
+def _dumps(payload):
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _split_etags(value):
+    return {tag.strip() for tag in value.split(",") if tag.strip()}
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def _respond(send, status, body, request_headers, etag=None):
+    headers = [(b"content-type", b"application/json; charset=utf-8")]
+    if etag:
+        headers += [(b"etag", etag.encode()), (b"cache-control", b"public, max-age=0, must-revalidate")]
+    if len(body) >= GZIP_MIN_SIZE and "gzip" in request_headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=5)
+        headers += [(b"content-encoding", b"gzip"), (b"vary", b"accept-encoding")]
+    headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_event(send, event, data):
+    message = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    await send({"type": "http.response.body", "body": message.encode("utf-8"), "more_body": True})
+
+
+app = HappyAPI()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="happyGPT HTTP/JSON API sunucusu.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError:
+        print("Sunucu için uvicorn gerekli: pip install uvicorn", file=sys.stderr)
+        return 1
+    # Paylaşılan veri setinin oturum kopyaları yerinde yazımla onu değiştiremesin
+    pd.set_option("mode.copy_on_write", True)
+    uvicorn.run(app, host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Soru dosyası üzerinden toplu yanıt üretimi.
+
+Kullanım (src/ dizininden):
+    python -m happygpt.batch sorular.jsonl -o yanitlar.jsonl --workers 4
+
+Girdi JSONL (her satırda {"question": ..., "id": ...}) ya da `question`
+(isteğe bağlı `id`) sütunlu CSV olabilir. Çıktıya her soru tamamlandıkça bir
+satır eklenir; yeniden çalıştırıldığında başarıyla tamamlanmış soruları atlar.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from tenacity import Retrying, stop_after_attempt, wait_exponential
+
+from .agents import MultiAgentSystem
+from .charts import extract_chart_specs
+from .dataset import get_dataset
+from .resilience import DEGRADED_ERRORS
+
+
+def question_id(question):
+    """Soru metninden kararlı kısa kimlik üret."""
+    return hashlib.sha1(question.strip().encode("utf-8")).hexdigest()[:12]
+
+
+def read_questions(path):
+    """JSONL veya CSV dosyasından (id, soru) çiftlerini oku."""
+    path = Path(path)
+    items = []
+    with path.open(encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            question = (row.get("question") or "").strip()
+            if question:
+                items.append((str(row.get("id") or question_id(question)), question))
+    return items
+
+
+def completed_ids(output_path):
+    """Çıktı dosyasında başarıyla tamamlanmış soruların kimlikleri."""
+    done = set()
+    path = Path(output_path)
+    if not path.exists():
+        return done
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Yarıda kesilmiş son satır
+            if record.get("status") == "ok":
+                done.add(record["id"])
+    return done
+
+
+def _terminate_partial_line(output_path):
+    """Kesintide yarım kalan son satırı yeni kayıtlardan ayır."""
+    path = Path(output_path)
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    with path.open("rb+") as f:
+        f.seek(-1, 2)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def answer_question(system, item_id, question, valid_countries, max_attempts=3):
+    """Tek soruyu yeniden deneme ile yanıtla ve çıktı kaydını döndür."""
+    agent_type = system.route_question(question)
+    record = {"id": item_id, "question": question, "agent_type": agent_type}
+    start = time.perf_counter()
+    attempts = 0
+    try:
+        for attempt in Retrying(stop=stop_after_attempt(max_attempts),
+                                wait=wait_exponential(multiplier=1, min=1, max=30),
+                                reraise=True):
+            with attempt:
+                attempts += 1
+                answer = system.get_answer(question, allow_fallback=False)
+        record.update(status="ok", answer=answer, charts=extract_chart_specs(answer, valid_countries))
+    except DEGRADED_ERRORS as e:
+        # LLM devre dışı/hız sınırında: yer tutucu yanıt kaydedilmez, sonraki çalıştırmada yeniden denenir
+        record.update(status="fallback", error=f"{type(e).__name__}: {e}")
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record.update(attempts=attempts, elapsed_s=round(time.perf_counter() - start, 3))
+    return record
+
+
+def run_batch(input_path, output_path, workers=4, max_attempts=3, df=None):
+    """Soruları sınırlı eşzamanlılıkla yanıtla; (başarılı, hatalı, atlanan) sayılarını döndür."""
+    items = read_questions(input_path)
+    done = completed_ids(output_path)
+    pending = [(i, q) for i, q in items if i not in done]
+
+    df = get_dataset().frame if df is None else df
+    system = MultiAgentSystem(df)
+    valid_countries = df['country_name'].unique().tolist()
+
+    ok = failed = 0
+    write_lock = threading.Lock()
+    _terminate_partial_line(output_path)
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(answer_question, system, i, q, valid_countries, max_attempts) for i, q in pending]
+        for future in as_completed(futures):
+            record = future.result()
+            with write_lock:
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+            if record["status"] == "ok":
+                ok += 1
+            else:
+                failed += 1
+            print(f"[{ok + failed}/{len(pending)}] {record['status']} {record['id']} ({record['elapsed_s']}s)",
+                  file=sys.stderr)
+    return ok, failed, len(items) - len(pending)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soru dosyasını toplu olarak yanıtla.")
+    parser.add_argument("input", help="Sorular (.jsonl veya .csv)")
+    parser.add_argument("-o", "--output", required=True, help="Yanıtların ekleneceği JSONL dosyası")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Eşzamanlı istek sayısı")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Soru başına deneme sayısı")
+    args = parser.parse_args(argv)
+
+    ok, failed, skipped = run_batch(args.input, args.output, args.workers, args.max_attempts)
+    print(f"Tamamlandı: {ok} başarılı, {failed} hatalı, {skipped} atlandı.", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
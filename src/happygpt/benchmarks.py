@@ -0,0 +1,191 @@
+"""Akran grubu karşılaştırmaları (benchmarking).
+
+Her ülke × yıl için her metrikte akran grubunun ortalamasına, medyanına ve
+liderine olan fark hesaplanır. Akran grupları: bölge, kıta, gelir düzeyi
+(o yılın GDP'sine göre) ve G20/OECD/BRICS; üyelik satır bazındadır, yani bir
+ülkenin grubu yıldan yıla değişebilir. Her boyutun istatistikleri tek bir
+(grup, ülke, yıl, metrik) maskeli dizi üzerinde indirgenir; farklar tüm
+boyutlar için istatistiklerin ülke × yıl hücrelerine geri yayınlanmasıyla
+tek işlemde elde edilir. Lider, metrik yönüne göre en iyi değerdir
+(işsizlik, yolsuzluk algısı ve olumsuz duygularda en düşük). Sonuçlar veri
+sürümü başına bir kez hesaplanır.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .countries import dataset_alias_index, extract_entities
+from .panel import get_panel
+from .schema import MEMBERSHIP_GROUPS, METRICS, TARGET
+
+METRIC_LABELS = {
+    'life_ladder': 'Mutluluk', 'gdp_per_capita': 'GDP', 'social_support': 'Sosyal Destek',
+    'life_expectancy': 'Yaşam Beklentisi', 'freedom_to_make_life_choices': 'Özgürlük', 'generosity': 'Cömertlik',
+    'perceptions_of_corruption': 'Yolsuzluk Algısı', 'internet_users_percent': 'İnternet Kullanımı',
+    'unemployment_rate': 'İşsizlik', 'positive_affect': 'Olumlu Duygular', 'negative_affect': 'Olumsuz Duygular',
+    'health_expenditure_per_capita': 'Sağlık Harcaması',
+}
+# Düşük değerin daha iyi olduğu metrikler (lider en düşük değerdir)
+LOWER_IS_BETTER = {'unemployment_rate', 'perceptions_of_corruption', 'negative_affect'}
+
+# Boyut -> sütun; üyelik blokları tek gruplu boyutlardır
+DIMENSIONS = {'region': 'regional_indicator', 'continent': 'continent', 'income': 'income_level',
+              **{name: column for column, name in MEMBERSHIP_GROUPS.items()}}
+DIMENSION_LABELS = {'region': 'Bölge', 'continent': 'Kıta', 'income': 'Gelir düzeyi',
+                    **{name: name for name in MEMBERSHIP_GROUPS.values()}}
+STATISTICS = ('mean', 'median', 'leader')
+
+BENCHMARK_COLUMNS = ['dimension', 'group', 'metric', 'value', 'mean', 'median', 'leader', 'leader_value',
+                     'gap_mean', 'gap_median', 'gap_leader', 'z', 'n']
+
+# Soruda bu kelimeler geçerse agent bağlamına akran grubu farkları eklenir
+BENCHMARK_WORDS = ("karşılaştır", "kıyasla", "benchmark", "akran", "lider", "geride", "açık", "gap",
+                   "g20", "oecd", "brics", "gelir düzeyi", "bölge ortalaması")
+
+
+def _group_codes(df, panel, column):
+    """(ülke, yıl) grup kodları (-1: grupsuz) ve grup adları."""
+    country_idx = df['country_name'].astype(str).map(panel.country_index).to_numpy()
+    year_idx = df['year'].to_numpy(dtype=int) - panel.years[0]
+    codes = np.full(panel.observed.shape, -1)
+    if column in MEMBERSHIP_GROUPS:
+        member = df[column].to_numpy() == 1
+        codes[country_idx[member], year_idx[member]] = 0
+        return codes, np.array([MEMBERSHIP_GROUPS[column]], dtype=object)
+    values, labels = pd.factorize(df[column].astype(object), sort=True)
+    codes[country_idx, year_idx] = values  # Eksik değerler zaten -1
+    return codes, np.asarray(labels, dtype=object)
+
+
+def group_statistics(values, codes, n_groups, direction):
+    """(grup, yıl, metrik) ortalama, medyan, std, lider değeri, lider ülke indeksi ve gözlem sayısı."""
+    mask = codes[None] == np.arange(n_groups)[:, None, None]  # (grup, ülke, yıl)
+    grouped = np.where(mask[..., None], values[None], np.nan)  # (grup, ülke, yıl, metrik)
+    count = np.sum(~np.isnan(grouped), axis=1)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # Boş gruplar
+        mean = np.nanmean(grouped, axis=1)
+        median = np.nanmedian(grouped, axis=1)
+        std = np.nanstd(grouped, axis=1, ddof=1)
+    oriented = np.where(np.isnan(grouped), -np.inf, grouped * direction)
+    leader = np.argmax(oriented, axis=1)
+    leader_value = np.take_along_axis(grouped, leader[:, None], axis=1)[:, 0]
+    return {'mean': mean, 'median': median, 'std': std, 'leader': leader,
+            'leader_value': leader_value, 'count': count}
+
+
+class Benchmarks:
+    """Boyut başına grup istatistikleri ve (boyut, istatistik, ülke, yıl, metrik) farkları."""
+
+    def __init__(self, df: pd.DataFrame, panel=None, metrics=tuple(METRICS)):
+        self.panel = panel if panel is not None else get_panel(df)
+        self.metrics = [m for m in metrics if m in self.panel.metric_index]
+        self.metric_index = {name: i for i, name in enumerate(self.metrics)}
+        values = self.panel.values[:, :, [self.panel.metric_index[m] for m in self.metrics]]
+        direction = np.array([-1.0 if m in LOWER_IS_BETTER else 1.0 for m in self.metrics])
+
+        self.dimensions = [dim for dim, column in DIMENSIONS.items() if column in df.columns]
+        self.codes, self.labels, self.stats = {}, {}, {}
+        for dim in self.dimensions:
+            codes, labels = _group_codes(df, self.panel, DIMENSIONS[dim])
+            self.codes[dim], self.labels[dim] = codes, labels
+            self.stats[dim] = group_statistics(values, codes, len(labels), direction)
+
+        # Grup istatistiklerini her hücreye geri yayınla: (boyut, istatistik, ülke, yıl, metrik)
+        year_idx = np.arange(len(self.panel.years))[None, :]
+        reference = np.stack([
+            np.stack([self.stats[dim][key][np.clip(self.codes[dim], 0, None), year_idx] for key in
+                      ('mean', 'median', 'leader_value')])
+            for dim in self.dimensions
+        ])
+        in_group = np.stack([self.codes[dim] >= 0 for dim in self.dimensions])[:, None, :, :, None]
+        self.reference = np.where(in_group, reference, np.nan)
+        self.gaps = values[None, None] - self.reference
+
+    def benchmark(self, country, year=None, metrics=None):
+        """Ülkenin her akran grubundaki farkları (BENCHMARK_COLUMNS); yıl verilmezse son gözlem yılı."""
+        if country not in self.panel.country_index:
+            return pd.DataFrame(columns=BENCHMARK_COLUMNS)
+        c = self.panel.country_index[country]
+        if year is None:
+            observed = self.panel.years[self.panel.observed[c]]
+            if not len(observed):
+                return pd.DataFrame(columns=BENCHMARK_COLUMNS)
+            year = observed[-1]
+        if int(year) not in self.panel.year_index:
+            return pd.DataFrame(columns=BENCHMARK_COLUMNS)
+        y = self.panel.year_index[int(year)]
+        metrics = [m for m in (metrics or self.metrics) if m in self.metric_index]
+        m_idx = [self.metric_index[m] for m in metrics]
+
+        rows = []
+        for d, dim in enumerate(self.dimensions):
+            code = self.codes[dim][c, y]
+            if code < 0:
+                continue
+            stats = self.stats[dim]
+            leaders = self.panel.countries[stats['leader'][code, y, m_idx]]
+            gaps = self.gaps[d, :, c, y][:, m_idx]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                z = gaps[0] / stats['std'][code, y, m_idx]
+            rows.append(pd.DataFrame({
+                'dimension': dim,
+                'group': self.labels[dim][code],
+                'metric': metrics,
+                'value': self.panel.values[c, y, [self.panel.metric_index[m] for m in metrics]],
+                'mean': stats['mean'][code, y, m_idx],
+                'median': stats['median'][code, y, m_idx],
+                'leader': np.where(stats['count'][code, y, m_idx] > 0, leaders, None),
+                'leader_value': stats['leader_value'][code, y, m_idx],
+                'gap_mean': gaps[0],
+                'gap_median': gaps[1],
+                'gap_leader': gaps[2],
+                'z': z,
+                'n': stats['count'][code, y, m_idx],
+            }))
+        if not rows:
+            return pd.DataFrame(columns=BENCHMARK_COLUMNS)
+        return pd.concat(rows, ignore_index=True).dropna(subset=['value']).reset_index(drop=True)
+
+
+@memoize(maxsize=4)
+def benchmarks(df: pd.DataFrame) -> Benchmarks:
+    """Veri sürümü başına bir kez hesaplanan akran grubu farkları."""
+    return Benchmarks(df)
+
+
+def oriented_z(table):
+    """Metrik yönüne göre işaretlenmiş z (pozitif: grup ortalamasından iyi)."""
+    return table['z'] * np.where(table['metric'].isin(LOWER_IS_BETTER), -1.0, 1.0)
+
+
+def question_context(df: pd.DataFrame, question: str, limit=3):
+    """Karşılaştırma sorularına bahsedilen ülkelerin akran gruplarındaki konumu ve en büyük açıkları."""
+    lowered = question.lower()
+    if not any(word in lowered for word in BENCHMARK_WORDS):
+        return None
+    countries = [name for kind, name, _ in extract_entities(question, dataset_alias_index(df)) if kind == "country"]
+    if not countries:
+        return None
+    result = benchmarks(df)
+    lines = []
+    for country in countries:
+        table = result.benchmark(country)
+        if table.empty:
+            continue
+        year = int(result.panel.years[result.panel.observed[result.panel.country_index[country]]][-1])
+        for row in table[table['metric'] == TARGET].itertuples():
+            lines.append(f"- {country} {year}, {DIMENSION_LABELS[row.dimension]} ({row.group}, {row.n} ülke): "
+                         f"mutluluk {row.value:.2f}; grup ortalaması {row.mean:.2f} (fark {row.gap_mean:+.2f}), "
+                         f"medyan {row.median:.2f}, lider {row.leader} {row.leader_value:.2f} (fark {row.gap_leader:+.2f})")
+        region = table[(table['dimension'] == 'region') & (table['metric'] != TARGET)]
+        region = region.assign(score=oriented_z(region)).dropna(subset=['score'])
+        if len(region):
+            gaps = region.nsmallest(limit, 'score')
+            lines.append(f"- {country}, bölge ortalamasına göre en büyük açıklar (std cinsinden, yön düzeltilmiş): "
+                         + ", ".join(f"{r.metric} {r.score:+.2f} (değer {r.value:.3g}, ort. {r.mean:.3g}, "
+                                     f"lider {r.leader} {r.leader_value:.3g})" for r in gaps.itertuples()))
+    return "\n".join(lines) or None
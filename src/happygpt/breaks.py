@@ -0,0 +1,393 @@
+"""Yapısal kırılma ve eşik etkisi tespiti (toplu iş).
+
+Kırılmalar: her ülke × metrik serisi PELT ile parçalara ayrılır. İki maliyet
+modeli vardır: "mean" (parça başına sabit ortalama) ve "linear" (parça başına
+doğrusal trend). Parça maliyetleri birikimli toplamlardan O(1) hesaplanır;
+ceza, serinin birinci farklarının MAD'inden kestirilen gürültü varyansıyla
+BIC benzeri ölçeklenir.
+
+Eşikler: her faktör için life_ladder ~ faktör ilişkisinin iki doğrusal
+rejime ayrıldığı eşik, sıralı birikimli toplamlarla tüm olası noktalarda
+aynı anda aranır. Anlamlılık, doğrusal (eşiksiz) model altında ülke kümeli
+wild bootstrap ile sınanır; tüm bootstrap örnekleri tek dizide hesaplanır.
+
+Metrikler ve faktörler süreç havuzunda işlenir; sonuçlar veri sürümüyle
+birlikte diske yazılır ve (ülke, metrik) indeksleriyle sorgulanır.
+
+Kullanım (src/ dizininden):
+    python -m happygpt.breaks [--workers 4]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .cache import VersionedStore, frame_fingerprint
+from .countries import dataset_alias_index, extract_entities
+from .panel import get_panel
+from .schema import MODEL_FACTORS, TARGET
+
+METRICS = [TARGET, *MODEL_FACTORS, 'positive_affect', 'negative_affect']
+THRESHOLD_FACTORS = [*MODEL_FACTORS, 'health_expenditure_per_capita']
+COSTS = ("mean", "linear")
+# Sürekli artan/azalan metriklerde ortalama modeli her yılı kırılma sayar; bunlar eğimle modellenir
+TRENDING_METRICS = {'gdp_per_capita', 'life_expectancy', 'internet_users_percent'}
+MIN_SIZE = {"mean": 3, "linear": 4}
+# Parça başına parametre sayısı; ceza = PENALTY_SCALE · (parametre + 1) · σ² · log(n)
+COST_PARAMS = {"mean": 1, "linear": 2}
+# Farklardan kestirilen σ² otokorelasyonlu serilerde düşük kalır; ceza buna göre büyütülür
+PENALTY_SCALE = 2.0
+
+THRESHOLD_TRIM = 0.15
+N_BOOTSTRAP = 499
+RANDOM_STATE = 42
+
+BREAK_COLUMNS = ['country_name', 'metric', 'cost', 'year', 'before', 'after', 'change', 'magnitude',
+                 'slope_before', 'slope_after']
+
+# Soruda bu kelimeler geçerse agent bağlamına kırılmalar ve eşikler eklenir
+BREAK_WORDS = ("kırılma", "kirilma", "eşik", "esik", "threshold", "değişim noktası", "ani", "kopuş", "şok")
+
+
+def segment_costs(t, x, cost):
+    """(başlangıçlar, bitiş) -> parça maliyetleri fonksiyonu; maliyet parça içi artık kareler toplamı."""
+    zero = np.zeros(1)
+    s1 = np.concatenate([zero, np.cumsum(np.ones_like(x))])
+    sx = np.concatenate([zero, np.cumsum(x)])
+    sxx = np.concatenate([zero, np.cumsum(x * x)])
+    if cost == "mean":
+        def evaluate(starts, end):
+            n = s1[end] - s1[starts]
+            total = sx[end] - sx[starts]
+            return (sxx[end] - sxx[starts]) - total * total / n
+        return evaluate
+
+    t = t - t.mean()
+    st = np.concatenate([zero, np.cumsum(t)])
+    stt = np.concatenate([zero, np.cumsum(t * t)])
+    stx = np.concatenate([zero, np.cumsum(t * x)])
+
+    def evaluate(starts, end):
+        n = s1[end] - s1[starts]
+        sum_t, sum_x = st[end] - st[starts], sx[end] - sx[starts]
+        ctt = (stt[end] - stt[starts]) - sum_t * sum_t / n
+        ctx = (stx[end] - stx[starts]) - sum_t * sum_x / n
+        cxx = (sxx[end] - sxx[starts]) - sum_x * sum_x / n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(ctt > 0, cxx - ctx * ctx / ctt, cxx)
+    return evaluate
+
+
+def pelt(evaluate, n, penalty, min_size):
+    """PELT ile en iyi bölümleme; kırılma indeksleri (yeni parçanın ilk elemanı)."""
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    previous = np.zeros(n + 1, dtype=int)
+    candidates = np.array([0])
+    pruned = {}
+    for end in range(min_size, n + 1):
+        if end in pruned:
+            candidates = np.setdiff1d(candidates, pruned.pop(end), assume_unique=True)
+        if end - min_size >= min_size:
+            candidates = np.append(candidates, end - min_size)
+        values = best[candidates] + evaluate(candidates, end)
+        i = int(np.argmin(values))
+        best[end] = values[i] + penalty
+        previous[end] = candidates[i]
+        # Budama: bundan sonra hiçbir zaman en iyi olamayacak başlangıçlar atılır. En küçük parça
+        # uzunluğu nedeniyle `end`de biten bölümleme ancak min_size adım sonra kullanılabilir;
+        # budama da o zaman uygulanır.
+        pruned[end + min_size] = candidates[values > best[end]]
+
+    breaks, end = [], n
+    while end > 0:
+        end = previous[end]
+        if end > 0:
+            breaks.append(end)
+    return sorted(breaks)
+
+
+def noise_variance(x):
+    """Birinci farkların MAD'inden gürültü varyansı (kırılmalara dayanıklı)."""
+    diffs = np.diff(x)
+    if len(diffs) == 0:
+        return 0.0
+    mad = np.median(np.abs(diffs - np.median(diffs)))
+    return float((1.4826 * mad) ** 2 / 2)
+
+
+def detect_breaks(years, values, cost="mean"):
+    """Tek seride kırılmalar: [(yıl, önceki parça, sonraki parça)], parça = (düzey, eğim)."""
+    mask = ~np.isnan(values)
+    t, x = years[mask].astype('float64'), values[mask]
+    min_size = MIN_SIZE[cost]
+    if len(x) < 2 * min_size:
+        return []
+    # Çok düzgün serilerde sıfıra yakın varyans her noktayı kırılma yapmasın
+    sigma2 = max(noise_variance(x), 1e-3 * float(np.var(x)), 1e-12)
+    penalty = PENALTY_SCALE * (COST_PARAMS[cost] + 1) * sigma2 * np.log(len(x))
+    indices = pelt(segment_costs(t, x, cost), len(x), penalty, min_size)
+
+    bounds = [0, *indices, len(x)]
+    fits = [np.polyfit(t[start:end], x[start:end], 1) if cost == "linear" else (np.nan, x[start:end].mean())
+            for start, end in zip(bounds[:-1], bounds[1:])]
+    result = []
+    for j, i in enumerate(indices):
+        (slope_a, level_a), (slope_b, level_b) = fits[j], fits[j + 1]
+        if cost == "linear":
+            # Eğim modelinde önce/sonra, iki parçanın kırılma yılındaki tahminleridir (sıçrama)
+            level_a, level_b = slope_a * t[i] + level_a, slope_b * t[i] + level_b
+        result.append((int(t[i]), (float(level_a), float(slope_a)), (float(level_b), float(slope_b))))
+    return result
+
+
+def cost_for(metric):
+    return "linear" if metric in TRENDING_METRICS else "mean"
+
+
+def _metric_task(task):
+    """Bir metriğin tüm ülke serileri (işçi süreçte çalışır)."""
+    metric, countries, years, matrix = task
+    cost = cost_for(metric)
+    # Büyüklük, değişimin metriğin ülkeler arası tipik yıllık oynaklığına oranı
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # Tek gözlemli ülkeler
+        scale = np.nanmedian(np.nanstd(np.diff(matrix, axis=1), axis=1))
+    rows = []
+    for country, values in zip(countries, matrix):
+        for year, (before, slope_before), (after, slope_after) in detect_breaks(years, values, cost):
+            rows.append((country, metric, cost, year, before, after, after - before, (after - before) / scale,
+                         slope_before, slope_after))
+    return rows
+
+
+def _split_ssr(x_sorted, Y):
+    """Her bölme noktası k için (ilk k | kalan) iki doğrusal rejimin SSR'ı; Y (örnek × n)."""
+    def centered(n, s_a, s_b, s_ab):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return s_ab - s_a * s_b / n
+
+    n = len(x_sorted)
+    k = np.arange(1, n)
+    cx, cxx = np.cumsum(x_sorted)[:-1], np.cumsum(x_sorted ** 2)[:-1]
+    cy, cyy, cxy = np.cumsum(Y, axis=1)[:, :-1], np.cumsum(Y ** 2, axis=1)[:, :-1], np.cumsum(Y * x_sorted, axis=1)[:, :-1]
+    tx, txx = x_sorted.sum(), (x_sorted ** 2).sum()
+    ty, tyy, txy = Y.sum(axis=1, keepdims=True), (Y ** 2).sum(axis=1, keepdims=True), (Y * x_sorted).sum(axis=1, keepdims=True)
+
+    def ssr(n_, sx, sxx, sy, syy, sxy):
+        vxx, vyy, vxy = centered(n_, sx, sx, sxx), centered(n_, sy, sy, syy), centered(n_, sx, sy, sxy)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return vyy - np.where(vxx > 0, vxy * vxy / vxx, 0.0)
+
+    left = ssr(k, cx, cxx, cy, cyy, cxy)
+    right = ssr(n - k, tx - cx, txx - cxx, ty - cy, tyy - cyy, txy - cxy)
+    return left + right
+
+
+def threshold_effect(x, y, clusters, n_boot=N_BOOTSTRAP, seed=RANDOM_STATE, trim=THRESHOLD_TRIM):
+    """Tek faktör için en iyi eşik ve wild bootstrap p-değeri; uygun değilse None."""
+    mask = ~np.isnan(x) & ~np.isnan(y)
+    x, y, clusters = x[mask], y[mask], clusters[mask]
+    n = len(x)
+    if n < 20:
+        return None
+    order = np.argsort(x, kind='stable')
+    x_s, y_s, c_s = x[order], y[order], clusters[order]
+
+    # Yalnızca farklı değerler arasında ve kırpılmış aralıkta bölünür
+    k = np.arange(1, n)
+    allowed = (x_s[:-1] < x_s[1:]) & (k >= trim * n) & (k <= (1 - trim) * n)
+    if not allowed.any():
+        return None
+
+    slope, intercept = np.polyfit(x_s, y_s, 1)
+    fitted = intercept + slope * x_s
+    residuals = y_s - fitted
+    ssr0 = float(residuals @ residuals)
+
+    rng = np.random.default_rng(seed)
+    _, cluster_ids = np.unique(c_s, return_inverse=True)
+    signs = rng.choice([-1.0, 1.0], size=(n_boot, cluster_ids.max() + 1))[:, cluster_ids]
+    Y = np.vstack([y_s, fitted + signs * residuals])
+    ssr_null = np.concatenate([[ssr0], ((Y[1:] - np.polyval(np.polyfit(x_s, Y[1:].T, 1), x_s[:, None]).T) ** 2).sum(axis=1)])
+
+    # Merkezleme SSR'ı değiştirmez, büyük ölçekli faktörlerde (GDP) birikimli toplamların hassasiyetini korur
+    ssr1 = np.where(allowed, _split_ssr(x_s - x_s.mean(), Y - Y.mean(axis=1, keepdims=True)), np.inf)
+    best = ssr1.argmin(axis=1)
+    ssr_min = ssr1[np.arange(len(Y)), best]
+    f_stats = (ssr_null - ssr_min) / 2 / (ssr_min / (n - 4))
+
+    split = best[0] + 1
+    below, above = slice(0, split), slice(split, n)
+    return {
+        'threshold': float((x_s[split - 1] + x_s[split]) / 2),
+        'slope_below': float(np.polyfit(x_s[below], y_s[below], 1)[0]),
+        'slope_above': float(np.polyfit(x_s[above], y_s[above], 1)[0]),
+        'n_below': int(split),
+        'n_above': int(n - split),
+        'ssr_reduction': float(1 - ssr_min[0] / ssr0),
+        'f_stat': float(f_stats[0]),
+        'p_value': float((np.sum(f_stats[1:] >= f_stats[0]) + 1) / (n_boot + 1)),
+    }
+
+
+def _threshold_task(task):
+    factor, x, y, clusters = task
+    return factor, threshold_effect(x, y, clusters)
+
+
+def _pool(workers, tasks):
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return None
+    # Streamlit gibi çok thread'li süreçlerde fork yerine spawn daha güvenli
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def compute(df, workers=None):
+    """(kırılmalar DataFrame'i, eşikler DataFrame'i) hesapla."""
+    panel = get_panel(df)
+    metric_tasks = [(m, panel.countries, panel.years, panel.metric(m)) for m in METRICS if m in panel.metric_index]
+    data = df[[TARGET, 'country_name', *[f for f in THRESHOLD_FACTORS if f in df.columns]]]
+    clusters = pd.factorize(data['country_name'])[0]
+    threshold_tasks = [(f, data[f].to_numpy(dtype='float64'), data[TARGET].to_numpy(dtype='float64'), clusters)
+                       for f in THRESHOLD_FACTORS if f in data.columns]
+
+    pool = _pool(workers, metric_tasks)
+    if pool is None:
+        metric_rows = [_metric_task(task) for task in metric_tasks]
+        thresholds = [_threshold_task(task) for task in threshold_tasks]
+    else:
+        with pool:
+            metric_rows = list(pool.map(_metric_task, metric_tasks))
+            thresholds = list(pool.map(_threshold_task, threshold_tasks))
+
+    breaks = pd.DataFrame([row for rows in metric_rows for row in rows], columns=BREAK_COLUMNS)
+    breaks['country_name'] = breaks['country_name'].astype(str)
+    thresholds = pd.DataFrame([{'factor': factor, **result} for factor, result in thresholds if result])
+    return breaks, thresholds
+
+
+class BreakStore(VersionedStore):
+    """Veri seti sürümüne bağlı, diskte saklanan kırılma ve eşik tabloları."""
+
+    FILE_NAME = "breaks.json"
+    THREAD_NAME = "happygpt-break-refresh"
+
+    def __init__(self, path=None):
+        self._set(pd.DataFrame(columns=BREAK_COLUMNS), pd.DataFrame())
+        super().__init__(path)
+
+    def _set(self, breaks, thresholds):
+        self.table = breaks.reset_index(drop=True)
+        self.thresholds = thresholds
+        # (ülke, metrik) ve metrik indeksleri: sorgular tabloyu taramaz
+        self._by_series = self.table.groupby(['country_name', 'metric']).indices if len(self.table) else {}
+        self._by_metric = self.table.groupby('metric').indices if len(self.table) else {}
+
+    def _state(self):
+        return {"breaks": json.loads(self.table.to_json(orient="records")),
+                "thresholds": json.loads(self.thresholds.to_json(orient="records"))}
+
+    def _restore(self, data):
+        self._set(pd.DataFrame(data.get("breaks", []), columns=BREAK_COLUMNS), pd.DataFrame(data.get("thresholds", [])))
+
+    def refresh(self, df, workers=None):
+        """Tüm serileri ve faktörleri yeniden tara ve kaydet; kırılma sayısını döndür."""
+        version = frame_fingerprint(df)
+        breaks, thresholds = compute(df, workers)
+        with self._lock:
+            self.dataset_version = version
+            self._set(breaks, thresholds)
+            self._save()
+        return len(breaks)
+
+    def breaks(self, country=None, metric=None, df=None):
+        """Kırılmalar (yıla göre sıralı); depo bu sürüm için hazır değilse None."""
+        with self._lock:
+            if not self.ready(df):
+                return None
+            if country is not None and metric is not None:
+                rows = self._by_series.get((country, metric), [])
+                result = self.table.iloc[rows]
+            elif metric is not None:
+                result = self.table.iloc[self._by_metric.get(metric, [])]
+                if country is not None:
+                    result = result[result['country_name'] == country]
+            else:
+                result = self.table if country is None else self.table[self.table['country_name'] == country]
+            return result.sort_values('year')
+
+    def largest(self, metric=TARGET, n=10, since=None, df=None):
+        """Büyüklüğü (mutlak) en fazla n kırılma; hazır değilse None."""
+        result = self.breaks(metric=metric, df=df)
+        if result is None:
+            return None
+        if since is not None:
+            result = result[result['year'] >= since]
+        return result.reindex(result['magnitude'].abs().sort_values(ascending=False).index).head(n)
+
+    def threshold_table(self, df=None):
+        with self._lock:
+            return self.thresholds if self.ready(df) else None
+
+
+def get_store() -> BreakStore:
+    """Süreçte paylaşılan kırılma deposu."""
+    return BreakStore.shared()
+
+
+def question_context(df, question):
+    """Kırılma/eşik soruları için agent bağlamı; depo hazır değilse hesaplamayı başlatıp None döner."""
+    lowered = question.lower()
+    if not any(word in lowered for word in BREAK_WORDS):
+        return None
+    store = get_store()
+    if not store.ready(df):
+        store.ensure(df)
+        return None
+    countries = [name for kind, name, _ in extract_entities(question, dataset_alias_index(df)) if kind == "country"]
+    lines = []
+    for country in countries:
+        found = store.breaks(country=country, df=df)
+        for row in found.itertuples():
+            lines.append(f"- {country}, {row.metric}: {row.year} yılında yapısal kırılma "
+                         f"(önceki ortalama {row.before:.3g}, sonraki {row.after:.3g}, değişim {row.change:+.3g})")
+        if found.empty:
+            lines.append(f"- {country}: izlenen metriklerde ortalamada yapısal kırılma tespit edilmedi")
+    if not countries:
+        for row in store.largest(df=df).itertuples():
+            lines.append(f"- {row.country_name}, {row.year}: mutlulukta en büyük kırılmalardan biri "
+                         f"({row.before:.2f} -> {row.after:.2f})")
+    thresholds = store.threshold_table(df)
+    for row in thresholds[thresholds['p_value'] < 0.05].itertuples() if len(thresholds) else []:
+        lines.append(f"- Eşik etkisi, {row.factor}: {row.threshold:.4g} altında eğim {row.slope_below:+.4g}, "
+                     f"üstünde {row.slope_above:+.4g} (F={row.f_stat:.1f}, bootstrap p={row.p_value:.3f})")
+    return "\n".join(lines) or None
+
+
+def main(argv=None):
+    from .dataset import get_dataset
+
+    parser = argparse.ArgumentParser(description="Yapısal kırılmaları ve eşik etkilerini önceden hesapla.")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store = BreakStore()
+    count = store.refresh(get_dataset().frame, args.workers)
+    print(f"{count} kırılma, {len(store.thresholds)} eşik kaydedildi ({time.perf_counter() - start:.1f}s).",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Streamlit'ten bağımsız, süreç içi önbellek yardımcıları.
+
+`st.cache_data` yerine kullanılır: anahtar olarak DataFrame'lerin içerik
+parmak izi kullanılır, böylece aynı veri için tekrar hesaplama yapılmaz.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import weakref
+from functools import wraps
+
+import pandas as pd
+from cachetools import LRUCache, TTLCache
+
+from .config import get_cache_dir
+
+# Tüm memoize önbellekleri (toplu temizleme için)
+_REGISTRY = []
+
+# id(df) -> (weakref, parmak izi); DataFrame hash'lenemediği için id ile tutulur
+_fingerprints = {}
+_fingerprint_lock = threading.Lock()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """DataFrame içeriğinin kısa parmak izini döndür (nesne başına bir kez hesaplanır)."""
+    key = id(df)
+    with _fingerprint_lock:
+        entry = _fingerprints.get(key)
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+
+    digest = hashlib.sha1()
+    digest.update(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    fingerprint = digest.hexdigest()[:16]
+
+    with _fingerprint_lock:
+        _fingerprints[key] = (weakref.ref(df, lambda _ref: _fingerprints.pop(key, None)), fingerprint)
+    return fingerprint
+
+
+def make_key(*args, **kwargs):
+    """Argümanlardan hash'lenebilir önbellek anahtarı üret."""
+    def normalize(value):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return ("frame", frame_fingerprint(value.to_frame() if isinstance(value, pd.Series) else value))
+        if isinstance(value, (list, tuple)):
+            return tuple(normalize(v) for v in value)
+        if isinstance(value, dict):
+            return tuple(sorted((k, normalize(v)) for k, v in value.items()))
+        return value
+
+    return (tuple(normalize(a) for a in args), tuple(sorted((k, normalize(v)) for k, v in kwargs.items())))
+
+
+def _mentions(key, version):
+    """Anahtar (iç içe demetler dahil) verilen veri sürümünü içeriyor mu?"""
+    if isinstance(key, tuple):
+        return any(_mentions(part, version) for part in key)
+    return key == version
+
+
+def memoize(maxsize=128, ttl=None):
+    """Thread-safe LRU/TTL önbellek dekoratörü."""
+    def decorator(func):
+        cache = TTLCache(maxsize, ttl) if ttl else LRUCache(maxsize)
+        lock = threading.RLock()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(*args, **kwargs)
+            with lock:
+                try:
+                    return cache[key]
+                except KeyError:
+                    pass
+            value = func(*args, **kwargs)
+            with lock:
+                cache[key] = value
+            return value
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        def invalidate(version):
+            with lock:
+                stale = [key for key in cache.keys() if _mentions(key, version)]
+                for key in stale:
+                    cache.pop(key, None)
+            return len(stale)
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache_clear
+        wrapper.invalidate = invalidate
+        _REGISTRY.append(wrapper)
+        return wrapper
+
+    return decorator
+
+
+class SharedCache:
+    """Elle doldurulan, thread-safe TTL önbelleği (ör. agent yanıtları)."""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self._cache = TTLCache(maxsize, ttl) if ttl else LRUCache(maxsize)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._cache.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    def cache_clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def invalidate(self, version):
+        """Anahtarında verilen veri sürümü geçen kayıtları sil."""
+        with self._lock:
+            stale = [key for key in self._cache.keys() if _mentions(key, version)]
+            for key in stale:
+                self._cache.pop(key, None)
+        return len(stale)
+
+
+def clear_all():
+    """Kayıtlı tüm önbellekleri temizle."""
+    for wrapper in _REGISTRY:
+        wrapper.cache_clear()
+
+
+def invalidate_version(version):
+    """Eski bir veri sürümüne (parmak izi) bağlı kayıtları tüm önbelleklerden sil.
+
+    Diğer sürümlere ait ve sürümden bağımsız kayıtlar korunur. Silinen kayıt sayısını döndürür.
+    """
+    return sum(entry.invalidate(version) for entry in _REGISTRY)
+
+
+class VersionedStore:
+    """Veri seti sürümüne (parmak izi) bağlı, diskte JSON olarak saklanan sonuç deposu.
+
+    Alt sınıflar `FILE_NAME`, `_state()` (kaydedilecek alanlar), `_restore(data)`
+    ve `refresh(df, ...)` tanımlar; yükleme, atomik kayıt, sürüm kontrolü ve arka
+    planda yenileme burada ortaktır.
+    """
+
+    FILE_NAME = None
+    THREAD_NAME = "happygpt-store-refresh"
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = path or (get_cache_dir() / self.FILE_NAME)
+        self._lock = threading.RLock()
+        self._refreshing = None
+        self.dataset_version = None
+        self._load()
+
+    @classmethod
+    def shared(cls):
+        """Süreçte paylaşılan tek örnek (dashboard, API ve agent'lar aynı sonuçları görür)."""
+        with VersionedStore._instances_lock:
+            if cls not in VersionedStore._instances:
+                VersionedStore._instances[cls] = cls()
+            return VersionedStore._instances[cls]
+
+    def _state(self):
+        raise NotImplementedError
+
+    def _restore(self, data):
+        raise NotImplementedError
+
+    def refresh(self, df, *args):
+        raise NotImplementedError
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        self.dataset_version = data.get("dataset_version")
+        self._restore(data)
+
+    def _save(self):
+        data = {"dataset_version": self.dataset_version, **self._state()}
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, self.path)  # Okuyucular yarım dosya görmesin
+
+    def ready(self, df=None):
+        return self.dataset_version is not None and (df is None or frame_fingerprint(df) == self.dataset_version)
+
+    def ensure(self, df, *args):
+        """Depo bu veri sürümüne ait değilse yenilemeyi arka planda başlat (beklemez)."""
+        if self.ready(df):
+            return None
+        with self._lock:
+            if self._refreshing is not None and self._refreshing.is_alive():
+                return self._refreshing
+            self._refreshing = threading.Thread(target=self.refresh, args=(df, *args),
+                                                name=self.THREAD_NAME, daemon=True)
+            self._refreshing.start()
+            return self._refreshing
@@ -0,0 +1,71 @@
+"""LLM yanıtlarındaki grafik komutlarının ayrıştırılması."""
+
+import re
+
+# Türkçe metrik adı -> veri seti sütunu
+METRIC_MAPPING = {
+    'mutluluk': 'life_ladder',
+    'sosyal destek': 'social_support',
+    'özgürlük': 'freedom_to_make_life_choices',
+    'gdp': 'gdp_per_capita',
+    'yaşam beklentisi': 'life_expectancy',
+    'işsizlik': 'unemployment_rate',
+    'internet': 'internet_users_percent'
+}
+
+CHART_COMMAND_PREFIXES = ("line:", "trend:", "bar:", "scatter:", "box:")
+
+
+def is_chart_command(line):
+    """Satır bir grafik komutu mu ("line:", "bar:" vb. ile başlıyor mu)?"""
+    return line.strip().lower().startswith(CHART_COMMAND_PREFIXES)
+
+
+def parse_dynamic_chart_command(command, valid_countries, metric_mapping):
+    """
+    Beklenen komut formatı:
+      "chart_type: x=..., y=..., countries=..., [other_key=value,...]"
+    Örnek: "line: x=year, y=life_ladder, countries=ingiltere,iran"
+    """
+    command = command.strip()
+    # İlk kısmı (chart_type) ayır: örn. "line:" veya "scatter:" vb.
+    m = re.match(r'(\w+):\s*(.*)', command)
+    if not m:
+        return None
+    chart_type = m.group(1).lower()  # örn: "line", "scatter", "bar", "box" vs.
+    params_str = m.group(2)
+    params = {"chart_type": chart_type}
+    # Parametreleri virgül ile ayıralım
+    for part in params_str.split(","):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            key = key.strip().lower()
+            value = value.strip().lower()
+            if key == "countries":
+                # Ülkeleri ayırıp baş harflerini büyük yapalım; geçerli ülkelere göre doğrulama yapalım
+                country_list = [c.strip().title() for c in value.split(",") if c.strip()]
+                valid = [c for c in country_list if c in valid_countries]
+                params[key] = valid
+            else:
+                # Eğer x veya y parametresi ise; metric_mapping ile eşleştirelim
+                if key in ["x", "y"]:
+                    for mk, mv in metric_mapping.items():
+                        if mk in value:
+                            params[key] = mv
+                            break
+                    else:
+                        params[key] = value
+                else:
+                    params[key] = value
+    return params
+
+
+def extract_chart_specs(response, valid_countries):
+    """Yanıttaki tüm grafik komutlarını ayrıştırıp parametre sözlükleri listesi döndür."""
+    specs = []
+    for line in str(response).splitlines():
+        if is_chart_command(line):
+            params = parse_dynamic_chart_command(line, valid_countries, METRIC_MAPPING)
+            if params is not None:
+                specs.append(params)
+    return specs
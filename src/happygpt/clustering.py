@@ -0,0 +1,235 @@
+"""Ülke tipolojisi: standartlaştırılmış faktör profilleri üzerinde kümeleme.
+
+Her veri sürümü için tüm yıllar (ve tüm yılların ortalaması), k değerleri
+ve yöntemler (k-means, Ward hiyerarşik) bir süreç havuzunda önceden
+kümelenir. Küme etiketleri, merkezler ve her ülkenin kendi merkezine
+uzaklığı veri sürümüyle birlikte diske yazılır; istek anında kümeleme
+yapılmaz, depo hazır değilse sonuç yoktur.
+
+Kullanım (src/ dizininden):
+    python -m happygpt.clustering [--workers 4]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .cache import VersionedStore, frame_fingerprint
+from .countries import dataset_alias_index, extract_entities
+from .schema import LOG_METRICS
+from .similarity import standardized_profiles
+
+METHODS = ("kmeans", "hierarchical")
+K_VALUES = range(2, 9)
+ALL_YEARS = "all"
+RANDOM_STATE = 42
+
+# Soruda bu kelimeler geçerse agent bağlamına ülkenin kümesi eklenir
+CLUSTER_WORDS = ("küme", "kume", "tipoloji", "profil", "grup", "grub")
+
+
+def _entry_key(method, year, k):
+    return f"{method}:{ALL_YEARS if year is None else int(year)}:{int(k)}"
+
+
+def fit_clusters(matrix, k, method):
+    """Tek kümeleme; (etiketler, standartlaştırılmış merkezler, uzaklıklar, inertia, silhouette)."""
+    from sklearn.cluster import AgglomerativeClustering, KMeans
+    from sklearn.metrics import silhouette_score
+
+    if method == "kmeans":
+        model = KMeans(n_clusters=k, n_init=10, random_state=RANDOM_STATE).fit(matrix)
+        labels, centroids = model.labels_, model.cluster_centers_
+    elif method == "hierarchical":
+        labels = AgglomerativeClustering(n_clusters=k, linkage="ward").fit_predict(matrix)
+        centroids = np.vstack([matrix[labels == c].mean(axis=0) for c in range(k)])
+    else:
+        raise ValueError(f"Bilinmeyen kümeleme yöntemi: {method}")
+
+    distances = np.linalg.norm(matrix - centroids[labels], axis=1)
+    silhouette = float(silhouette_score(matrix, labels)) if 1 < k < len(matrix) else None
+    return labels, centroids, distances, float((distances ** 2).sum()), silhouette
+
+
+def _fit_task(task):
+    key, matrix, k, method = task
+    return key, fit_clusters(matrix, k, method)
+
+
+def _profiles_in_units(scaler, factors, centroids):
+    """Standartlaştırılmış merkezleri özgün birimlere çevir (log faktörler geri açılır)."""
+    values = scaler.inverse_transform(centroids)
+    for j, name in enumerate(factors):
+        if name in LOG_METRICS:
+            values[:, j] = np.exp(values[:, j])
+    return values
+
+
+class ClusterStore(VersionedStore):
+    """Veri seti sürümüne bağlı, diskte saklanan kümeleme sonuçları."""
+
+    FILE_NAME = "clusters.json"
+    THREAD_NAME = "happygpt-cluster-refresh"
+
+    def __init__(self, path=None):
+        self.factors = []
+        self.entries = {}
+        self.best_k = {}
+        super().__init__(path)
+
+    def _state(self):
+        return {"factors": self.factors, "entries": self.entries, "best_k": self.best_k}
+
+    def _restore(self, data):
+        self.factors = data.get("factors", [])
+        self.entries = data.get("entries", {})
+        self.best_k = data.get("best_k", {})
+
+    def refresh(self, df, workers=None):
+        """Tüm (yöntem, yıl, k) kümelemelerini süreç havuzunda hesapla ve kaydet."""
+        version = frame_fingerprint(df)
+        years = [None, *sorted(int(y) for y in df['year'].unique())]
+        profiles = {year: standardized_profiles(df, year) for year in years}
+        tasks = [(_entry_key(method, year, k), profiles[year][1], k, method)
+                 for year in years for method in METHODS for k in K_VALUES
+                 if k < len(profiles[year][0])]
+
+        # Streamlit gibi çok thread'li süreçlerde fork yerine spawn daha güvenli
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = dict(pool.map(_fit_task, tasks, chunksize=8))
+
+        entries, best_k = {}, {}
+        for year in years:
+            countries, _, factors, scaler = profiles[year]
+            for method in METHODS:
+                best = None
+                for k in K_VALUES:
+                    key = _entry_key(method, year, k)
+                    if key not in results:
+                        continue
+                    labels, centroids, distances, inertia, silhouette = results[key]
+                    entries[key] = {
+                        "countries": [str(c) for c in countries],
+                        "labels": labels.tolist(),
+                        "distances": np.round(distances, 4).tolist(),
+                        "centroids": np.round(centroids, 4).tolist(),
+                        "centroid_profiles": np.round(_profiles_in_units(scaler, factors, centroids), 4).tolist(),
+                        "sizes": np.bincount(labels, minlength=k).tolist(),
+                        "inertia": inertia,
+                        "silhouette": silhouette,
+                    }
+                    if silhouette is not None and (best is None or silhouette > best[1]):
+                        best = (k, silhouette)
+                if best is not None:
+                    best_k[f"{method}:{ALL_YEARS if year is None else year}"] = best[0]
+
+        with self._lock:
+            self.dataset_version = version
+            self.factors = list(profiles[None][2])
+            self.entries = entries
+            self.best_k = best_k
+            self._save()
+        return len(entries)
+
+    def get(self, year=None, k=None, method="kmeans", df=None):
+        """Kümeleme sonucu; k verilmezse silhouette'e göre en iyi k. Hazır değilse None."""
+        with self._lock:
+            if df is not None and frame_fingerprint(df) != self.dataset_version:
+                return None
+            if k is None:
+                k = self.best_k.get(f"{method}:{ALL_YEARS if year is None else int(year)}")
+                if k is None:
+                    return None
+            entry = self.entries.get(_entry_key(method, year, k))
+            return dict(entry, k=int(k), method=method, factors=self.factors) if entry else None
+
+    def available_k(self, year=None, method="kmeans"):
+        prefix = f"{method}:{ALL_YEARS if year is None else int(year)}:"
+        with self._lock:
+            return sorted(int(key[len(prefix):]) for key in self.entries if key.startswith(prefix))
+
+    def assignments(self, year=None, k=None, method="kmeans", df=None):
+        """country_name, cluster, distance sütunlu DataFrame; hazır değilse None."""
+        entry = self.get(year, k, method, df)
+        if entry is None:
+            return None
+        return pd.DataFrame({"country_name": entry["countries"], "cluster": entry["labels"],
+                             "distance": entry["distances"]})
+
+    def describe_country(self, country, year=None, k=None, method="kmeans", df=None):
+        """Ülkenin kümesi, küme arkadaşları (merkeze yakınlık sırasıyla) ve merkezin belirgin faktörleri; yoksa None."""
+        entry = self.get(year, k, method, df)
+        if entry is None or country not in entry["countries"]:
+            return None
+        i = entry["countries"].index(country)
+        label = entry["labels"][i]
+        peers = [(c, d) for c, l, d in zip(entry["countries"], entry["labels"], entry["distances"])
+                 if l == label and c != country]
+        centroid = np.asarray(entry["centroids"][label])
+        order = np.argsort(centroid)
+        return {
+            "cluster": label,
+            "k": entry["k"],
+            "size": entry["sizes"][label],
+            "distance": entry["distances"][i],
+            "peers": [c for c, _ in sorted(peers, key=lambda item: item[1])],
+            "high": [entry["factors"][j] for j in order[::-1][:2] if centroid[j] > 0.5],
+            "low": [entry["factors"][j] for j in order[:2] if centroid[j] < -0.5],
+        }
+
+
+def get_store() -> ClusterStore:
+    """Süreçte paylaşılan küme deposu (dashboard ve agent'lar aynı sonuçları görür)."""
+    return ClusterStore.shared()
+
+
+def question_context(df, question):
+    """Kümelere/profile dair sorular için agent bağlam metni; depo hazır değilse hesaplamayı başlatıp None döner."""
+    lowered = question.lower()
+    if not any(word in lowered for word in CLUSTER_WORDS):
+        return None
+    store = get_store()
+    if not store.ready(df):
+        store.ensure(df)
+        return None
+    countries = [name for kind, name, _ in extract_entities(question, dataset_alias_index(df)) if kind == "country"]
+    lines = []
+    for country in countries:
+        info = store.describe_country(country, df=df)
+        if info is None:
+            continue
+        traits = []
+        if info["high"]:
+            traits.append("ortalamanın üstünde: " + ", ".join(info["high"]))
+        if info["low"]:
+            traits.append("ortalamanın altında: " + ", ".join(info["low"]))
+        lines.append(f"- {country}, {info['k']} kümeli k-means tipolojisinde {info['cluster']} numaralı kümede "
+                     f"({info['size']} ülke; {'; '.join(traits) or 'belirgin fark yok'}). "
+                     f"Kümenin en tipik üyeleri: {', '.join(info['peers'][:8]) or '-'}")
+    return "\n".join(lines) or None
+
+
+def main(argv=None):
+    from .dataset import get_dataset
+
+    parser = argparse.ArgumentParser(description="Ülke kümelerini önceden hesapla.")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store = ClusterStore()
+    count = store.refresh(get_dataset().frame, args.workers)
+    best = store.best_k.get(f"kmeans:{ALL_YEARS}")
+    print(f"{count} kümeleme kaydedildi (tüm yıllar için en iyi k-means k={best}, "
+          f"{time.perf_counter() - start:.1f}s).", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
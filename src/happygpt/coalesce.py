@@ -0,0 +1,104 @@
+"""Eşzamanlı aynı isteklerin tek üretimde birleştirilmesi (single-flight).
+
+Aynı anahtarla gelen istekler süren tek bir üretimi bekler. Akış modunda
+üretim ayrı bir thread'de yürür; her bekleyen o ana kadarki parçaları alıp
+sonrakileri geldikçe izler. Bir istemcinin bağlantıyı kesmesi diğerlerini
+etkilemez.
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks = []
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Anahtar başına en fazla bir süren üretim."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def _join(self, key):
+        """(çağrı, lider mi) döndür."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = self._calls[key] = _Call()
+            return call, True
+
+    def _finish(self, key, call, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        with call.cond:
+            if error is None and not call.chunks and result:
+                call.chunks.append(result)  # Akış bekleyenleri için tek parça
+            call.result, call.error, call.done = result, error, True
+            call.cond.notify_all()
+
+    def do(self, key, fn):
+        """fn()'i çalıştır; aynı anahtarla süren bir çağrı varsa onun sonucunu bekle."""
+        call, leader = self._join(key)
+        if leader:
+            try:
+                result = fn()
+            except Exception as e:
+                self._finish(key, call, error=e)
+                raise
+            self._finish(key, call, result=result)
+            return result
+        with call.cond:
+            call.cond.wait_for(lambda: call.done)
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stream(self, key, fn, on_complete=None):
+        """fn() bir metin parçası iteratörü döndürür; parçaları tüm bekleyenlere dağıt.
+
+        on_complete(tam_metin) üretim başarıyla bittiğinde bir kez çağrılır.
+        """
+        call, leader = self._join(key)
+        if leader:
+            threading.Thread(target=self._produce, args=(key, call, fn, on_complete),
+                             name="happygpt-singleflight", daemon=True).start()
+        return self._follow(call)
+
+    def _produce(self, key, call, fn, on_complete):
+        try:
+            for chunk in fn():
+                with call.cond:
+                    call.chunks.append(chunk)
+                    call.cond.notify_all()
+        except Exception as e:
+            self._finish(key, call, error=e)
+            return
+        result = "".join(call.chunks)
+        if on_complete is not None:
+            on_complete(result)
+        self._finish(key, call, result=result)
+
+    @staticmethod
+    def _follow(call):
+        position = 0
+        while True:
+            with call.cond:
+                call.cond.wait_for(lambda: len(call.chunks) > position or call.done)
+                chunks, done, error = call.chunks[position:], call.done, call.error
+            position += len(chunks)
+            yield from chunks
+            if done and position >= len(call.chunks):
+                if error is not None:
+                    raise error
+                return
@@ -0,0 +1,65 @@
+"""Ortam değişkenleri ve dosya yolları."""
+
+import os
+from pathlib import Path
+
+# src/ dizini ve varsayılan veri seti yolu (çalışma dizininden bağımsız)
+SRC_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = SRC_DIR.parent
+DEFAULT_DATA_PATH = SRC_DIR / "cleaned_dataset.csv"
+DEFAULT_CACHE_DIR = PROJECT_DIR / ".cache"
+
+_env_loaded = False
+
+
+def load_env():
+    """.env dosyalarını bir kez yükle (çalışma dizini, src/ ve proje kökü)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    from dotenv import load_dotenv
+
+    for candidate in (Path.cwd() / ".env", SRC_DIR / ".env", PROJECT_DIR / ".env"):
+        if candidate.is_file():
+            load_dotenv(dotenv_path=candidate, override=False)
+    _env_loaded = True
+
+
+def get_api_key():
+    """Google API anahtarını döndür; bulunamazsa None."""
+    load_env()
+    return os.getenv("GOOGLE_API_KEY")
+
+
+def get_data_path():
+    """Veri seti yolu; HAPPYGPT_DATA_PATH ile değiştirilebilir."""
+    return Path(os.getenv("HAPPYGPT_DATA_PATH", DEFAULT_DATA_PATH))
+
+
+def use_compact_dtypes():
+    """HAPPYGPT_COMPACT=1 ise paylaşılan veri seti kompakt tiplerle tutulur (bkz. schema)."""
+    return os.getenv("HAPPYGPT_COMPACT", "0").lower() in ("1", "true", "yes")
+
+
+def use_query_tool():
+    """HAPPYGPT_TOOLS=1 ise agent'lar veri sorularını önce SQL aracıyla yanıtlar (bkz. query)."""
+    return os.getenv("HAPPYGPT_TOOLS", "0").lower() in ("1", "true", "yes")
+
+
+def get_max_parallel_agents():
+    """Bileşik sorularda aynı anda çalışan en fazla agent sayısı; HAPPYGPT_MAX_PARALLEL ile değiştirilebilir."""
+    return max(1, int(os.getenv("HAPPYGPT_MAX_PARALLEL", "3")))
+
+
+def get_rate_limits():
+    """Dakikalık LLM çağrı sınırları: global (HAPPYGPT_RATE_LIMIT, 0 = kapalı) ve agent başına
+    (HAPPYGPT_AGENT_RATE_LIMIT). Aynı makinedeki tüm süreçler için ortaktır (bkz. ratelimit)."""
+    return {"global": float(os.getenv("HAPPYGPT_RATE_LIMIT", "60")),
+            "agent": float(os.getenv("HAPPYGPT_AGENT_RATE_LIMIT", "30"))}
+
+
+def get_cache_dir():
+    """Önceden hesaplanan sonuçların dizini; HAPPYGPT_CACHE_DIR ile değiştirilebilir."""
+    path = Path(os.getenv("HAPPYGPT_CACHE_DIR", DEFAULT_CACHE_DIR))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
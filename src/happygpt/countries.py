@@ -0,0 +1,222 @@
+"""Ülke/bölge adları: standartlaştırma ve sorulardan varlık çıkarımı."""
+
+import re
+
+from .cache import memoize
+
+# Türkçe ve alternatif ülke adları -> veri setindeki standart ad
+COUNTRY_MAPPING = {
+    'Turkey': 'Turkiye',
+    'Türkiye': 'Turkiye',
+    'Afganistan': 'Afghanistan',
+    'Arnavutluk': 'Albania',
+    'Cezayir': 'Algeria',
+    'Angola': 'Angola',
+    'Arjantin': 'Argentina',
+    'Ermenistan': 'Armenia',
+    'Avustralya': 'Australia',
+    'Avusturya': 'Austria',
+    'Azerbaycan': 'Azerbaijan',
+    'Bahreyn': 'Bahrain',
+    'Bangladeş': 'Bangladesh',
+    'Belarus': 'Belarus',
+    'Belçika': 'Belgium',
+    'Beliz': 'Belize',
+    'Benin': 'Benin',
+    'Bolivya': 'Bolivia',
+    'Bosna Hersek': 'Bosnia and Herzegovina',
+    'Botsvana': 'Botswana',
+    'Brezilya': 'Brazil',
+    'Brazilya': 'Brazil',
+    'Bulgaristan': 'Bulgaria',
+    'Burkina Faso': 'Burkina Faso',
+    'Burundi': 'Burundi',
+    'Kamboçya': 'Cambodia',
+    'Kanada': 'Canada',
+    'Orta Afrika Cumhuriyeti': 'Central African Republic',
+    'Çad': 'Chad',
+    'Şili': 'Chile',
+    'Çin': 'China',
+    'Kolombiya': 'Colombia',
+    'Komorlar': 'Comoros',
+    'Kosta Rika': 'Costa Rica',
+    'Hırvatistan': 'Croatia',
+    'Küba': 'Cuba',
+    'Kıbrıs': 'Cyprus',
+    'Çekya': 'Czechia',
+    'Danimarka': 'Denmark',
+    'Cibuti': 'Djibouti',
+    'Dominik Cumhuriyeti': 'Dominican Republic',
+    'Ekvador': 'Ecuador',
+    'El Salvador': 'El Salvador',
+    'Estonya': 'Estonia',
+    'Esvatini': 'Eswatini',
+    'Etiyopya': 'Ethiopia',
+    'Finlandiya': 'Finland',
+    'Fransa': 'France',
+    'Gabon': 'Gabon',
+    'Gürcistan': 'Georgia',
+    'Almanya': 'Germany',
+    'Gana': 'Ghana',
+    'Yunanistan': 'Greece',
+    'Guatemala': 'Guatemala',
+    'Gine': 'Guinea',
+    'Guyana': 'Guyana',
+    'Haiti': 'Haiti',
+    'Honduras': 'Honduras',
+    'Macaristan': 'Hungary',
+    'İzlanda': 'Iceland',
+    'Hindistan': 'India',
+    'Endonezya': 'Indonesia',
+    'Irak': 'Iraq',
+    'İrlanda': 'Ireland',
+    'İsrail': 'Israel',
+    'İtalya': 'Italy',
+    'Jamaika': 'Jamaica',
+    'Japonya': 'Japan',
+    'Ürdün': 'Jordan',
+    'Kazakistan': 'Kazakhstan',
+    'Kenya': 'Kenya',
+    'Kosova': 'Kosovo',
+    'Kuveyt': 'Kuwait',
+    'Letonya': 'Latvia',
+    'Lübnan': 'Lebanon',
+    'Lesotho': 'Lesotho',
+    'Liberya': 'Liberia',
+    'Libya': 'Libya',
+    'Litvanya': 'Lithuania',
+    'Lüksemburg': 'Luxembourg',
+    'Madagaskar': 'Madagascar',
+    'Malavi': 'Malawi',
+    'Malezya': 'Malaysia',
+    'Maldivler': 'Maldives',
+    'Mali': 'Mali',
+    'Malta': 'Malta',
+    'Moritanya': 'Mauritania',
+    'Meksika': 'Mexico',
+    'Moğolistan': 'Mongolia',
+    'Karadağ': 'Montenegro',
+    'Fas': 'Morocco',
+    'Mozambik': 'Mozambique',
+    'Myanmar': 'Myanmar',
+    'Namibya': 'Namibia',
+    'Hollanda': 'Netherlands',
+    'Yeni Zelanda': 'New Zealand',
+    'Nikaragua': 'Nicaragua',
+    'Nijer': 'Niger',
+    'Nijerya': 'Nigeria',
+    'Kuzey Makedonya': 'North Macedonia',
+    'Norveç': 'Norway',
+    'Umman': 'Oman',
+    'Pakistan': 'Pakistan',
+    'Panama': 'Panama',
+    'Paraguay': 'Paraguay',
+    'Peru': 'Peru',
+    'Filipinler': 'Philippines',
+    'Polonya': 'Poland',
+    'Portekiz': 'Portugal',
+    'Katar': 'Qatar',
+    'Romanya': 'Romania',
+    'Ruanda': 'Rwanda',
+    'Suudi Arabistan': 'Saudi Arabia',
+    'Senegal': 'Senegal',
+    'Sırbistan': 'Serbia',
+    'Sierra Leone': 'Sierra Leone',
+    'Singapur': 'Singapore',
+    'Slovenya': 'Slovenia',
+    'Somali': 'Somalia',
+    'Güney Afrika': 'South Africa',
+    'Güney Sudan': 'South Sudan',
+    'İspanya': 'Spain',
+    'Sri Lanka': 'Sri Lanka',
+    'Sudan': 'Sudan',
+    'Surinam': 'Suriname',
+    'İsveç': 'Sweden',
+    'İsviçre': 'Switzerland',
+    'Tacikistan': 'Tajikistan',
+    'Tanzanya': 'Tanzania',
+    'Tayland': 'Thailand',
+    'Togo': 'Togo',
+    'Trinidad ve Tobago': 'Trinidad and Tobago',
+    'Tunus': 'Tunisia',
+    'Türkiye': 'Turkiye',
+    'Turkey': 'Turkiye',
+    'Türkmenistan': 'Turkmenistan',
+    'Uganda': 'Uganda',
+    'Ukrayna': 'Ukraine',
+    'Birleşik Arap Emirlikleri': 'United Arab Emirates',
+    'BAE': 'United Arab Emirates',
+    'Birleşik Krallık': 'United Kingdom',
+    'İngiltere': 'United Kingdom',
+    'ABD': 'United States',
+    'Amerika Birleşik Devletleri': 'United States',
+    'Uruguay': 'Uruguay',
+    'Özbekistan': 'Uzbekistan',
+    'Zambiya': 'Zambia',
+    'Zimbabve': 'Zimbabwe'
+}
+
+# Türkçe bölge adları -> regional_indicator
+REGION_ALIASES = {
+    'Orta ve Doğu Avrupa': 'Central and Eastern Europe',
+    'Doğu Avrupa': 'Central and Eastern Europe',
+    'Bağımsız Devletler Topluluğu': 'Commonwealth of Independent States',
+    'Doğu Asya': 'East Asia',
+    'Latin Amerika': 'Latin America and Caribbean',
+    'Latin Amerika ve Karayipler': 'Latin America and Caribbean',
+    'Orta Doğu': 'Middle East and North Africa',
+    'Orta Doğu ve Kuzey Afrika': 'Middle East and North Africa',
+    'Kuzey Amerika': 'North America and ANZ',
+    'Güney Asya': 'South Asia',
+    'Güneydoğu Asya': 'Southeast Asia',
+    'Sahra Altı Afrika': 'Sub-Saharan Africa',
+    'Batı Avrupa': 'Western Europe',
+}
+
+_TR_TO_ASCII = str.maketrans("çğıöşüÇĞİÖŞÜ", "cgiosuCGIOSU")
+
+
+def normalize_text(text):
+    """Küçük harfe çevir, Türkçe karakterleri sadeleştir ve kelimelere ayır."""
+    return re.findall(r"\w+", str(text).translate(_TR_TO_ASCII).lower())
+
+
+def _contains(tokens, name_tokens):
+    # Son kelimede ek alabilir: "Türkiyede", "Almanyanın"
+    n = len(name_tokens)
+    for i in range(len(tokens) - n + 1):
+        if tokens[i:i + n - 1] == name_tokens[:-1] and tokens[i + n - 1].startswith(name_tokens[-1]):
+            if tokens[i + n - 1] == name_tokens[-1] or len(name_tokens[-1]) >= 4:
+                return i, i + n
+    return None
+
+
+def build_alias_index(countries, regions):
+    """(kelimeler, tür, standart ad) listesi; uzun adlar önce denenir."""
+    countries, regions = set(countries), set(regions)
+    aliases = [(name, "country", name) for name in countries]
+    aliases += [(alias, "country", name) for alias, name in COUNTRY_MAPPING.items() if name in countries]
+    aliases += [(name, "region", name) for name in regions]
+    aliases += [(alias, "region", name) for alias, name in REGION_ALIASES.items() if name in regions]
+    index = [(normalize_text(alias), kind, name) for alias, kind, name in aliases]
+    return sorted(index, key=lambda item: -sum(len(t) for t in item[0]))
+
+
+@memoize(maxsize=4)
+def dataset_alias_index(df):
+    """Veri setindeki ülke ve bölgeler için takma ad indeksi (sürüm başına bir kez)."""
+    return build_alias_index(df['country_name'].unique(), df['regional_indicator'].unique())
+
+
+def extract_entities(question, alias_index):
+    """Sorudaki ülke/bölge adlarını bul; [(tür, ad, (başlangıç, bitiş))] döndür."""
+    tokens = normalize_text(question)
+    found, used = [], set()
+    for name_tokens, kind, name in alias_index:
+        if not name_tokens:
+            continue
+        span = _contains(tokens, name_tokens)
+        if span and not used.intersection(range(*span)) and all((k, n) != (kind, name) for k, n, _ in found):
+            used.update(range(*span))
+            found.append((kind, name, span))
+    return found
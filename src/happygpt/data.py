@@ -0,0 +1,58 @@
+"""Veri seti yükleme."""
+
+from pathlib import Path
+
+import pandas as pd
+
+from .cache import memoize
+from .config import get_data_path
+from .countries import COUNTRY_MAPPING
+
+
+@memoize(maxsize=4)
+def _read_csv(path: str, mtime: float) -> pd.DataFrame:
+    # mtime anahtarın parçası: dosya değişince yeniden okunur
+    return pd.read_csv(path)
+
+
+@memoize(maxsize=4)
+def _read_parquet(path: str, mtime: float) -> pd.DataFrame:
+    # Sözlük kodlu sütunlar CSV ile aynı tiplere (object) döndürülür
+    if Path(path).is_dir():
+        df = pd.concat([pd.read_parquet(part) for part in sorted(Path(path).glob("*.parquet"))], ignore_index=True)
+    else:
+        df = pd.read_parquet(path)
+    categories = df.select_dtypes('category').columns
+    return df.astype({col: object for col in categories}) if len(categories) else df
+
+
+def load_dataset(path=None) -> pd.DataFrame:
+    """Veri setini yükle (dosya değişmedikçe süreç içinde önbellekten döner).
+
+    Hata durumunda istisna fırlatır; kullanıcıya gösterim çağıran katmanın işidir.
+    """
+    path = Path(path) if path is not None else get_data_path()
+    if path.is_dir() or path.suffix == ".parquet":
+        # happygpt.ingest çıktısı (parça dosyalarından oluşan dizin ya da tek dosya)
+        return _read_parquet(str(path.resolve()), path.stat().st_mtime)
+    return _read_csv(str(path.resolve()), path.stat().st_mtime)
+
+
+def preprocess(df: pd.DataFrame, corruption_max=None) -> pd.DataFrame:
+    """Veri setini ön işle; girdiyi değiştirmeden yeni DataFrame döndürür.
+
+    Parça parça işlenen verilerde ölçekleme tüm veri setinin en büyük
+    değeriyle yapılmalıdır; bu değer corruption_max ile verilir.
+    """
+    # Ülke isimlerini standartlaştır
+    updates = {'country_name': df['country_name'].replace(COUNTRY_MAPPING)}
+
+    # Corruption değerlerini 0-1 arasına normalize et (eğer değilse)
+    if corruption_max is None:
+        corruption_max = df['perceptions_of_corruption'].max()
+    if corruption_max > 1:
+        updates['perceptions_of_corruption'] = df['perceptions_of_corruption'] / corruption_max
+
+    # Yıl sütununu integer yap
+    updates['year'] = df['year'].astype(int)
+    return df.assign(**updates)
@@ -0,0 +1,288 @@
+"""Süreç başına tek, paylaşılan ve salt okunur veri seti.
+
+Tüm oturumlar aynı DataFrame nesnesini kullanır; böylece oturum sayısı
+arttıkça bellek sabit kalır ve önbellek anahtarları (parmak izi) bir kez
+hesaplanır. Paylaşılan çerçeve değiştirilmemelidir: oturuma özgü dönüşümler
+için `session_frame()` ya da `transform()` kullanılır. Uygulama giriş
+noktaları (Streamlit betiği, API sunucusu) pandas copy-on-write modunu açar;
+bu modda kopyalar veri yazılana kadar belleği paylaşır.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .cache import frame_fingerprint, invalidate_version
+from .config import get_data_path, use_compact_dtypes
+from .data import load_dataset, preprocess
+from .schema import compact
+
+
+class Dataset:
+    """Ön işlenmiş veri seti ve sürüm bilgisi."""
+
+    def __init__(self, frame: pd.DataFrame, source=None):
+        self._frame = frame
+        self.source = source
+        self.version = frame_fingerprint(frame)
+        self.loaded_at = time.time()
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Paylaşılan çerçeve (salt okunur kullanılmalı)."""
+        return self._frame
+
+    def session_frame(self) -> pd.DataFrame:
+        """Oturuma özgü görünüm; sütun atamaları paylaşılan çerçeveyi değiştirmez.
+
+        Yerinde yazım (ör. `.loc[...] = `) yalnızca copy-on-write açıkken güvenlidir.
+        """
+        return self._frame.copy(deep=False)
+
+    def transform(self, func, *args, **kwargs) -> pd.DataFrame:
+        """func'ı paylaşılan çerçeveyi bozmadan uygula."""
+        return func(self.session_frame(), *args, **kwargs)
+
+    def memory_usage(self):
+        """Bayt cinsinden bellek kullanımı: toplam ve sütun bazında."""
+        per_column = self._frame.memory_usage(deep=True, index=True)
+        return {"total_bytes": int(per_column.sum()), "columns": {k: int(v) for k, v in per_column.items()}}
+
+    def memory_report(self):
+        """Veri seti ve süreç bellek özeti."""
+        return {
+            "version": self.version,
+            "rows": len(self._frame),
+            "dataset_bytes": self.memory_usage()["total_bytes"],
+            "process_rss_bytes": process_rss(),
+        }
+
+
+def process_rss():
+    """Sürecin yerleşik bellek kullanımı (bayt); ölçülemezse None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        try:
+            import resource
+
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return None
+
+
+# Sürüm değişiminden önce doğrulanan, uygulamanın dayandığı sütunlar
+REQUIRED_COLUMNS = [
+    'country_name', 'regional_indicator', 'year', 'life_ladder', 'gdp_per_capita',
+    'social_support', 'freedom_to_make_life_choices', 'perceptions_of_corruption',
+]
+
+
+class DatasetValidationError(ValueError):
+    """Yeni veri sürümü doğrulamadan geçemediğinde fırlatılır."""
+
+
+def validate(frame: pd.DataFrame):
+    """Yeni sürümü kullanıma almadan önce temel tutarlılık denetimleri."""
+    missing = [col for col in REQUIRED_COLUMNS if col not in frame.columns]
+    if missing:
+        raise DatasetValidationError(f"Eksik sütun(lar): {', '.join(missing)}")
+    if frame.empty:
+        raise DatasetValidationError("Veri seti boş")
+    if not pd.api.types.is_numeric_dtype(frame['year']):
+        raise DatasetValidationError("year sütunu sayısal değil")
+    duplicates = int(frame.duplicated(['country_name', 'year']).sum())
+    if duplicates:
+        raise DatasetValidationError(f"{duplicates} yinelenen (country_name, year) satırı")
+
+
+def _load(path) -> Dataset:
+    raw = load_dataset(path)
+    validate(raw)
+    frame = preprocess(raw)
+    if use_compact_dtypes():
+        frame = compact(frame)
+    return Dataset(frame, source=str(path))
+
+
+def warm(df: pd.DataFrame):
+    """Dashboard, API ve agent'ların ilk istekte ihtiyaç duyduğu hesaplamaları önceden yap."""
+    from . import aggregates
+    from .agents import calculate_analysis_inputs, calculate_trend_analysis
+    from .anomalies import anomaly_scores
+    from .benchmarks import benchmarks
+    from .panel import get_panel
+    from .rankings import rank_index
+    from .regression import precompute as precompute_regressions
+    from .resampling import bootstrap_statistics
+
+    get_panel(df)
+    rank_index(df)
+    benchmarks(df)
+    calculate_analysis_inputs(df)
+    calculate_trend_analysis(df, 'life_ladder')
+    for year in [None, *sorted(df['year'].unique().tolist())]:
+        aggregates.regional_averages(df, 'life_ladder', year)
+        aggregates.top_countries(df, 'life_ladder', 10, year)
+        aggregates.top_countries(df, 'life_ladder', 10, year, ascending=True)
+    aggregates.yearly_trend(df, 'life_ladder')
+    aggregates.regional_trends(df, 'life_ladder')
+    aggregates.country_averages(df, 'life_ladder')
+    aggregates.correlation_matrix(df, ['life_ladder', 'gdp_per_capita', 'social_support',
+                                       'freedom_to_make_life_choices', 'internet_users_percent',
+                                       'life_expectancy'])
+    bootstrap_statistics(df)
+    precompute_regressions(df)
+    anomaly_scores(df)
+
+
+def _stamp(path: Path):
+    """Dosyanın (ya da ingest dizininin) değişikliğini gösteren damga; yoksa None."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+
+
+class DatasetManager:
+    """Bir veri dosyasının sürümlerini yönetir.
+
+    Dosya değiştiğinde yeni sürüm arka planda yüklenir, doğrulanır ve
+    ısıtılır; ardından tek atamayla yerine konur. Bu sırada istekler eski
+    sürümle yanıtlanmaya devam eder. Değişimden sonra yalnızca eski sürüme
+    bağlı önbellek kayıtları silinir ve dinleyiciler (eski, yeni) ile çağrılır.
+    """
+
+    def __init__(self, path, warmers=None, debounce=0.5):
+        self.path = Path(path).resolve()
+        self.warmers = [warm] if warmers is None else list(warmers)
+        self.debounce = debounce
+        self.last_error = None
+        self._listeners = []
+        self._reload_lock = threading.Lock()
+        self._pending = False
+        self._timer = None
+        self._observer = None
+        self._stamp = _stamp(self.path)
+        self._dataset = _load(self.path)
+
+    @property
+    def current(self) -> Dataset:
+        """Geçerli sürüm. İzleme kapalıysa dosya değişikliği burada fark edilir
+        ve yeniden yükleme arka planda başlatılır (çağıran beklemez)."""
+        if self._observer is None and _stamp(self.path) != self._stamp:
+            self.reload_async()
+        return self._dataset
+
+    def add_listener(self, func):
+        """func(eski_sürüm, yeni_sürüm) her değişimden sonra çağrılır."""
+        self._listeners.append(func)
+
+    def reload(self) -> bool:
+        """Dosya değiştiyse yeni sürümü yükle, ısıt ve değiştir; değiştiyse True."""
+        if not self._reload_lock.acquire(blocking=False):
+            self._pending = True  # Süren yükleme bitince yeniden denenir
+            return False
+        self._pending = False
+        try:
+            stamp = _stamp(self.path)
+            if stamp is None or stamp == self._stamp:
+                return False
+            try:
+                candidate = _load(self.path)
+                for warmer in self.warmers:
+                    warmer(candidate.frame)
+            except Exception as e:
+                # Bozuk/yarım dosya: eski sürüm kullanılmaya devam eder
+                self.last_error = e
+                self._stamp = stamp
+                return False
+            self._stamp = stamp
+            self.last_error = None
+            if candidate.version == self._dataset.version:
+                return False
+
+            old, self._dataset = self._dataset, candidate
+        finally:
+            self._reload_lock.release()
+            # Yükleme sürerken gelen değişiklik kaybolmasın
+            if self._pending or _stamp(self.path) not in (None, self._stamp):
+                self.reload_async()
+
+        invalidate_version(old.version)
+        for listener in list(self._listeners):
+            listener(old, candidate)
+        return True
+
+    def reload_async(self):
+        """Yeniden yüklemeyi kısa bir gecikmeyle arka planda başlat (ardışık olaylar birleşir)."""
+        with _lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.reload)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def start_watching(self):
+        """watchdog ile dosyayı izlemeye başla (zaten izleniyorsa bir şey yapmaz)."""
+        with _lock:
+            if self._observer is not None:
+                return self
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+
+            manager = self
+
+            class Handler(FileSystemEventHandler):
+                def on_any_event(self, event):
+                    paths = [event.src_path, getattr(event, "dest_path", "")]
+                    if any(p and manager._concerns(p) for p in paths):
+                        manager.reload_async()
+
+            observer = Observer()
+            observer.schedule(Handler(), str(self.path.parent), recursive=self.path.is_dir())
+            observer.daemon = True
+            observer.start()
+            self._observer = observer
+        return self
+
+    def stop_watching(self):
+        with _lock:
+            observer, self._observer = self._observer, None
+        if observer is not None:
+            observer.stop()
+            observer.join(timeout=5)
+
+    def _concerns(self, changed):
+        changed = Path(os.fsdecode(changed)).resolve()
+        return changed == self.path or self.path in changed.parents
+
+
+_managers = {}
+_lock = threading.RLock()
+
+
+def get_manager(path=None) -> DatasetManager:
+    """Veri yolu başına süreçte tek DatasetManager."""
+    path = Path(path) if path is not None else get_data_path()
+    key = str(path.resolve())
+    with _lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = DatasetManager(path)
+        return manager
+
+
+def get_dataset(path=None) -> Dataset:
+    """Süreçteki paylaşılan veri setinin geçerli sürümünü döndür.
+
+    Dosya değiştiyse yeni sürüm arka planda hazırlanır; hazır olana kadar
+    mevcut sürüm döner. HAPPYGPT_COMPACT=1 ise çerçeve kompakt tiplerle
+    (float32, kategori, bool) tutulur.
+    """
+    return get_manager(path).current
@@ -0,0 +1,333 @@
+"""Türetilmiş sütunların ham metriklerden yeniden üretilmesi.
+
+`cleaned_dataset.csv` içindeki değişim, aykırı değer, bölge ortalaması ve
+kategori sütunları burada bildirilen özelliklerle yeniden hesaplanır. Her
+özellik girdilerini ve kapsamını bildirir; kapsam, artımlı güncellemede
+hangi satırların yeniden hesaplanacağını belirler:
+
+    row      yalnızca değişen satırlar
+    country  değişen ülkelerin tüm satırları
+    region   değişen bölgelerin tüm satırları
+    global   tüm satırlar (ör. veri seti geneli z-skoru)
+
+Değişim sütunları ülke içinde bir önceki gözleme göredir; bir ülkenin ilk
+yılı için önceki gözlem olmadığından NaN üretilir (CSV'deki değerler daha
+uzun bir ham seriden gelmektedir). Aynı nedenle CSV'deki bölge ortalamaları
+filtrelenmemiş ham veriden hesaplanmıştır ve buradaki değerlerden farklıdır.
+Aykırı değer bayrakları artık veri seti geneli z > 3 yerine `anomalies`
+modülünün robust skorlarından (yıl içi ve ülke içi, log GDP) gelir; CSV'deki
+statik bayraklardan farklıdır.
+
+Kullanım (src/ dizininden):
+    python -m happygpt.features --check        # CSV'deki değerlerle karşılaştır
+    python -m happygpt.features -o out.csv     # yeniden üret ve yaz
+    python -m happygpt.features --bench 100    # 100 kat veriyle ölçüm
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+KEYS = ['country_name', 'year']
+
+
+class Scope:
+    ROW = "row"
+    COUNTRY = "country"
+    REGION = "region"
+    GLOBAL = "global"
+
+
+class Feature:
+    def __init__(self, name, inputs, scope, func):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.scope = scope
+        self.func = func
+
+    def __repr__(self):
+        return f"Feature({self.name!r}, inputs={self.inputs}, scope={self.scope!r})"
+
+
+# Ad -> Feature; bildirim sırası korunur
+FEATURES = {}
+
+
+def feature(name, inputs, scope):
+    """func(df) -> df.index ile hizalı Series döndüren özelliği kaydet."""
+    def decorator(func):
+        FEATURES[name] = Feature(name, inputs, scope, func)
+        return func
+    return decorator
+
+
+def _pct_change(df, column):
+    # Metin anahtarlarla sort_values yerine ülke kodları üzerinde lexsort
+    countries = pd.factorize(df['country_name'])[0]
+    order = np.lexsort((df['year'].to_numpy(), countries))
+    values = df[column].to_numpy(dtype='float64')[order]
+    same_country = np.zeros(len(order), dtype=bool)
+    same_country[1:] = countries[order][1:] == countries[order][:-1]
+    change = np.full(len(order), np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change[1:] = np.where(same_country[1:], values[1:] / values[:-1] - 1, np.nan)
+    result = np.empty(len(order))
+    result[order] = change
+    return pd.Series(result, index=df.index)
+
+
+def _robust_outlier(df, column):
+    from .anomalies import robust_flags
+
+    return robust_flags(df, column)
+
+
+def _bucket(values, conditions, labels, default):
+    return pd.Series(np.select(conditions, labels, default).astype(object), index=values.index)
+
+
+@feature('happiness_change', ['life_ladder'], Scope.COUNTRY)
+def happiness_change(df):
+    return _pct_change(df, 'life_ladder')
+
+
+@feature('gdp_change', ['gdp_per_capita'], Scope.COUNTRY)
+def gdp_change(df):
+    return _pct_change(df, 'gdp_per_capita')
+
+
+@feature('internet_change', ['internet_users_percent'], Scope.COUNTRY)
+def internet_change(df):
+    return _pct_change(df, 'internet_users_percent')
+
+
+@feature('regional_avg_happiness', ['life_ladder', 'regional_indicator'], Scope.REGION)
+def regional_avg_happiness(df):
+    return df.groupby('regional_indicator', observed=True)['life_ladder'].transform('mean')
+
+
+@feature('outlier_gdp', ['gdp_per_capita'], Scope.GLOBAL)
+def outlier_gdp(df):
+    return _robust_outlier(df, 'gdp_per_capita')
+
+
+@feature('outlier_life_expectancy', ['life_expectancy'], Scope.GLOBAL)
+def outlier_life_expectancy(df):
+    return _robust_outlier(df, 'life_expectancy')
+
+
+@feature('income_level', ['gdp_per_capita'], Scope.ROW)
+def income_level(df):
+    gdp = df['gdp_per_capita']
+    return _bucket(gdp, [gdp < 4000, gdp < 10000, gdp < 25000], ['Low', 'Lower-Middle', 'Upper-Middle'], 'High')
+
+
+@feature('life_expectancy_category', ['life_expectancy'], Scope.ROW)
+def life_expectancy_category(df):
+    years = df['life_expectancy']
+    return _bucket(years, [years < 60, years < 75], ['Low', 'Medium'], 'High')
+
+
+@feature('internet_usage_category', ['internet_users_percent'], Scope.ROW)
+def internet_usage_category(df):
+    usage = df['internet_users_percent']
+    return _bucket(usage, [usage <= 30, usage <= 70], ['Low', 'Medium'], 'High')
+
+
+class FeaturePipeline:
+    """Özellikleri bağımlılık sırasıyla hesaplar; artımlı güncelleme destekler."""
+
+    def __init__(self, features=None):
+        self.features = dict(FEATURES if features is None else features)
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        order, state = [], {}
+
+        def visit(name):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Özellikler arasında döngüsel bağımlılık: {name}")
+            state[name] = "visiting"
+            for dep in self.features[name].inputs:
+                if dep in self.features:
+                    visit(dep)
+            state[name] = "done"
+            order.append(self.features[name])
+
+        for name in self.features:
+            visit(name)
+        return order
+
+    @property
+    def raw_columns(self):
+        """Özelliklerin ihtiyaç duyduğu ham sütunlar."""
+        return sorted({dep for f in self.features.values() for dep in f.inputs if dep not in self.features})
+
+    def affected(self, columns):
+        """Verilen sütunlar değişince yeniden hesaplanması gereken özellikler (sıralı)."""
+        dirty = set(columns)
+        result = []
+        for f in self.order:
+            if dirty.intersection(f.inputs):
+                dirty.add(f.name)
+                result.append(f)
+        return result
+
+    def compute(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Tüm türetilmiş sütunları yeniden hesapla (girdiyi değiştirmez)."""
+        out = df.copy(deep=False)  # Sütunlar değiştirilmez, yalnızca yeniden atanır
+        for f in self.order:
+            out[f.name] = f.func(out)
+        return out
+
+    def update(self, df: pd.DataFrame, changes: pd.DataFrame) -> pd.DataFrame:
+        """Değişen/yeni satırları ekle ve yalnızca etkilenen kısmı yeniden hesapla.
+
+        df daha önce `compute` ile üretilmiş olmalıdır; changes (country_name,
+        year) anahtarlarını ve değişen ham sütunları içerir.
+        """
+        out, touched = upsert(df, changes)
+        # Bölgesi değişen satırların eski bölgeleri de yeniden hesaplanır
+        previous = df.loc[touched[:len(df)], 'regional_indicator'].unique() if 'regional_indicator' in changes else ()
+        changed_columns = [col for col in changes.columns if col not in KEYS]
+        # Sütun başına değişen satırlar; özelliğin kapsamı yalnızca kendi girdilerinden genişler
+        dirty = {col: touched for col in changed_columns}
+        for f in self.affected(changed_columns):
+            inputs = np.logical_or.reduce([dirty[col] for col in f.inputs if col in dirty])
+            rows = self._scope_rows(out, f.scope, inputs, previous)
+            dirty[f.name] = rows
+            if not rows.any():
+                continue
+            subset = out if rows.all() else out[rows]
+            values = f.func(subset)
+            if f.name not in out:
+                out[f.name] = values.reindex(out.index)
+            elif rows.all():
+                out[f.name] = values
+            else:
+                column = out[f.name].to_numpy(copy=True)
+                column[rows] = values.to_numpy()
+                out[f.name] = column
+        return out
+
+    @staticmethod
+    def _scope_rows(df, scope, dirty, previous_regions=()):
+        if scope == Scope.ROW:
+            return dirty
+        if scope == Scope.COUNTRY:
+            return df['country_name'].isin(df.loc[dirty, 'country_name'].unique()).to_numpy()
+        if scope == Scope.REGION:
+            regions = set(df.loc[dirty, 'regional_indicator'].unique()) | set(previous_regions)
+            return df['regional_indicator'].isin(regions).to_numpy()
+        return np.ones(len(df), dtype=bool)
+
+
+def upsert(df: pd.DataFrame, changes: pd.DataFrame):
+    """(country_name, year) anahtarına göre güncelle/ekle; (çerçeve, değişen satır maskesi) döndürür."""
+    # Anahtar indeksi yalnızca değişen ülkelerin satırları için kurulur
+    candidates = np.flatnonzero(df['country_name'].isin(changes['country_name'].unique()).to_numpy())
+    found = pd.MultiIndex.from_frame(df[KEYS].iloc[candidates]).get_indexer(pd.MultiIndex.from_frame(changes[KEYS]))
+    existing = found >= 0
+    positions = np.where(existing, candidates[found], -1)
+    out = df.copy(deep=False)
+    for col in changes.columns:
+        if col in KEYS:
+            continue
+        column = out[col].to_numpy(copy=True)
+        column[positions[existing]] = changes[col].to_numpy()[existing]
+        out[col] = column
+
+    touched = np.zeros(len(out), dtype=bool)
+    touched[positions[existing]] = True
+    new_rows = changes[~existing]
+    if len(new_rows):
+        out = pd.concat([out, new_rows.reindex(columns=out.columns)], ignore_index=True)
+        touched = np.concatenate([touched, np.ones(len(new_rows), dtype=bool)])
+    return out, touched
+
+
+def compare(computed: pd.DataFrame, baseline: pd.DataFrame, features=None):
+    """Özellik başına eşleşme oranı; ikisinde de tanımlı hücreler karşılaştırılır."""
+    report = {}
+    for name in features or FEATURES:
+        a, b = computed[name], baseline[name]
+        both = a.notna() & b.notna()
+        if pd.api.types.is_float_dtype(a) and pd.api.types.is_float_dtype(b):
+            equal = np.isclose(a[both].astype(float), b[both].astype(float), rtol=1e-9, atol=1e-12)
+        else:
+            equal = (a[both].astype(str) == b[both].astype(str)).to_numpy()
+        report[name] = {"compared": int(both.sum()), "match_rate": float(equal.mean()) if both.any() else 1.0}
+    return report
+
+
+def scale_frame(df: pd.DataFrame, factor: int) -> pd.DataFrame:
+    """Ülkeleri factor kez kopyalayarak büyütülmüş sentetik veri seti."""
+    copies = [df] + [df.assign(country_name=df['country_name'].astype(str) + f" #{i}") for i in range(1, factor)]
+    return pd.concat(copies, ignore_index=True)
+
+
+def benchmark(df: pd.DataFrame, factor=100, repeat=3):
+    """Tam ve artımlı hesaplama sürelerini (saniye) ölç."""
+    pipeline = FeaturePipeline()
+    big = scale_frame(df[pipeline.raw_columns + [c for c in KEYS if c not in pipeline.raw_columns]], factor)
+
+    def best(func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+        return min(timings), result
+
+    full_time, computed = best(lambda: pipeline.compute(big))
+    row = computed.sample(1, random_state=0)
+    change = row[KEYS].assign(gdp_per_capita=row['gdp_per_capita'] * 1.1)
+    gdp_time, _ = best(lambda: pipeline.update(computed, change))
+    change = row[KEYS].assign(life_ladder=row['life_ladder'] + 0.5)
+    happiness_time, _ = best(lambda: pipeline.update(computed, change))
+    return {
+        "rows": len(big),
+        "full": full_time,
+        "update_gdp": gdp_time,
+        "update_life_ladder": happiness_time,
+    }
+
+
+def main(argv=None):
+    from .config import get_data_path
+
+    parser = argparse.ArgumentParser(description="Türetilmiş sütunları ham metriklerden yeniden üret.")
+    parser.add_argument("path", nargs="?", default=None, help="CSV dosyası (varsayılan: veri seti)")
+    parser.add_argument("-o", "--output", help="Yeniden üretilmiş CSV'nin yazılacağı dosya")
+    parser.add_argument("--check", action="store_true", help="CSV'deki mevcut değerlerle karşılaştır")
+    parser.add_argument("--bench", type=int, metavar="KAT", help="Veriyi KAT kez büyütüp süre ölç")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.path or get_data_path())
+    pipeline = FeaturePipeline()
+
+    if args.bench:
+        result = benchmark(df, args.bench)
+        print(f"{result['rows']:,d} satır")
+        print(f"  tam hesaplama:             {result['full'] * 1000:8.1f} ms")
+        print(f"  artımlı (gdp_per_capita):  {result['update_gdp'] * 1000:8.1f} ms")
+        print(f"  artımlı (life_ladder):     {result['update_life_ladder'] * 1000:8.1f} ms")
+        return 0
+
+    computed = pipeline.compute(df)
+    if args.check:
+        for name, info in compare(computed, df).items():
+            print(f"{name:28s} {info['compared']:6d} hücre  eşleşme %{info['match_rate'] * 100:.2f}")
+    if args.output:
+        computed.to_csv(args.output, index=False)
+        print(f"{len(computed)} satır yazıldı: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
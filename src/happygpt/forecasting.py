@@ -0,0 +1,389 @@
+"""Ülke × metrik projeksiyonları (toplu iş).
+
+İki hafif model vardır:
+
+    damped  sönümlü doğrusal trend (Holt, φ): her seri için (α, β, φ)
+            ızgarasından bir adım ileri hata kareler toplamı en küçük olan
+            seçilir. Tüm seriler ve ızgara noktaları tek bir (ızgara × seri)
+            dizisi üzerinde, yıl ekseninde tek döngüyle işlenir.
+    arx     mutluluk için farklarda dışsal faktörlü AR(1):
+            Δy[t] = ρ·Δy[t-1] + β·Δx[t]; gelecekteki faktör değerleri
+            faktörlerin sönümlü trend projeksiyonlarıdır. (Düzeylerde ülke
+            sabit etkili AR, geriye dönük testte saf "son değer" tahmininden
+            kötü çıktığı için farklar kullanılır.)
+
+Aralıklar normal yaklaşımla hesaplanır; arx aralığı faktör projeksiyonlarının
+belirsizliğini de içerir. GDP log ölçeğinde modellenir. Projeksiyonlar her
+serinin son gözleminden sonraki yıllar için üretilir ve veri sürümüyle
+birlikte diske yazılır; istek anında model kurulmaz.
+
+Kullanım (src/ dizininden):
+    python -m happygpt.forecasting [--horizon 5] [--country Turkiye]
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .cache import VersionedStore, frame_fingerprint
+from .countries import dataset_alias_index, extract_entities
+from .panel import get_panel
+from .scenarios import BOUNDS as FACTOR_BOUNDS
+from .schema import LOG_METRICS, MODEL_FACTORS, TARGET
+
+METRICS = [TARGET, *MODEL_FACTORS]
+# arx modelindeki dışsal faktörler (hepsi METRICS içinde olmalı)
+EXOG_FACTORS = ['gdp_per_capita', 'social_support', 'freedom_to_make_life_choices', 'perceptions_of_corruption']
+BOUNDS = {'life_ladder': (0.0, 10.0), **FACTOR_BOUNDS}
+
+HORIZON = 5
+LEVEL = 0.95
+MIN_OBS = 6
+# Son gözlemi veri setinin son yılından bu kadar eskiye kalan seriler projekte edilmez
+MAX_STALE_YEARS = 3
+ALPHAS = (0.1, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.05, 0.2, 0.5)
+PHIS = (0.8, 0.9, 0.98)
+
+FORECAST_COLUMNS = ['country_name', 'metric', 'model', 'year', 'horizon', 'forecast', 'ci_low', 'ci_high']
+MODEL_COLUMNS = ['country_name', 'metric', 'model', 'alpha', 'beta', 'phi', 'sigma', 'n_obs']
+
+# Soruda bu kelimeler geçerse agent bağlamına projeksiyonlar eklenir
+FORECAST_WORDS = ("tahmin", "projeksiyon", "öngörü", "gelecek", "ileride", "beklenti", "forecast", "sürdürülebilir")
+
+
+def _transform(values, metric):
+    return np.log(np.clip(values, 1e-9, None)) if metric in LOG_METRICS else values
+
+
+def _inverse(values, metric):
+    """Model ölçeğinden metrik ölçeğine, geçerli aralığa kırpılmış."""
+    values = np.exp(values) if metric in LOG_METRICS else values
+    low, high = BOUNDS.get(metric, (None, None))
+    return values if low is None and high is None else np.clip(values, low, high)
+
+
+def _recursion(Y, alpha, beta, phi, init_trend):
+    """Sönümlü trend özyinelemesi; parametreler (ızgara × seri) şekline yayınlanır.
+
+    (hata kareler toplamı, bir adım ileri tahminler (ızgara, seri, yıl),
+    son düzey, son trend) döner. Eksik yıllarda durum güncellenmeden taşınır.
+    """
+    n_series, n_years = Y.shape
+    shape = np.broadcast_shapes(np.shape(alpha), (1, n_series))
+    level = np.zeros(shape)
+    trend = np.broadcast_to(init_trend, shape).copy()
+    started = np.zeros(n_series, dtype=bool)
+    sse = np.zeros(shape)
+    fitted = np.full((*shape, n_years), np.nan)
+    for t in range(n_years):
+        y = Y[:, t]
+        observed = ~np.isnan(y)
+        forecast = level + phi * trend
+        fitted[..., t] = np.where(started, forecast, np.nan)
+        update = started & observed
+        error = np.where(update, y - forecast, 0.0)
+        sse += error * error
+        trend = np.where(started, phi * trend + alpha * beta * error, trend)
+        level = np.where(started, forecast + alpha * error, np.where(observed, y, 0.0))
+        started |= observed
+    return sse, fitted, level, trend
+
+
+class DampedFit:
+    """Seri başına seçilmiş parametreler ve (seri, yıl + ufuk) tahmin yolu."""
+
+    def __init__(self, Y, horizon=HORIZON):
+        n_series, n_years = Y.shape
+        observed = ~np.isnan(Y)
+        self.n_obs = observed.sum(axis=1)
+        self.last = np.where(self.n_obs > 0, n_years - 1 - np.argmax(observed[:, ::-1], axis=1), -1)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # Tek gözlemli seriler
+            init_trend = np.nan_to_num(np.nanmedian(np.diff(Y, axis=1), axis=1))
+
+        grid = np.array(list(itertools.product(ALPHAS, BETAS, PHIS)))
+        sse, *_ = _recursion(Y, grid[:, 0, None], grid[:, 1, None], grid[:, 2, None], init_trend)
+        best = grid[np.argmin(sse, axis=0)]  # (seri, 3)
+        self.alpha, self.beta, self.phi = best.T
+        sse, fitted, level, trend = _recursion(Y, self.alpha[None], self.beta[None], self.phi[None], init_trend)
+        # İlk gözlem düzeyi başlatır; α, β, φ için üç serbestlik derecesi düşülür
+        self.sigma = np.sqrt(sse[0] / np.maximum(self.n_obs - 4, 1))
+
+        steps = np.arange(1, horizon + 1)
+        damping = np.cumsum(self.phi[:, None] ** steps, axis=1)  # φ + φ² + ... + φ^h
+        future = level[0][:, None] + damping * trend[0][:, None]
+        self.path = np.concatenate([fitted[0], future], axis=1)
+
+        # h adım varyans katsayısı: 1 + Σ_{j<h} α²(1 + β·φ_j)²
+        k = np.arange(n_years + horizon)[None, :] - self.last[:, None]
+        max_k = max(int(k.max()), 1)
+        phi_j = np.cumsum(self.phi[:, None] ** np.arange(1, max_k + 1), axis=1)
+        terms = (self.alpha[:, None] * (1 + self.beta[:, None] * phi_j)) ** 2
+        factor = np.concatenate([np.ones((n_series, 1)), 1 + np.cumsum(terms, axis=1)], axis=1)
+        k_index = np.clip(k - 1, 0, max_k)
+        self.variance = np.where(k > 0, self.sigma[:, None] ** 2 * np.take_along_axis(factor, k_index, axis=1), 0.0)
+        self.steps = k
+        self.valid = self.n_obs >= MIN_OBS
+
+
+def _arx(y, exog_values, exog_variance, horizon):
+    """Farklarda ARX; (tahmin yolu, varyans yolu, son gözlem indeksleri, özet) ya da kurulamazsa None.
+
+    exog_values/exog_variance: (ülke, yıl + ufuk, faktör) model ölçeğinde
+    faktör yolu ve varyansı (gözlenen hücrelerde varyans 0).
+    """
+    n_countries, n_years = y.shape
+    change = np.full_like(y, np.nan)
+    change[:, 1:] = y[:, 1:] - y[:, :-1]
+    change_lag = np.full_like(y, np.nan)
+    change_lag[:, 1:] = change[:, :-1]
+    exog_change = np.full_like(exog_values, np.nan)
+    exog_change[:, 1:] = exog_values[:, 1:] - exog_values[:, :-1]
+    rows = ~np.isnan(change) & ~np.isnan(change_lag) & ~np.isnan(exog_change[:, :n_years]).any(axis=-1)
+    k = 1 + exog_values.shape[-1]
+    if rows.sum() <= k:
+        return None
+
+    X = np.column_stack([change_lag[rows], exog_change[:, :n_years][rows]])
+    coef, *_ = np.linalg.lstsq(X, change[rows], rcond=None)
+    residuals = change[rows] - X @ coef
+    sigma2 = residuals @ residuals / (len(residuals) - k)
+    rho, beta = coef[0], coef[1:]
+
+    # Son gözlemden itibaren adım adım; faktör gözlenmişse gerçek değişimi, değilse projeksiyonu
+    total = n_years + horizon
+    observed = ~np.isnan(y)
+    last = np.where(observed.any(axis=1), n_years - 1 - np.argmax(observed[:, ::-1], axis=1), -1)
+    rows_idx = np.arange(n_countries)
+    level = np.where(last >= 0, y[rows_idx, np.maximum(last, 0)], np.nan)
+    step = np.nan_to_num(change[rows_idx, np.maximum(last, 0)])
+    # Faktör değişiminin varyansı, faktör varyansındaki artış olarak yaklaşılır
+    exog_step_var = np.clip(np.diff(exog_variance, axis=1, prepend=0.0), 0.0, None)
+    shock_var = sigma2 + exog_step_var @ (beta ** 2)  # (ülke, yıl)
+    # Düzey hatası L, fark hatası D: D' = ρD + e, L' = L + D'
+    var_level = np.zeros(n_countries)
+    var_step = np.zeros(n_countries)
+    cov = np.zeros(n_countries)
+    path = np.full((n_countries, total), np.nan)
+    variance = np.zeros((n_countries, total))
+    for t in range(1, total):
+        active = t > last
+        new_step = rho * step + np.nan_to_num(exog_change[:, t] @ beta)
+        new_var_step = rho ** 2 * var_step + shock_var[:, t]
+        new_var_level = var_level + new_var_step + 2 * rho * cov
+        cov = np.where(active, rho * cov + new_var_step, cov)
+        step = np.where(active, new_step, step)
+        level = np.where(active, level + new_step, level)
+        var_step = np.where(active, new_var_step, var_step)
+        var_level = np.where(active, new_var_level, var_level)
+        path[:, t] = np.where(active, level, np.nan)
+        variance[:, t] = np.where(active, var_level, 0.0)
+    summary = {'rho': float(rho), 'coef': dict(zip(EXOG_FACTORS, map(float, beta))), 'sigma': float(np.sqrt(sigma2)),
+               'n_obs': int(len(residuals)), 'n_countries': int(rows.any(axis=1).sum())}
+    return path, variance, last, summary
+
+
+def _rows(panel, metric, model, path, variance, steps, keep, horizon):
+    """Son gözlemden sonraki yıllar için uzun formatlı projeksiyon satırları."""
+    from scipy import stats
+
+    years = np.arange(panel.years[0], panel.years[-1] + horizon + 1)
+    fresh = steps[:, len(panel.years) - 1] <= MAX_STALE_YEARS
+    mask = (steps > 0) & (keep & fresh)[:, None] & ~np.isnan(path)
+    c, t = np.nonzero(mask)
+    margin = stats.norm.ppf(0.5 + LEVEL / 2) * np.sqrt(variance[c, t])
+    value = path[c, t]
+    return pd.DataFrame({
+        'country_name': panel.countries[c],
+        'metric': metric,
+        'model': model,
+        'year': years[t],
+        'horizon': steps[c, t],
+        'forecast': _inverse(value, metric),
+        'ci_low': _inverse(value - margin, metric),
+        'ci_high': _inverse(value + margin, metric),
+    })
+
+
+def compute(df: pd.DataFrame, horizon=HORIZON):
+    """Tüm ülke × metrik serileri için (projeksiyonlar, model parametreleri, arx özeti)."""
+    panel = get_panel(df)
+    metrics = [m for m in METRICS if m in panel.metric_index]
+    n_countries, n_years = len(panel.countries), len(panel.years)
+    # (metrik · ülke, yıl): tüm seriler tek dizide
+    Y = np.concatenate([_transform(np.where(panel.observed, panel.metric(m), np.nan), m) for m in metrics])
+    fit = DampedFit(Y, horizon)
+
+    def block(array, j):
+        return array[j * n_countries:(j + 1) * n_countries]
+
+    forecasts, models = [], []
+    for j, metric in enumerate(metrics):
+        series_steps = np.arange(n_years + horizon)[None, :] - block(fit.last, j)[:, None]
+        forecasts.append(_rows(panel, metric, 'damped', block(fit.path, j), block(fit.variance, j),
+                               series_steps, block(fit.valid, j), horizon))
+        models.append(pd.DataFrame({
+            'country_name': panel.countries, 'metric': metric, 'model': 'damped',
+            'alpha': block(fit.alpha, j), 'beta': block(fit.beta, j), 'phi': block(fit.phi, j),
+            'sigma': block(fit.sigma, j), 'n_obs': block(fit.n_obs, j),
+        })[block(fit.valid, j)])
+
+    arx_summary = None
+    if TARGET in metrics and all(f in metrics for f in EXOG_FACTORS):
+        exog = [metrics.index(f) for f in EXOG_FACTORS]
+        observed_x = np.stack([np.pad(block(Y, j), ((0, 0), (0, horizon)), constant_values=np.nan) for j in exog], axis=-1)
+        path_x = np.stack([block(fit.path, j) for j in exog], axis=-1)
+        var_x = np.stack([block(fit.variance, j) for j in exog], axis=-1)
+        exog_values = np.where(np.isnan(observed_x), path_x, observed_x)
+        exog_variance = np.where(np.isnan(observed_x), var_x, 0.0)
+        result = _arx(block(Y, metrics.index(TARGET)), exog_values, np.nan_to_num(exog_variance), horizon)
+        if result is not None:
+            path, variance, last, arx_summary = result
+            steps = np.arange(n_years + horizon)[None, :] - last[:, None]
+            keep = (~np.isnan(path)).any(axis=1)
+            arx = _rows(panel, TARGET, 'arx', path, variance, steps, keep, horizon)
+            # Mutlulukta arx kurulabilen ülkeler için damped projeksiyonunun yerini alır
+            covered = set(arx['country_name'])
+            forecasts[0] = forecasts[0][~forecasts[0]['country_name'].isin(covered)]
+            forecasts.append(arx)
+
+    table = pd.concat(forecasts, ignore_index=True)[FORECAST_COLUMNS]
+    return table.sort_values(['metric', 'country_name', 'year'], ignore_index=True), \
+        pd.concat(models, ignore_index=True)[MODEL_COLUMNS], arx_summary
+
+
+class ForecastStore(VersionedStore):
+    """Veri seti sürümüne bağlı, diskte saklanan projeksiyon tabloları."""
+
+    FILE_NAME = "forecasts.json"
+    THREAD_NAME = "happygpt-forecast-refresh"
+
+    def __init__(self, path=None):
+        self.arx = None
+        self._set(pd.DataFrame(columns=FORECAST_COLUMNS), pd.DataFrame(columns=MODEL_COLUMNS))
+        super().__init__(path)
+
+    def _set(self, forecasts, models):
+        self.table = forecasts.reset_index(drop=True)
+        self.models = models.reset_index(drop=True)
+        # (ülke, metrik) ve metrik indeksleri: sorgular tabloyu taramaz
+        self._by_series = self.table.groupby(['country_name', 'metric']).indices if len(self.table) else {}
+        self._by_metric = self.table.groupby('metric').indices if len(self.table) else {}
+
+    def _state(self):
+        return {"arx": self.arx,
+                "forecasts": json.loads(self.table.to_json(orient="records")),
+                "models": json.loads(self.models.to_json(orient="records"))}
+
+    def _restore(self, data):
+        self.arx = data.get("arx")
+        self._set(pd.DataFrame(data.get("forecasts", []), columns=FORECAST_COLUMNS),
+                  pd.DataFrame(data.get("models", []), columns=MODEL_COLUMNS))
+
+    def refresh(self, df, horizon=HORIZON):
+        """Tüm serileri yeniden modelle ve kaydet; projeksiyon satırı sayısını döndür."""
+        version = frame_fingerprint(df)
+        forecasts, models, arx = compute(df, horizon)
+        with self._lock:
+            self.dataset_version = version
+            self.arx = arx
+            self._set(forecasts, models)
+            self._save()
+        return len(forecasts)
+
+    def forecast(self, country, metric=TARGET, df=None):
+        """Bir serinin projeksiyonları (yıla göre); depo bu sürüm için hazır değilse None."""
+        with self._lock:
+            if not self.ready(df):
+                return None
+            return self.table.iloc[self._by_series.get((country, metric), [])].sort_values('year')
+
+    def outlook(self, metric=TARGET, year=None, df=None):
+        """Ülke başına verilen (varsayılan: en uzak) yıl projeksiyonu; hazır değilse None."""
+        with self._lock:
+            if not self.ready(df):
+                return None
+            result = self.table.iloc[self._by_metric.get(metric, [])]
+        if result.empty:
+            return result
+        year = int(result['year'].max()) if year is None else int(year)
+        return result[result['year'] == year].reset_index(drop=True)
+
+
+def get_store() -> ForecastStore:
+    """Süreçte paylaşılan projeksiyon deposu."""
+    return ForecastStore.shared()
+
+
+def _latest(df, country, metric):
+    rows = df.loc[(df['country_name'] == country) & df[metric].notna(), ['year', metric]]
+    return None if rows.empty else rows.loc[rows['year'].idxmax()]
+
+
+def question_context(df, question):
+    """Projeksiyon soruları için agent bağlamı; depo hazır değilse hesaplamayı başlatıp None döner."""
+    lowered = question.lower()
+    if not any(word in lowered for word in FORECAST_WORDS):
+        return None
+    store = get_store()
+    if not store.ready(df):
+        store.ensure(df)
+        return None
+    countries = [name for kind, name, _ in extract_entities(question, dataset_alias_index(df)) if kind == "country"]
+    lines = []
+    for country in countries:
+        for metric in (TARGET, *EXOG_FACTORS):
+            found = store.forecast(country, metric, df)
+            latest = _latest(df, country, metric)
+            if found is None or found.empty or latest is None:
+                continue
+            points = ", ".join(f"{row.year}: {row.forecast:.3g} [{row.ci_low:.3g}, {row.ci_high:.3g}]"
+                               for row in found.itertuples())
+            lines.append(f"- {country}, {metric} ({found['model'].iloc[0]}; son gözlem {int(latest['year'])}: "
+                         f"{latest[metric]:.3g}): {points}")
+    if not countries:
+        outlook = store.outlook(df=df)
+        if outlook is not None and not outlook.empty:
+            latest = df.loc[df[TARGET].notna()].sort_values('year').groupby('country_name', observed=True)[TARGET].last()
+            outlook = outlook.assign(change=outlook['forecast'] - outlook['country_name'].map(latest).astype(float))
+            outlook = outlook.dropna(subset=['change']).sort_values('change')
+            year = int(outlook['year'].iloc[0])
+            lines.append(f"- {year} mutluluk projeksiyonu, son gözleme göre en çok düşmesi beklenenler: "
+                         + ", ".join(f"{r.country_name} {r.change:+.2f}" for r in outlook.head(5).itertuples()))
+            lines.append(f"- {year} mutluluk projeksiyonu, en çok artması beklenenler: "
+                         + ", ".join(f"{r.country_name} {r.change:+.2f}" for r in outlook.tail(5)[::-1].itertuples()))
+    if lines and store.arx:
+        coef = ", ".join(f"{k} {v:+.3g}" for k, v in store.arx['coef'].items())
+        lines.append(f"- Mutluluk modeli: farklarda ARX, ρ={store.arx['rho']:.2f}, {coef}; "
+                     f"aralıklar %{LEVEL * 100:.0f}, faktör projeksiyonu belirsizliği dahil")
+    return "\n".join(lines) or None
+
+
+def main(argv=None):
+    from .dataset import get_dataset
+
+    parser = argparse.ArgumentParser(description="Ülke × metrik projeksiyonlarını önceden hesapla.")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help="Son veri yılından sonraki yıl sayısı")
+    parser.add_argument("--country", default=None, help="Bu ülkenin mutluluk projeksiyonunu yazdır")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    store = ForecastStore()
+    count = store.refresh(get_dataset().frame, args.horizon)
+    if args.country:
+        with pd.option_context('display.width', 120, 'display.float_format', '{:.4g}'.format):
+            print(store.forecast(args.country).to_string(index=False))
+    print(f"{count} projeksiyon satırı, {len(store.models)} seri kaydedildi ({time.perf_counter() - start:.2f}s).",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
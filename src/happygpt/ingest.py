@@ -0,0 +1,292 @@
+"""Ham kaynaklardan veri setinin parça parça (streaming) üretimi.
+
+World Happiness Report ve World Bank çıktıları gibi büyük CSV dosyaları
+belleğe bütünüyle alınmadan işlenir:
+
+1. Tarama: her kaynak dosya ayrı bir süreçte `chunksize` satırlık
+   parçalarla okunur. Her parça `country_code`'un özetine göre sabit sayıda
+   bölüme ayrılır ve bölüm başına Parquet dosyalarına eklenir.
+2. Birleştirme: her bölüm ayrı bir süreçte tüm kaynaklardan okunur,
+   (country_code, year) üzerinden birleştirilir ve `preprocess` uygulanır.
+   Yolsuzluk ölçeklemesi taramada toplanan genel en büyük değerle yapılır.
+3. Çıktı: tipli Parquet parçaları ve satır sayılarını, kaynak özetlerini ve
+   içerik özetini içeren `manifest.json`.
+
+Bellek kullanımı bir parçayla ve bir bölümle sınırlıdır. Yalnızca yerel
+dosyalar okunur.
+
+Kullanım (src/ dizininden):
+    python -m happygpt.ingest whr.csv worldbank.csv -o ../data/dataset
+    HAPPYGPT_DATA_PATH=../data/dataset streamlit run ana_script.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .data import preprocess
+from .schema import CATEGORY_COLUMNS, FLAG_COLUMNS, INTEGER_COLUMNS
+
+KEYS = ['country_code', 'year']
+MANIFEST_NAME = "manifest.json"
+
+
+def _file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _partition_of(codes: pd.Series, partitions: int) -> np.ndarray:
+    # Süreçler arasında kararlı olmalı (hash() tohumlu olduğundan kullanılmaz)
+    return (pd.util.hash_array(codes.to_numpy(dtype=object)) % np.uint64(partitions)).astype(int)
+
+
+def _normalize_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Anahtarları temizle, sayısal sütunları float64'e sabitle."""
+    missing = [key for key in KEYS if key not in chunk.columns]
+    if missing:
+        raise ValueError(f"Kaynakta anahtar sütun(lar) yok: {', '.join(missing)}")
+    chunk = chunk.dropna(subset=KEYS)
+    updates = {
+        'country_code': chunk['country_code'].astype(str).str.strip().str.upper(),
+        'year': chunk['year'].astype('int64'),
+    }
+    for col in chunk.columns:
+        if col in KEYS:
+            continue
+        if pd.api.types.is_bool_dtype(chunk[col]):
+            continue
+        if pd.api.types.is_numeric_dtype(chunk[col]):
+            # Parçalar arasında int/float kayması şemayı bozmasın
+            updates[col] = chunk[col].astype('float64')
+        else:
+            updates[col] = chunk[col].astype('string')
+    return chunk.assign(**updates)
+
+
+def _widen_schema(schema, other):
+    """Türü parçalar arasında çelişen sütunları metne genişlet.
+
+    Seyrek bir sütun ilk parçada tamamen boşsa float64 okunur; sonraki parçada
+    metin gelirse şema bozulmasın diye sütun string olur.
+    """
+    import pyarrow as pa
+
+    if all(other.field(field.name).type == field.type for field in schema):
+        return schema
+    return pa.schema([field if other.field(field.name).type == field.type else field.with_type(pa.string())
+                      for field in schema])
+
+
+def _spill_path(spill_dir, part, source_id):
+    return Path(spill_dir) / f"part-{part:05d}" / f"source-{source_id:03d}.parquet"
+
+
+def scan_source(path, spill_dir, source_id, partitions, chunksize):
+    """Bir kaynağı parça parça oku ve bölümlere dağıt (işçi süreçte çalışır)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writers, schema = {}, None
+    rows = chunks = 0
+    corruption_max = None
+    columns = []
+    try:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            chunk = _normalize_chunk(chunk)
+            chunks += 1
+            rows += len(chunk)
+            if 'perceptions_of_corruption' in chunk:
+                chunk_max = chunk['perceptions_of_corruption'].max()
+                if pd.notna(chunk_max):
+                    corruption_max = chunk_max if corruption_max is None else max(corruption_max, chunk_max)
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if schema is None:
+                schema, columns = table.schema, list(chunk.columns)
+            else:
+                table = table.select(schema.names)
+                widened = _widen_schema(schema, table.schema)
+                if widened is not schema:
+                    # Yazılmış bölüm dosyaları yeni şemayla yeniden yazılır (sütun başına en fazla bir kez)
+                    schema = widened
+                    for part, writer in writers.items():
+                        writer.close()
+                        target = _spill_path(spill_dir, part, source_id)
+                        written = pq.read_table(target).cast(schema)
+                        writers[part] = pq.ParquetWriter(target, schema)
+                        writers[part].write_table(written)
+                table = table.cast(schema)
+
+            buckets = _partition_of(chunk['country_code'], partitions)
+            for part in np.unique(buckets):
+                writer = writers.get(part)
+                if writer is None:
+                    target = _spill_path(spill_dir, part, source_id)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    writer = writers[part] = pq.ParquetWriter(target, schema)
+                writer.write_table(table.filter(pa.array(buckets == part)))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return {
+        "path": str(path),
+        "bytes": os.path.getsize(path),
+        "sha256": _file_sha256(path),
+        "rows": rows,
+        "chunks": chunks,
+        "columns": columns,
+        "corruption_max": None if corruption_max is None else float(corruption_max),
+    }
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Çıktı şeması: düşük kardinaliteli metinler sözlük kodlu, tamsayılar sabit genişlikte."""
+    updates = {}
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS:
+            updates[col] = df[col].astype(object).astype('category')
+        elif col in INTEGER_COLUMNS:
+            updates[col] = df[col].round().astype('Int64' if df[col].isna().any() else INTEGER_COLUMNS[col])
+        elif col in FLAG_COLUMNS and pd.api.types.is_float_dtype(df[col]) and df[col].notna().all():
+            updates[col] = df[col].astype('int64')  # 0/1 üyelik bayrakları
+        elif isinstance(df[col].dtype, pd.StringDtype):
+            updates[col] = df[col].astype(object)
+    return df.assign(**updates)
+
+
+def join_partition(spill_dir, part, source_count, out_dir, how, corruption_max):
+    """Bir bölümü tüm kaynaklardan birleştir, ön işle ve yaz (işçi süreçte çalışır)."""
+    part_dir = Path(spill_dir) / f"part-{part:05d}"
+    merged = None
+    for source_id in range(source_count):
+        path = part_dir / f"source-{source_id:03d}.parquet"
+        frame = pd.read_parquet(path) if path.exists() else None
+        if frame is None:
+            if how == "inner" or (how == "left" and source_id == 0):
+                return None
+            continue
+        # Aynı anahtar bir kaynakta birden çok kez geçerse son kayıt geçerlidir
+        frame = frame.drop_duplicates(KEYS, keep='last')
+        if merged is None:
+            merged = frame
+        else:
+            extra = [col for col in frame.columns if col not in merged.columns]
+            merged = merged.merge(frame[KEYS + extra], on=KEYS, how=how)
+    if merged is None or merged.empty:
+        return None
+
+    if 'country_name' in merged:
+        merged['country_name'] = merged['country_name'].astype(object)
+    if {'country_name', 'perceptions_of_corruption'} <= set(merged.columns):
+        merged = preprocess(merged, corruption_max=corruption_max if corruption_max is not None else 0)
+    merged = _typed(merged.sort_values(KEYS, ignore_index=True))
+
+    target = Path(out_dir) / f"part-{part:05d}.parquet"
+    merged.to_parquet(target, index=False)
+    content = hashlib.sha256(pd.util.hash_pandas_object(merged, index=False).values.tobytes()).hexdigest()
+    return {"file": target.name, "rows": len(merged), "content_hash": content,
+            "columns": list(merged.columns), "dtypes": {c: str(t) for c, t in merged.dtypes.items()}}
+
+
+def _check_local(path):
+    text = str(path)
+    if "://" in text:
+        raise ValueError(f"Yalnızca yerel dosyalar desteklenir: {text}")
+    path = Path(text)
+    if not path.is_file():
+        raise FileNotFoundError(text)
+    return path.resolve()
+
+
+def ingest(sources, output, chunksize=50_000, partitions=16, workers=None, how="inner"):
+    """Kaynakları birleştirip `output` dizinine tipli Parquet + manifest yaz.
+
+    Çıktı önce geçici dizinde hazırlanır, sonra tek adımda yerine konur.
+    Manifest sözlüğünü döndürür.
+    """
+    sources = [_check_local(path) for path in sources]
+    output = Path(output).resolve()
+    if output.exists() and not (output / MANIFEST_NAME).is_file():
+        # Yalnızca daha önceki bir ingest çıktısının yerine yazılır
+        raise ValueError(f"Çıktı yolu zaten var ve önceki bir ingest çıktısı değil ({MANIFEST_NAME} yok): {output}")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    started = time.time()
+
+    with tempfile.TemporaryDirectory(prefix=".ingest-", dir=output.parent) as work_dir:
+        spill_dir = Path(work_dir) / "spill"
+        staged = Path(work_dir) / "output"
+        staged.mkdir()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            scans = list(pool.map(scan_source, sources, [spill_dir] * len(sources), range(len(sources)),
+                                  [partitions] * len(sources), [chunksize] * len(sources)))
+            maxima = [scan["corruption_max"] for scan in scans if scan["corruption_max"] is not None]
+            corruption_max = max(maxima) if maxima else None
+            parts = [p for p in pool.map(join_partition, [spill_dir] * partitions, range(partitions),
+                                         [len(sources)] * partitions, [staged] * partitions,
+                                         [how] * partitions, [corruption_max] * partitions) if p]
+
+        content = hashlib.sha256()
+        for part in parts:
+            content.update(part["content_hash"].encode())
+        manifest = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+            "duration_seconds": round(time.time() - started, 3),
+            "join": {"keys": KEYS, "how": how},
+            "corruption_max": corruption_max,
+            "sources": [{k: v for k, v in scan.items() if k != "corruption_max"} for scan in scans],
+            "rows": sum(part["rows"] for part in parts),
+            "columns": parts[0]["columns"] if parts else [],
+            "dtypes": parts[0]["dtypes"] if parts else {},
+            "partitions": [{"file": p["file"], "rows": p["rows"], "content_hash": p["content_hash"]} for p in parts],
+            "content_hash": content.hexdigest(),
+        }
+        with open(staged / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        if output.exists():
+            shutil.rmtree(output)
+        os.replace(staged, output)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ham kaynak CSV'lerinden tipli veri seti üret.")
+    parser.add_argument("sources", nargs="+", help="Kaynak CSV dosyaları (country_code ve year içermeli)")
+    parser.add_argument("-o", "--output", required=True, help="Çıktı dizini (Parquet parçaları + manifest)")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="Parça başına satır sayısı")
+    parser.add_argument("--partitions", type=int, default=16, help="Birleştirme bölümü sayısı")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--how", choices=["inner", "left", "outer"], default="inner",
+                        help="Birleştirme türü (left: ilk kaynak esas alınır)")
+    args = parser.parse_args(argv)
+
+    try:
+        manifest = ingest(args.sources, args.output, args.chunksize, args.partitions, args.workers, args.how)
+    except (OSError, ValueError) as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 1
+
+    for source in manifest["sources"]:
+        print(f"{source['path']}: {source['rows']:,d} satır, {source['chunks']} parça", file=sys.stderr)
+    print(f"{manifest['rows']:,d} satır, {len(manifest['partitions'])} dosya -> {args.output} "
+          f"(içerik özeti {manifest['content_hash'][:16]})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""LLM istemcisi (LangChain ilk kullanımda yüklenir)."""
+
+import os
+import threading
+
+from .config import get_api_key
+
+
+class MissingAPIKeyError(RuntimeError):
+    """Google API anahtarı bulunamadığında fırlatılır."""
+
+
+_llm = None
+_llm_lock = threading.Lock()
+
+
+def _create_gemini():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    api_key = get_api_key()
+    if not api_key:
+        raise MissingAPIKeyError("Google API anahtarı bulunamadı. Lütfen .env dosyasını kontrol edin.")
+    return ChatGoogleGenerativeAI(
+        model="gemini-pro",
+        temperature=0.05,
+        google_api_key=api_key,
+        max_output_tokens=2048,
+        top_p=0.9,
+        top_k=20,
+        timeout=120,
+        retry_max_attempts=3,
+        retry_min_wait=1,
+        cache=False
+    )
+
+
+def _create_mock():
+    from .mock_llm import MockLLM
+
+    return MockLLM()
+
+
+def load_llm_model():
+    """Süreç başına tek LLM örneği döndür.
+
+    HAPPYGPT_LLM=mock ise API anahtarı gerektirmeyen yerel sahte model kullanılır.
+    """
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                if os.getenv("HAPPYGPT_LLM", "gemini").lower() == "mock":
+                    _llm = _create_mock()
+                else:
+                    _llm = _create_gemini()
+    return _llm
+
+
+def reset_llm_model():
+    """Önbellekteki LLM örneğini bırak (ör. ortam değişkeni değiştikten sonra)."""
+    global _llm
+    with _llm_lock:
+        _llm = None
@@ -0,0 +1,59 @@
+"""API anahtarı olmadan yerel çalışma ve denemeler için sahte LLM."""
+
+import hashlib
+import random
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+
+class MockLLM(LLM):
+    """Sorudan deterministik bir yanıt üreten sahte model."""
+
+    latency: float = 0.0
+    # Dayanıklılık katmanını denemek için: hata ve yavaş yanıt olasılıkları (bkz. resilience)
+    failure_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "happygpt-mock"
+
+    def _answer(self, prompt: str) -> str:
+        if prompt.rstrip().endswith("SQL:"):
+            # Araç modu sorgu adımı (bkz. templates.QUERY_TOOL_TEMPLATE)
+            return ("```sql\nSELECT country_name, life_ladder FROM happiness\n"
+                    "WHERE year = (SELECT MAX(year) FROM happiness) ORDER BY life_ladder DESC LIMIT 5\n```")
+        question = prompt.rsplit("Soru:", 1)[-1].strip().splitlines()[0] if "Soru:" in prompt else prompt[:80]
+        digest = hashlib.sha1(prompt.encode()).hexdigest()[:8]
+        return (
+            f"📊 **Örnek Yanıt** ({digest})\n"
+            f"Soru: {question}\n"
+            "Bu yanıt yerel sahte model tarafından üretilmiştir.\n"
+            "line: x=year, y=mutluluk, countries=turkiye"
+        )
+
+    def _wait(self):
+        delay = self.latency
+        if self.slow_rate and random.random() < self.slow_rate:
+            delay += self.slow_latency
+        if delay:
+            time.sleep(delay)
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError("Sahte model hatası")
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> str:
+        self._wait()
+        return self._answer(prompt)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None,
+                **kwargs: Any) -> Iterator[GenerationChunk]:
+        self._wait()
+        for line in self._answer(prompt).splitlines(keepends=True):
+            chunk = GenerationChunk(text=line)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
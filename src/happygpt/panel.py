@@ -0,0 +1,186 @@
+"""Ülke × yıl × metrik yoğun panel gösterimi.
+
+Uzun formatlı veri seti bir kez (sürüm başına) üç boyutlu bir NumPy dizisine
+çevrilir: `values[ülke, yıl, metrik]`. Gözlenmeyen hücreler NaN'dır ve
+`observed` maskesiyle işaretlenir. Trendler, yıllık değişimler, sıralamalar
+ve kesitler groupby yerine dizi dilimleri ve indirgemelerle hesaplanır.
+
+Yıl ekseni ilk ve son yıl arasında kesintisizdir; böylece yıllık değişim
+her zaman bir önceki takvim yılına göredir.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .schema import FLAG_COLUMNS
+
+
+class Panel:
+    """Yoğun panel ve indeks eşlemeleri."""
+
+    def __init__(self, countries, codes, regions, years, metrics, values, observed):
+        self.countries = np.asarray(countries, dtype=object)
+        self.codes = np.asarray(codes, dtype=object)
+        self.regions = np.asarray(regions, dtype=object)
+        self.years = np.asarray(years, dtype=int)
+        self.metrics = list(metrics)
+        self.values = values
+        self.observed = observed
+
+        self.country_index = {name: i for i, name in enumerate(self.countries)}
+        self.code_index = {code: i for i, code in enumerate(self.codes)}
+        self.year_index = {int(year): i for i, year in enumerate(self.years)}
+        self.metric_index = {name: i for i, name in enumerate(self.metrics)}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, metrics=None) -> "Panel":
+        """Uzun formatlı veri setinden panel oluştur."""
+        if metrics is None:
+            metrics = [col for col in df.select_dtypes('number').columns
+                       if col != 'year' and col not in FLAG_COLUMNS]
+
+        country_codes, countries = pd.factorize(df['country_name'].astype(str), sort=True)
+        years = df['year'].to_numpy(dtype=int)
+        first_year = int(years.min()) if len(years) else 0
+        year_axis = np.arange(first_year, int(years.max()) + 1 if len(years) else 0)
+        year_codes = years - first_year
+
+        values = np.full((len(countries), len(year_axis), len(metrics)), np.nan)
+        values[country_codes, year_codes, :] = df[metrics].to_numpy(dtype='float64', na_value=np.nan)
+        observed = np.zeros((len(countries), len(year_axis)), dtype=bool)
+        observed[country_codes, year_codes] = True
+
+        # Ülke başına sabit öznitelikler: son gözlemdeki değer
+        last = df.assign(_c=country_codes).drop_duplicates('_c', keep='last').sort_values('_c')
+        codes = last['country_code'].astype(str).to_numpy() if 'country_code' in df else countries
+        regions = last['regional_indicator'].astype(str).to_numpy() if 'regional_indicator' in df else [None] * len(countries)
+        return cls(countries, codes, regions, year_axis, metrics, values, observed)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def metric(self, name):
+        """(ülke, yıl) boyutlu görünüm."""
+        return self.values[:, :, self.metric_index[name]]
+
+    def series(self, country, metric):
+        """Bir ülkenin yıllara göre değerleri."""
+        return self.metric(metric)[self.country_index[country]]
+
+    def cross_section(self, year, metric):
+        """Bir yıldaki tüm ülkelerin değerleri (ülke sırasıyla)."""
+        return self.metric(metric)[:, self.year_index[int(year)]]
+
+    def _rows(self, region=None, country=None):
+        if country is not None:
+            return np.array([self.country_index[country]]) if country in self.country_index else np.array([], dtype=int)
+        if region is not None:
+            return np.flatnonzero(self.regions == region)
+        return slice(None)
+
+    def trend(self, metric, region=None, country=None):
+        """Yıllara göre ortalama, standart sapma ve gözlem sayısı.
+
+        Hiç gözlemi olmayan yıllar atlanır; standart sapma pandas ile aynı
+        şekilde ddof=1'dir.
+        """
+        data = self.metric(metric)[self._rows(region, country)]
+        counts = np.sum(~np.isnan(data), axis=0)
+        keep = counts > 0
+        data, counts = data[:, keep], counts[keep]
+        totals = np.nansum(data, axis=0)
+        mean = totals / counts
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = np.nansum((data - mean) ** 2, axis=0) / (counts - 1)
+        std = np.where(counts > 1, np.sqrt(var), np.nan)
+        return pd.DataFrame({'year': self.years[keep], 'mean': mean, 'std': std, 'count': counts})
+
+    def region_trends(self, metric):
+        """Bölge × yıl ortalamaları, uzun formatta (year, regional_indicator, metrik)."""
+        data = self.metric(metric)
+        regions, region_codes = np.unique(self.regions.astype(str), return_inverse=True)
+        sums = np.zeros((len(regions), len(self.years)))
+        counts = np.zeros_like(sums)
+        valid = ~np.isnan(data)
+        np.add.at(sums, region_codes, np.where(valid, data, 0.0))
+        np.add.at(counts, region_codes, valid)
+        region_idx, year_idx = np.nonzero(counts)
+        return pd.DataFrame({
+            'year': self.years[year_idx],
+            'regional_indicator': regions[region_idx],
+            metric: sums[region_idx, year_idx] / counts[region_idx, year_idx],
+        }).sort_values(['year', 'regional_indicator'], ignore_index=True)
+
+    def country_means(self, metric):
+        """Ülkelerin tüm yıllar ortalaması (gözlemi olmayan ülkeler NaN)."""
+        data = self.metric(metric)
+        counts = np.sum(~np.isnan(data), axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.nansum(data, axis=1) / counts
+
+    def pct_change(self, metric):
+        """Bir önceki takvim yılına göre oransal değişim, (ülke, yıl) boyutlu.
+
+        Önceki yıl gözlenmemişse NaN; boşluklar için önce `interpolate()`.
+        """
+        data = self.metric(metric)
+        change = np.full_like(data, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            change[:, 1:] = data[:, 1:] / data[:, :-1] - 1
+        return change
+
+    def ranking(self, metric, year=None, ascending=False, n=None):
+        """(ülke, değer) sıralaması; yıl verilmezse tüm yılların ortalaması."""
+        values = self.country_means(metric) if year is None else self.cross_section(year, metric)
+        valid = np.flatnonzero(~np.isnan(values))
+        # Eşit değerlerde ülke adı sırası korunur
+        order = valid[np.argsort(values[valid] if ascending else -values[valid], kind='stable')]
+        if n is not None:
+            order = order[:n]
+        return pd.DataFrame({'country_name': self.countries[order], metric: values[order]})
+
+    def interpolate(self, limit=None) -> "Panel":
+        """Yıl eksenindeki iç boşlukları doğrusal doldurulmuş yeni panel.
+
+        Serinin başı ve sonu uzatılmaz; limit verilirse yalnızca en fazla
+        `limit` yıllık boşluklar doldurulur. `observed` maskesi değişmez.
+        """
+        n_countries, n_years, n_metrics = self.values.shape
+        flat = np.moveaxis(self.values, 1, 2).reshape(-1, n_years)
+        valid = ~np.isnan(flat)
+        positions = np.arange(n_years)
+
+        prev_idx = np.maximum.accumulate(np.where(valid, positions, -1), axis=1)
+        next_idx = np.minimum.accumulate(np.where(valid, positions, n_years)[:, ::-1], axis=1)[:, ::-1]
+        gap = ~valid & (prev_idx >= 0) & (next_idx < n_years)
+        if limit is not None:
+            gap &= (next_idx - prev_idx - 1) <= limit
+
+        prev_val = np.take_along_axis(flat, np.clip(prev_idx, 0, n_years - 1), axis=1)
+        next_val = np.take_along_axis(flat, np.clip(next_idx, 0, n_years - 1), axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = (positions - prev_idx) / (next_idx - prev_idx)
+        filled = np.where(gap, prev_val + weight * (next_val - prev_val), flat)
+
+        values = np.moveaxis(filled.reshape(n_countries, n_metrics, n_years), 1, 2)
+        return Panel(self.countries, self.codes, self.regions, self.years, self.metrics, values, self.observed)
+
+    def to_frame(self, metrics=None, observed_only=True) -> pd.DataFrame:
+        """Uzun formata geri çevir (country_name, year, metrikler)."""
+        metrics = self.metrics if metrics is None else list(metrics)
+        if observed_only:
+            c_idx, y_idx = np.nonzero(self.observed)
+        else:
+            c_idx, y_idx = np.indices(self.observed.shape).reshape(2, -1)
+        columns = {'country_name': self.countries[c_idx], 'year': self.years[y_idx]}
+        for name in metrics:
+            columns[name] = self.metric(name)[c_idx, y_idx]
+        return pd.DataFrame(columns)
+
+
+@memoize(maxsize=4)
+def get_panel(df: pd.DataFrame) -> Panel:
+    """Veri seti sürümü başına bir kez oluşturulan panel."""
+    return Panel.from_frame(df)
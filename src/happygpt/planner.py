@@ -0,0 +1,82 @@
+"""Bileşik sorular için fan-out/fan-in yürütme.
+
+"Türkiye'de mutluluk trendi nasıl ve neden düştü?" gibi sorular hem veri
+analizi hem nedensel açıklama gerektirir. Planlayıcı soruyu bağlaç ve
+noktalama işaretlerinden parçalara ayırır, her parçayı mevcut yönlendirme
+kurallarıyla bir agent'a eşler ve aynı agent'a düşen parçaları birleştirir;
+yönlendirme sinyali taşımayan parçalar (ör. yalnızca ülke adı) görev açmaz.
+Birden fazla agent çıkarsa alt görevler asyncio ile eşzamanlı (en fazla
+`max_parallel` tanesi aynı anda) çalıştırılır ve çıktılar tek bir kısa
+sentez çağrısıyla birleştirilir; toplam süre alt görevlerin toplamına değil
+en yavaşına yaklaşır.
+"""
+
+import asyncio
+import re
+
+from .config import get_max_parallel_agents
+
+# Alt soruları ayıran bağlaçlar ve işaretler
+_SPLIT = re.compile(r"\?|;|\b(?:ve ayrıca|ayrıca|bunun yanında|bununla birlikte|ek olarak|peki|ve)\b",
+                    re.IGNORECASE)
+MIN_PART_LENGTH = 3
+
+
+class SubTask:
+    """Bir agent'ın yanıtlayacağı alt görev."""
+
+    def __init__(self, agent_type, parts):
+        self.agent_type = agent_type
+        self.parts = parts
+
+    def question(self, question):
+        """Agent'a giden soru: tam soru + alt görevin odağı (özne kaybolmasın diye)."""
+        focus = "; ".join(self.parts)
+        return f"{question}\n\nBu alt görevde yalnızca şuna odaklan: {focus}"
+
+    def __repr__(self):
+        return f"SubTask({self.agent_type!r}, {self.parts!r})"
+
+
+def split_question(question: str):
+    """Soruyu boş olmayan parçalara ayır."""
+    parts = [part.strip(" ,.") for part in _SPLIT.split(question)]
+    return [part for part in parts if len(part) >= MIN_PART_LENGTH]
+
+
+def plan(question: str, route):
+    """Parçaları `route` ile agent'lara eşle; agent başına bir alt görev (ilk görülme sırasıyla).
+
+    `route` sinyal yoksa None döndürür; bu parçalar atlanır.
+    """
+    tasks = {}
+    for part in split_question(question):
+        agent_type = route(part)
+        if agent_type is None:
+            continue
+        tasks.setdefault(agent_type, SubTask(agent_type, [])).parts.append(part)
+    return list(tasks.values())
+
+
+async def fan_out(tasks, run, max_parallel=None):
+    """Her alt görevi `run(task)` ile thread'de çalıştır; en fazla `max_parallel` eşzamanlı.
+
+    Sonuçlar görev sırasıyla döner; hata veren alt görev None verir, diğerleri etkilenmez.
+    """
+    semaphore = asyncio.Semaphore(max_parallel or get_max_parallel_agents())
+
+    async def guarded(task):
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(run, task)
+            except Exception:
+                return None
+
+    return await asyncio.gather(*(guarded(task) for task in tasks))
+
+
+def synthesis_parts(tasks, results, labels):
+    """Sentez prompt'una giden alt yanıt metni; başarısız alt görevler atlanır."""
+    blocks = [f"### {labels.get(task.agent_type, task.agent_type)} ({'; '.join(task.parts)})\n{result}"
+              for task, result in zip(tasks, results) if result]
+    return "\n\n".join(blocks)
@@ -0,0 +1,212 @@
+"""Agent araç kullanımı için süreç içi, salt okunur SQL motoru.
+
+LLM uzun bağlam metni yerine veri setine kısıtlı bir SELECT sorgusu yazar;
+sorgu yerelde bellek içi SQLite üzerinde çalıştırılır ve küçük bir sonuç
+tablosu modele geri verilir. Güvenlik sınırları:
+
+- yalnızca tek bir SELECT/WITH ifadesi; yetkilendirici (authorizer) okuma,
+  SELECT, özyinelemeli CTE ve fonksiyon dışındaki tüm işlemleri reddeder,
+  PRAGMA query_only açık,
+- sorgu süresi (progress handler) ve dönen satır sayısı sınırlı,
+- SQL metni, sonuç satırı boyutu ve ATTACH sayısı SQLite limitleriyle kısıtlı.
+
+Hazırlanan ifadeler bağlantının ifade önbelleğinde tutulur (aynı normalize
+metin yeniden derlenmez); sonuçlar veri sürümü + normalize sorgu anahtarıyla
+paylaşılan önbellekte saklanır.
+
+    python -m happygpt.query "SELECT year, AVG(life_ladder) FROM happiness GROUP BY year"
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from .cache import SharedCache, frame_fingerprint, memoize
+
+TABLE = "happiness"
+MAX_ROWS = 200
+TIMEOUT = 2.0  # saniye
+MAX_SQL_LENGTH = 4000
+MAX_VALUE_LENGTH = 1_000_000
+STATEMENT_CACHE = 256
+
+# Prompt'ta olası değerleri listelenen kategorik sütunlar
+ENUM_COLUMNS = ('regional_indicator', 'continent', 'income_level')
+
+RESULT_CACHE = SharedCache(maxsize=1024)
+
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+_DENIED_FUNCTIONS = {"load_extension", "randomblob", "zeroblob", "readfile", "writefile"}
+_FENCE = re.compile(r"```(?:sql)?\s*(.*?)```", re.IGNORECASE | re.DOTALL)
+_SELECT = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+# Metin/tanımlayıcı literalleri korunur; `--` satır ve `/* */` blok yorumları boşluğa çevrilir
+_COMMENT = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|--[^\n]*|/\*.*?(?:\*/|$)", re.DOTALL)
+
+
+class QueryError(ValueError):
+    """Reddedilen, hatalı ya da zaman aşımına uğrayan sorgu."""
+
+
+def strip_comments(sql: str) -> str:
+    """SQL yorumlarını kaldır (satırlar birleştirilince `--` sorgunun kalanını yutmasın)."""
+    return _COMMENT.sub(lambda match: match.group(1) or " ", sql)
+
+
+def normalize_sql(sql: str) -> str:
+    """Yorumları at, boşlukları sadeleştir, sondaki noktalı virgülü at (önbellek anahtarı)."""
+    return " ".join(strip_comments(sql).split()).rstrip(";").strip()
+
+
+def extract_sql(text: str):
+    """LLM çıktısındaki sorguyu (```sql bloğu ya da ilk SELECT/WITH satırından itibaren) döndür."""
+    match = _FENCE.search(text)
+    if match:
+        return normalize_sql(match.group(1)) or None
+    for i, line in enumerate(text.splitlines()):
+        if _SELECT.match(line):
+            return normalize_sql("\n".join(text.splitlines()[i:]))
+    return None
+
+
+def _authorizer(action, arg1, arg2, db_name, trigger):
+    if action not in _ALLOWED_ACTIONS:
+        return sqlite3.SQLITE_DENY
+    if action == sqlite3.SQLITE_FUNCTION and (arg2 or "").lower() in _DENIED_FUNCTIONS:
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+def _sql_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """SQLite'a yazılabilir kopya (kategoriler metin, boolean'lar tam sayı)."""
+    frame = df.copy()
+    for column in frame.columns:
+        dtype = frame[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            frame[column] = frame[column].astype(object)
+        elif pd.api.types.is_bool_dtype(dtype):
+            frame[column] = frame[column].astype(int)
+    return frame
+
+
+class QueryEngine:
+    """Veri sürümü başına bir bellek içi, salt okunur SQLite kopyası."""
+
+    def __init__(self, df: pd.DataFrame, max_rows=MAX_ROWS, timeout=TIMEOUT):
+        self.dataset_version = frame_fingerprint(df)
+        self.max_rows = max_rows
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False, cached_statements=STATEMENT_CACHE)
+        frame = _sql_frame(df)
+        frame.to_sql(TABLE, self._conn, index=False)
+        self._conn.execute(f"CREATE INDEX idx_country_year ON {TABLE} (country_name, year)")
+        self._conn.execute(f"CREATE INDEX idx_year ON {TABLE} (year)")
+        self._conn.execute("ANALYZE")
+        self.columns = {row[1]: row[2] or "TEXT" for row in self._conn.execute(f"PRAGMA table_info({TABLE})")}
+        self._conn.execute("PRAGMA query_only = 1")
+        self._conn.setlimit(sqlite3.SQLITE_LIMIT_SQL_LENGTH, MAX_SQL_LENGTH)
+        self._conn.setlimit(sqlite3.SQLITE_LIMIT_LENGTH, MAX_VALUE_LENGTH)
+        self._conn.setlimit(sqlite3.SQLITE_LIMIT_ATTACHED, 0)
+        self._conn.set_authorizer(_authorizer)
+        self.enums = {c: sorted(frame[c].dropna().astype(str).unique()) for c in ENUM_COLUMNS if c in frame.columns}
+        self.years = (int(df['year'].min()), int(df['year'].max()))
+
+    def schema_text(self) -> str:
+        """Prompt'a eklenen kısa şema açıklaması."""
+        columns = ", ".join(f"{name} {kind}" for name, kind in self.columns.items())
+        lines = [f"{TABLE}({columns})",
+                 f"- Her satır bir ülke-yıl; yıllar {self.years[0]}-{self.years[1]}. "
+                 "Ülke adları İngilizce (ör. 'Turkiye', 'Germany'); üyelik sütunları 0/1."]
+        lines += [f"- {column}: " + ", ".join(f"'{value}'" for value in values) for column, values in self.enums.items()]
+        return "\n".join(lines)
+
+    def validate(self, sql: str) -> str:
+        """Tek ifadelik SELECT/WITH sorgusunu normalize edip döndür; aksi halde QueryError."""
+        sql = normalize_sql(sql or "")
+        if not sql:
+            raise QueryError("Boş sorgu")
+        if len(sql) > MAX_SQL_LENGTH:
+            raise QueryError(f"Sorgu en fazla {MAX_SQL_LENGTH} karakter olabilir")
+        if not _SELECT.match(sql):
+            raise QueryError("Yalnızca SELECT/WITH sorgularına izin verilir")
+        return sql
+
+    def run(self, sql: str, limit=None):
+        """Sorguyu çalıştır; (DataFrame, kesildi mi) döndür. Sonuçlar veri sürümü başına önbelleklenir."""
+        sql = self.validate(sql)
+        if limit is not None and limit < 0:
+            raise QueryError("limit negatif olamaz")
+        limit = min(limit or self.max_rows, self.max_rows)
+        key = (self.dataset_version, sql, limit)
+        cached = RESULT_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            self._conn.set_progress_handler(lambda: time.monotonic() > deadline, 10_000)
+            try:
+                cursor = self._conn.execute(sql)
+                rows = cursor.fetchmany(limit + 1)
+                columns = [d[0] for d in cursor.description or []]
+                cursor.close()
+            except (sqlite3.Warning, sqlite3.ProgrammingError):
+                raise QueryError("Tek seferde yalnızca bir ifade çalıştırılabilir")
+            except sqlite3.OperationalError as e:
+                if "interrupted" in str(e):
+                    raise QueryError(f"Sorgu {self.timeout:g} saniyede tamamlanmadı")
+                raise QueryError(str(e))
+            except sqlite3.DatabaseError as e:
+                raise QueryError(str(e))
+            finally:
+                self._conn.set_progress_handler(None, 0)
+
+        result = (pd.DataFrame(rows[:limit], columns=columns), len(rows) > limit)
+        RESULT_CACHE.set(key, result)
+        return result
+
+
+@memoize(maxsize=2)
+def get_engine(df: pd.DataFrame) -> QueryEngine:
+    """Veri sürümü başına tek motor."""
+    return QueryEngine(df)
+
+
+def format_result(frame: pd.DataFrame, truncated=False, digits=4) -> str:
+    """Sonucu prompt'a eklenecek kısa CSV metnine çevir."""
+    if frame.empty:
+        return "(sonuç boş)"
+    text = frame.round(digits).to_csv(index=False).strip()
+    if truncated:
+        text += f"\n(ilk {len(frame)} satır gösteriliyor)"
+    return text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Veri setine salt okunur SQL sorgusu çalıştır.")
+    parser.add_argument("sql", nargs="?", help="SELECT sorgusu (verilmezse şema yazdırılır)")
+    parser.add_argument("--limit", type=int, default=MAX_ROWS)
+    args = parser.parse_args(argv)
+
+    from .dataset import get_dataset
+
+    engine = get_engine(get_dataset().frame)
+    if not args.sql:
+        print(engine.schema_text())
+        return 0
+    try:
+        frame, truncated = engine.run(args.sql, args.limit)
+    except QueryError as e:
+        print(f"Sorgu hatası: {e}", file=sys.stderr)
+        return 1
+    print(format_result(frame, truncated))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
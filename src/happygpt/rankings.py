@@ -0,0 +1,271 @@
+"""Yıl × metrik × grup sıralama ve yüzdelik indeksi.
+
+Her grup (dünya, bölgeler, G20/OECD/BRICS) için panel değerleri ülke
+ekseninde bir kez azalan sırada sıralanır. Bir ülkenin sırası ve yüzdeliği
+önceden hesaplanmış dizilerden O(1), herhangi bir değerin sırası sıralı
+dizide ikili aramayla O(log n), ilk k ülke sıralı dizinin dilimiyle O(k)
+bulunur. Sıra 1 en yüksek değerdir; eşit değerler aynı (en küçük) sırayı
+alır. Yüzdelik, gruptaki ülkelerin değeri bu değere eşit ya da daha düşük
+olanların payıdır. İndeks veri sürümü başına bir kez kurulur.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .charts import METRIC_MAPPING
+from .countries import dataset_alias_index, extract_entities, normalize_text
+from .panel import Panel, get_panel
+from .schema import MEMBERSHIP_GROUPS, METRICS, TARGET
+
+GLOBAL = 'global'
+METRIC_LABELS = {metric: label for label, metric in METRIC_MAPPING.items()}
+
+# Normalize edilmiş soru kelimeleri; biri geçerse soru sıralama sorusudur
+RANK_WORDS = {"kacinci", "sirada", "siralama", "siralamasi", "siralamada", "siralamadaki", "yuzdelik", "rank",
+              "ranking", "percentile"}
+_YEAR_PATTERN = re.compile(r"\b(19|20)\d{2}\b")
+
+
+class RankError(ValueError):
+    """Bilinmeyen metrik, yıl ya da grup."""
+
+
+class _GroupIndex:
+    """Bir grubun (üye, yıl, metrik) sıralı değerleri, sıraları ve gözlem sayıları."""
+
+    def __init__(self, members, values):
+        self.members = members
+        # Azalan sıra, NaN'lar sonda; eşit değerlerde ülke adı sırası korunur
+        self.order = np.argsort(-values, axis=0, kind='stable')
+        self.sorted = np.take_along_axis(values, self.order, axis=0)
+        self.counts = np.sum(~np.isnan(values), axis=0)
+
+        # Sıralı dizide her konumun sırası: aynı değerli ilk konum + 1
+        positions = np.arange(len(members))[:, None, None]
+        new_value = np.ones(self.sorted.shape, dtype=bool)
+        new_value[1:] = self.sorted[1:] != self.sorted[:-1]
+        first = np.maximum.accumulate(np.where(new_value, positions, 0), axis=0)
+        ranks = np.where(np.isnan(self.sorted), np.nan, first + 1.0)
+        self.ranks = np.empty_like(ranks)
+        np.put_along_axis(self.ranks, self.order, ranks, axis=0)
+
+
+class RankIndex:
+    """Panel hizalı sıralama indeksi."""
+
+    def __init__(self, panel: Panel, groups, metrics=tuple(METRICS)):
+        self.panel = panel
+        self.metrics = [m for m in metrics if m in panel.metric_index]
+        self.metric_index = {name: i for i, name in enumerate(self.metrics)}
+        values = panel.values[:, :, [panel.metric_index[m] for m in self.metrics]]
+        self.groups = {name: _GroupIndex(np.asarray(members), values[members]) for name, members in groups.items()}
+        self._group_names = {name.casefold(): name for name in self.groups}
+        # Ülke -> gruptaki konumu (üye değilse -1)
+        self._position = {}
+        for name, group in self.groups.items():
+            position = np.full(len(panel.countries), -1)
+            position[group.members] = np.arange(len(group.members))
+            self._position[name] = position
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, panel: Panel = None, metrics=tuple(METRICS)):
+        """Dünya, bölge ve üyelik gruplarıyla indeks kur."""
+        panel = panel if panel is not None else Panel.from_frame(df)
+        groups = {GLOBAL: np.arange(len(panel.countries))}
+        for region in sorted(set(panel.regions.astype(str))):
+            groups[region] = np.flatnonzero(panel.regions.astype(str) == region)
+        countries = df['country_name'].astype(str)
+        for column, name in MEMBERSHIP_GROUPS.items():
+            if column in df.columns:
+                members = set(countries[df[column] == 1])
+                groups[name] = np.array([i for i, c in enumerate(panel.countries) if c in members], dtype=int)
+        return cls(panel, {name: members for name, members in groups.items() if len(members)}, metrics)
+
+    def _locate(self, metric, year, group):
+        if metric not in self.metric_index:
+            raise RankError(f"Bilinmeyen metrik: {metric}")
+        group = self.group_name(group)
+        if int(year) not in self.panel.year_index:
+            raise RankError(f"Veri setinde olmayan yıl: {year}")
+        return self.groups[group], self.panel.year_index[int(year)], self.metric_index[metric]
+
+    def group_name(self, group):
+        """Büyük/küçük harften bağımsız grup adı ('g20' -> 'G20'); bilinmiyorsa RankError."""
+        name = self._group_names.get(str(group).casefold())
+        if name is None:
+            raise RankError(f"Bilinmeyen grup: {group}")
+        return name
+
+    def groups_of(self, country):
+        """Ülkenin üyesi olduğu gruplar (dünya, bölge, üyelikler)."""
+        return [name for name, position in self._position.items()
+                if country in self.panel.country_index and position[self.panel.country_index[country]] >= 0]
+
+    def latest_year(self, country, metric=TARGET, before=None):
+        """Ülkenin metrikte gözlendiği son yıl (ya da `before` öncesindeki son yıl); yoksa None."""
+        values = self.panel.metric(metric)[self.panel.country_index[country]]
+        observed = ~np.isnan(values)
+        if before is not None:
+            observed &= self.panel.years < int(before)
+        return int(self.panel.years[observed][-1]) if observed.any() else None
+
+    def rank(self, country, metric=TARGET, year=None, group=GLOBAL):
+        """{'rank', 'total', 'percentile', 'value', 'year'}; ülke o yıl gözlenmemişse None."""
+        if country not in self.panel.country_index:
+            return None
+        year = self.latest_year(country, metric) if year is None else year
+        if year is None:
+            return None
+        group = self.group_name(group)
+        index, y, m = self._locate(metric, year, group)
+        position = self._position[group][self.panel.country_index[country]]
+        if position < 0 or np.isnan(index.ranks[position, y, m]):
+            return None
+        rank, total = int(index.ranks[position, y, m]), int(index.counts[y, m])
+        return {'country_name': country, 'metric': metric, 'year': int(year), 'group': group,
+                'value': float(self.panel.metric(metric)[self.panel.country_index[country], y]),
+                'rank': rank, 'total': total, 'percentile': 100.0 * (total - rank + 1) / total}
+
+    def rank_of(self, value, metric, year, group=GLOBAL):
+        """Herhangi bir değerin gruptaki sırası ve yüzdeliği: (sıra, toplam, yüzdelik)."""
+        index, y, m = self._locate(metric, year, group)
+        total = int(index.counts[y, m])
+        ascending = index.sorted[:total, y, m][::-1]
+        at_most = int(np.searchsorted(ascending, value, side='right'))
+        return total - at_most + 1, total, 100.0 * at_most / total if total else float('nan')
+
+    def top(self, metric, year, k=10, group=GLOBAL, ascending=False):
+        """En yüksek (ascending=True ise en düşük) k ülke: country_name, metrik, rank."""
+        index, y, m = self._locate(metric, year, group)
+        total = int(index.counts[y, m])
+        k = max(0, min(k, total))
+        positions = index.order[total - k:total, y, m][::-1] if ascending else index.order[:k, y, m]
+        countries = index.members[positions]
+        return pd.DataFrame({
+            'country_name': self.panel.countries[countries],
+            metric: self.panel.metric(metric)[countries, y],
+            'rank': index.ranks[positions, y, m].astype(int),
+        })
+
+    def changes(self, metric, year_from, year_to, group=GLOBAL):
+        """İki yılda da gözlenen ülkelerin sıra değişimi (pozitif: yükseldi), en çok yükselenden."""
+        index, y0, m = self._locate(metric, year_from, group)
+        _, y1, _ = self._locate(metric, year_to, group)
+        before, after = index.ranks[:, y0, m], index.ranks[:, y1, m]
+        both = ~np.isnan(before) & ~np.isnan(after)
+        result = pd.DataFrame({
+            'country_name': self.panel.countries[index.members[both]],
+            'rank_from': before[both].astype(int),
+            'rank_to': after[both].astype(int),
+            'change': (before[both] - after[both]).astype(int),
+        })
+        return result.sort_values(['change', 'rank_to'], ascending=[False, True], ignore_index=True)
+
+    def history(self, country, metric=TARGET, group=GLOBAL):
+        """Ülkenin yıllara göre sırası: year, rank, total, percentile."""
+        group = self.group_name(group)
+        index = self.groups[group]
+        position = self._position[group][self.panel.country_index[country]]
+        if position < 0:
+            return pd.DataFrame(columns=['year', 'rank', 'total', 'percentile'])
+        m = self.metric_index[metric]
+        ranks, counts = index.ranks[position, :, m], index.counts[:, m]
+        keep = ~np.isnan(ranks)
+        return pd.DataFrame({
+            'year': self.panel.years[keep],
+            'rank': ranks[keep].astype(int),
+            'total': counts[keep],
+            'percentile': 100.0 * (counts[keep] - ranks[keep] + 1) / counts[keep],
+        })
+
+
+@memoize(maxsize=4)
+def rank_index(df: pd.DataFrame) -> RankIndex:
+    """Veri sürümü başına bir kez kurulan sıralama indeksi."""
+    return RankIndex.from_frame(df, get_panel(df))
+
+
+def _question_metric(question):
+    lowered = question.lower()
+    for label, metric in METRIC_MAPPING.items():
+        if label in lowered:
+            return metric
+    return TARGET
+
+
+def _rank_lines(index, country, metric, year=None):
+    """Bir ülkenin dünya, bölge ve üyelik gruplarındaki sırası ve bir önceki gözleme göre değişimi."""
+    current = index.rank(country, metric, year)
+    if current is None:
+        return []
+    year = current['year']
+    lines = [f"- Dünya: {current['rank']}/{current['total']} (değer {current['value']:.3g}, "
+             f"yüzdelik %{current['percentile']:.0f})"]
+    for group in index.groups_of(country):
+        if group == GLOBAL:
+            continue
+        found = index.rank(country, metric, year, group)
+        if found is not None:
+            lines.append(f"- {group}: {found['rank']}/{found['total']}")
+    previous_year = index.latest_year(country, metric, before=year)
+    previous = index.rank(country, metric, previous_year) if previous_year is not None else None
+    if previous is not None:
+        delta = previous['rank'] - current['rank']
+        movement = f"{delta} basamak yükseldi" if delta > 0 else f"{-delta} basamak düştü" if delta < 0 else "değişmedi"
+        lines.append(f"- {previous_year} yılına göre dünya sıralaması: {previous['rank']} -> {current['rank']} ({movement})")
+    return lines
+
+
+def rank_answer(df: pd.DataFrame, question: str):
+    """"Türkiye kaçıncı sırada?" türü sorulara LLM'siz, hazır yanıt; sıralama sorusu değilse None."""
+    if not question or not RANK_WORDS & set(normalize_text(question)):
+        return None
+    countries = [name for kind, name, _ in extract_entities(question, dataset_alias_index(df)) if kind == "country"]
+    if not countries:
+        return None
+    index = rank_index(df)
+    metric = _question_metric(question)
+    match = _YEAR_PATTERN.search(question)
+    year = int(match.group(0)) if match and int(match.group(0)) in index.panel.year_index else None
+    label = METRIC_LABELS.get(metric, metric).title()
+    parts = []
+    for country in countries:
+        lines = _rank_lines(index, country, metric, year)
+        if not lines:
+            parts.append(f"📊 **{country}**: {year or 'veri setinde'} {label.lower()} verisi yok.")
+            continue
+        shown_year = year or index.latest_year(country, metric)
+        parts.append("\n".join([f"📊 **{country} — {label} Sıralaması ({shown_year})**", *lines]))
+    return "\n\n".join(parts) + "\n\nSıra 1 en yüksek değerdir; eşit değerler aynı sırayı alır."
+
+
+def question_context(df: pd.DataFrame, question: str):
+    """Sıralama/karşılaştırma sorularına bahsedilen ülkelerin temel metriklerdeki sıraları."""
+    tokens = set(normalize_text(question))
+    if not RANK_WORDS & tokens and not {"karsilastir", "karsilastirma", "siralamasi", "lider"} & tokens:
+        return None
+    countries = [name for kind, name, _ in extract_entities(question, dataset_alias_index(df)) if kind == "country"]
+    index = rank_index(df)
+    lines = []
+    for country in countries:
+        for metric in (TARGET, *[m for m in METRIC_MAPPING.values() if m != TARGET]):
+            current = index.rank(country, metric)
+            if current is not None:
+                lines.append(f"- {country}, {metric} ({current['year']}): dünya sıralaması "
+                             f"{current['rank']}/{current['total']}, yüzdelik %{current['percentile']:.0f}")
+    if not countries:
+        year = int(index.panel.years[index.groups[GLOBAL].counts[:, index.metric_index[TARGET]] > 0][-1])
+        previous = year - 1 if year - 1 in index.panel.year_index else None
+        top = index.top(TARGET, year, 5)
+        lines.append(f"- {year} mutluluk sıralaması ilk 5: "
+                     + ", ".join(f"{r.rank}. {r.country_name} ({r.life_ladder:.2f})" for r in top.itertuples()))
+        if previous is not None:
+            moved = index.changes(TARGET, previous, year)
+            lines.append(f"- {previous}->{year} en çok yükselenler: "
+                         + ", ".join(f"{r.country_name} ({r.rank_from}->{r.rank_to})" for r in moved.head(3).itertuples()))
+            lines.append(f"- {previous}->{year} en çok düşenler: "
+                         + ", ".join(f"{r.country_name} ({r.rank_from}->{r.rank_to})" for r in moved.tail(3)[::-1].itertuples()))
+    return "\n".join(lines) or None
@@ -0,0 +1,216 @@
+"""LLM çağrıları için süreçler arası token bucket hız sınırlayıcı.
+
+Aynı makinedeki tüm Streamlit/API süreçleri önbellek dizinindeki tek bir
+SQLite dosyasını paylaşır. Her çağrı hem global kovadan hem agent'ının
+kovasından bir token alır; kovalar geçen süreye göre dakikalık hızla dolar,
+kapasite kadar patlamaya izin verir. Durum değişiklikleri `BEGIN IMMEDIATE`
+işlemleriyle yapılır, yani süreçler arasında atomiktir.
+
+Adil sıra: bekleyen her çağrı bir bilet alır (artan kimlik). Her agent'ın
+yalnızca en eski bileti aday olur; agent kovasında token olan adaylardan en
+eskisi global token'ı alır. Böylece bir agent'ın boş kovası diğerlerini
+bloklamaz, aynı agent içinde sıra korunur. Çöken süreçlerin biletleri nabız
+süresi dolunca silinir. Bekleme süreleri kova başına istatistik olarak tutulur.
+
+    python -m happygpt.ratelimit        # kova durumları ve bekleme metrikleri
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from .config import get_cache_dir, get_rate_limits
+
+GLOBAL = "global"
+GLOBAL_BURST = 10
+AGENT_BURST = 5
+POLL_INTERVAL = 0.05  # saniye
+MAX_POLL_INTERVAL = 0.5
+STALE_TICKET_SECONDS = 30.0
+ACQUIRE_TIMEOUT = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS tickets (id INTEGER PRIMARY KEY AUTOINCREMENT, agent TEXT NOT NULL,
+                                    created REAL NOT NULL, heartbeat REAL NOT NULL, pid INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, acquired INTEGER NOT NULL DEFAULT 0,
+                                  wait_total REAL NOT NULL DEFAULT 0, wait_max REAL NOT NULL DEFAULT 0,
+                                  timeouts INTEGER NOT NULL DEFAULT 0);
+"""
+
+
+class RateLimitTimeout(TimeoutError):
+    """Token süresi içinde alınamadı."""
+
+
+class RateLimiter:
+    """SQLite dosyası üzerinden paylaşılan global + agent başına token kovaları."""
+
+    def __init__(self, path=None, global_rate=None, agent_rate=None, global_burst=GLOBAL_BURST,
+                 agent_burst=AGENT_BURST):
+        limits = get_rate_limits()
+        self.path = str(path or get_cache_dir() / "ratelimit.sqlite3")
+        # Dakikalık hızlar saniyeliğe çevrilir
+        self.global_rate = (global_rate or limits["global"]) / 60.0
+        self.agent_rate = (agent_rate or limits["agent"]) / 60.0
+        self.global_burst = global_burst
+        self.agent_burst = agent_burst
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _limits(self, name):
+        return (self.global_rate, self.global_burst) if name == GLOBAL else (self.agent_rate, self.agent_burst)
+
+    def _tokens(self, conn, name, now):
+        """Kovayı geçen süreye göre doldurup mevcut token sayısını döndür (işlem içinde)."""
+        rate, burst = self._limits(name)
+        row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+        tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+        conn.execute("INSERT INTO buckets (name, tokens, updated) VALUES (?, ?, ?) "
+                     "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                     (name, tokens, now))
+        return tokens
+
+    def _transaction(self, func):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = func(conn, time.time())
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def _try_take(self, conn, now, ticket, agent, tokens):
+        """Sıra bu biletteyse token'ları al; (alındı mı, önerilen bekleme) döndür."""
+        conn.execute("DELETE FROM tickets WHERE heartbeat < ?", (now - STALE_TICKET_SECONDS,))
+        conn.execute("UPDATE tickets SET heartbeat = ? WHERE id = ?", (now, ticket))
+        heads = conn.execute("SELECT agent, MIN(id) FROM tickets GROUP BY agent ORDER BY MIN(id)").fetchall()
+        for head_agent, head_id in heads:
+            available = self._tokens(conn, head_agent, now)
+            if available < tokens:
+                if head_id == ticket:
+                    return False, (tokens - available) / self.agent_rate
+                continue
+            if head_id != ticket:
+                return False, POLL_INTERVAL  # Daha eski, hazır bir bilet önce alır
+            available_global = self._tokens(conn, GLOBAL, now)
+            if available_global < tokens:
+                return False, (tokens - available_global) / self.global_rate
+            conn.execute("UPDATE buckets SET tokens = tokens - ? WHERE name IN (?, ?)", (tokens, GLOBAL, agent))
+            conn.execute("DELETE FROM tickets WHERE id = ?", (ticket,))
+            return True, 0.0
+        return False, POLL_INTERVAL  # Bilet nabız süresi aşıldığı için silinmiş olabilir
+
+    def _record(self, conn, agent, waited=None):
+        for name in (GLOBAL, agent):
+            if waited is None:
+                conn.execute("INSERT INTO stats (name, timeouts) VALUES (?, 1) "
+                             "ON CONFLICT(name) DO UPDATE SET timeouts = timeouts + 1", (name,))
+            else:
+                conn.execute("INSERT INTO stats (name, acquired, wait_total, wait_max) VALUES (?, 1, ?, ?) "
+                             "ON CONFLICT(name) DO UPDATE SET acquired = acquired + 1, "
+                             "wait_total = wait_total + excluded.wait_total, "
+                             "wait_max = MAX(wait_max, excluded.wait_max)", (name, waited, waited))
+
+    def acquire(self, agent, tokens=1, timeout=ACQUIRE_TIMEOUT):
+        """Sırayla token al; beklenen süreyi (saniye) döndür, süre dolarsa RateLimitTimeout."""
+        start = time.monotonic()
+        ticket = self._transaction(lambda conn, now: conn.execute(
+            "INSERT INTO tickets (agent, created, heartbeat, pid) VALUES (?, ?, ?, ?)",
+            (agent, now, now, os.getpid())).lastrowid)
+        try:
+            while True:
+                taken, delay = self._transaction(lambda conn, now: self._try_take(conn, now, ticket, agent, tokens))
+                waited = time.monotonic() - start
+                if taken:
+                    self._transaction(lambda conn, now: self._record(conn, agent, waited))
+                    return waited
+                if waited + delay > timeout:
+                    raise RateLimitTimeout(f"{agent} için LLM hız sınırı: {timeout:g} saniyede token alınamadı")
+                time.sleep(min(max(delay, POLL_INTERVAL), MAX_POLL_INTERVAL))
+        except BaseException:
+            def abandon(conn, now):
+                conn.execute("DELETE FROM tickets WHERE id = ?", (ticket,))
+                self._record(conn, agent)
+            self._transaction(abandon)
+            raise
+
+    def try_acquire(self, agent, tokens=1):
+        """Sırada bekleyen yoksa ve token varsa hemen al (ör. hedge istekleri); aksi halde False."""
+        def take(conn, now):
+            if conn.execute("SELECT 1 FROM tickets LIMIT 1").fetchone():
+                return False
+            if self._tokens(conn, agent, now) < tokens or self._tokens(conn, GLOBAL, now) < tokens:
+                return False
+            conn.execute("UPDATE buckets SET tokens = tokens - ? WHERE name IN (?, ?)", (tokens, GLOBAL, agent))
+            self._record(conn, agent, 0.0)
+            return True
+        return self._transaction(take)
+
+    def stats(self):
+        """Kova başına token, bekleyen bilet ve bekleme metrikleri."""
+        def read(conn, now):
+            waiting = dict(conn.execute("SELECT agent, COUNT(*) FROM tickets GROUP BY agent").fetchall())
+            names = {row[0] for row in conn.execute("SELECT name FROM buckets UNION SELECT name FROM stats")}
+            result = {}
+            for name in sorted(names):
+                acquired, wait_total, wait_max, timeouts = conn.execute(
+                    "SELECT acquired, wait_total, wait_max, timeouts FROM stats WHERE name = ?", (name,)
+                ).fetchone() or (0, 0.0, 0.0, 0)
+                result[name] = {
+                    "tokens": round(self._tokens(conn, name, now), 3),
+                    "waiting": sum(waiting.values()) if name == GLOBAL else waiting.get(name, 0),
+                    "acquired": acquired,
+                    "timeouts": timeouts,
+                    "wait_mean_s": round(wait_total / acquired, 4) if acquired else 0.0,
+                    "wait_max_s": round(wait_max, 4),
+                }
+            return result
+        return self._transaction(read)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Süreç başına tek sınırlayıcı; HAPPYGPT_RATE_LIMIT=0 ise None (sınırsız)."""
+    global _limiter
+    if not get_rate_limits()["global"]:
+        return None
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LLM hız sınırlayıcısının kova durumlarını göster.")
+    parser.parse_args(argv)
+    limiter = get_limiter()
+    if limiter is None:
+        print("Hız sınırlayıcı kapalı (HAPPYGPT_RATE_LIMIT=0).", file=sys.stderr)
+        return 0
+    print(json.dumps(limiter.stats(), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""Sabit etkili panel regresyonu ve gecikmeli etkiler.
+
+Model: life_ladder[i, t] = Σ_f Σ_l β_fl · x_f[i, t-l] + α_i (+ γ_t) + ε[i, t]
+
+Ülke (ve isteğe bağlı yıl) sabit etkileri kukla değişkenlerle değil, içsel
+(within) dönüşümle emilir: her sütundan ülke ortalaması seyrek bir gösterge
+matrisiyle çıkarılır; iki yönlü modelde ülke ve yıl ortalamaları dönüşümlü
+olarak yakınsayana kadar çıkarılır. Gecikmeler paneldeki yıl ekseninin
+kaydırılmasıyla (bir önceki takvim yılı) elde edilir. Standart hatalar
+ülkelere göre kümelenmiştir. Modeller veri sürümü başına bir kez kurulur.
+
+Kullanım (src/ dizininden):
+    python -m happygpt.regression [--max-lag 3] [--no-time-effects] [--scale 20]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .panel import Panel, get_panel
+from .schema import LOG_METRICS, MODEL_FACTORS, TARGET, p_text
+
+MAX_LAG = 3
+
+# Soruda bu kelimeler geçerse agent bağlamına sabit etkili model sonuçları eklenir
+REGRESSION_WORDS = ("neden", "niye", "sebeb", "etki", "faktör", "gecikme", "lag", "regresyon", "baskın", "dominant")
+
+
+class RegressionError(ValueError):
+    """Model kurulamadı (ör. yeterli gözlem yok)."""
+
+
+def _lagged(matrix, lag):
+    """(ülke × yıl) matrisini yıl ekseninde `lag` yıl geriden kaydır."""
+    if lag == 0:
+        return matrix
+    shifted = np.full_like(matrix, np.nan)
+    shifted[:, lag:] = matrix[:, :-lag]
+    return shifted
+
+
+def design(panel: Panel, factors, max_lag):
+    """Eksiksiz gözlemler için (y, X, ülke indeksleri, yıl indeksleri, terimler)."""
+    terms = [(f, lag) for f in factors for lag in range(max_lag + 1)]
+    columns = []
+    for factor in factors:
+        values = panel.metric(factor)
+        if factor in LOG_METRICS:
+            values = np.log(np.clip(values, 1e-9, None))
+        columns.extend(_lagged(values, lag) for lag in range(max_lag + 1))
+    y = np.where(panel.observed, panel.metric(TARGET), np.nan)
+    stacked = np.stack([y, *columns], axis=-1)  # (ülke, yıl, 1 + terim)
+    complete = ~np.isnan(stacked).any(axis=-1)
+    country_idx, year_idx = np.nonzero(complete)
+    rows = stacked[complete]
+    return rows[:, 0], rows[:, 1:], country_idx, year_idx, terms
+
+
+def _indicator(groups, n_groups):
+    from scipy import sparse
+
+    return sparse.csr_matrix((np.ones(len(groups)), (np.arange(len(groups)), groups)), shape=(len(groups), n_groups))
+
+
+def within(matrix, groups_list, tol=1e-10, max_iter=500):
+    """Sütunlardan grup ortalamalarını çıkar; birden çok grup için dönüşümlü izdüşüm."""
+    projections = []
+    for groups in groups_list:
+        _, groups = np.unique(groups, return_inverse=True)
+        indicator = _indicator(groups, groups.max() + 1)
+        counts = np.asarray(indicator.sum(axis=0)).ravel()
+        projections.append((indicator, counts))
+
+    result = np.array(matrix, dtype='float64')
+    for _ in range(max_iter if len(projections) > 1 else 1):
+        previous = result.copy() if len(projections) > 1 else None
+        for indicator, counts in projections:
+            means = (indicator.T @ result) / counts[:, None]
+            result -= indicator @ means
+        if previous is not None and np.max(np.abs(result - previous)) < tol:
+            break
+    return result
+
+
+class FixedEffectsResult:
+    """Katsayılar, kümelenmiş kovaryans ve özet istatistikler."""
+
+    def __init__(self, terms, coef, cov, n_obs, n_countries, r2_within, time_effects, max_lag, x_std, y_std):
+        self.terms = list(terms)
+        self.coef = coef
+        self.cov = cov
+        self.n_obs = n_obs
+        self.n_countries = n_countries
+        self.r2_within = r2_within
+        self.time_effects = time_effects
+        self.max_lag = max_lag
+        self.x_std = x_std
+        self.y_std = y_std
+
+    @property
+    def std_error(self):
+        return np.sqrt(np.diag(self.cov))
+
+    def _p_values(self, t):
+        from scipy import stats
+
+        return 2 * stats.t.sf(np.abs(t), df=max(self.n_countries - 1, 1))
+
+    def _critical(self, level):
+        from scipy import stats
+
+        return stats.t.ppf(0.5 + level / 2, df=max(self.n_countries - 1, 1))
+
+    def table(self, level=0.95):
+        """Terim başına katsayı, kümelenmiş SE, t, p, güven aralığı ve standartlaştırılmış katsayı."""
+        se = self.std_error
+        t = self.coef / se
+        margin = self._critical(level) * se
+        return pd.DataFrame({
+            'factor': [f for f, _ in self.terms],
+            'lag': [lag for _, lag in self.terms],
+            'coef': self.coef,
+            'std_error': se,
+            't': t,
+            'p_value': self._p_values(t),
+            'ci_low': self.coef - margin,
+            'ci_high': self.coef + margin,
+            'standardized': self.coef * self.x_std / self.y_std,
+        })
+
+    def long_run(self, level=0.95):
+        """Faktör başına gecikme katsayıları toplamı (uzun dönem etkisi) ve kümelenmiş SE."""
+        factors = list(dict.fromkeys(f for f, _ in self.terms))
+        weights = np.array([[1.0 if f == factor else 0.0 for f, _ in self.terms] for factor in factors])
+        effect = weights @ self.coef
+        se = np.sqrt(np.einsum('ij,jk,ik->i', weights, self.cov, weights))
+        t = effect / se
+        margin = self._critical(level) * se
+        return pd.DataFrame({'factor': factors, 'effect': effect, 'std_error': se, 't': t,
+                             'p_value': self._p_values(t), 'ci_low': effect - margin, 'ci_high': effect + margin})
+
+
+def fit_panel(panel: Panel, factors=tuple(MODEL_FACTORS), max_lag=0, time_effects=True) -> FixedEffectsResult:
+    """Panel üzerinde sabit etkili model kur."""
+    factors = [f for f in factors if f in panel.metric_index]
+    y, X, country_idx, year_idx, terms = design(panel, factors, max_lag)
+    n_countries = len(np.unique(country_idx))
+    if len(y) <= len(terms) + n_countries or n_countries < 2:
+        raise RegressionError(f"Yeterli gözlem yok ({len(y)} satır, {n_countries} ülke)")
+
+    groups = [country_idx, year_idx] if time_effects else [country_idx]
+    data = within(np.column_stack([y, X]), groups)
+    y_w, X_w = data[:, 0], data[:, 1:]
+
+    xtx_inv = np.linalg.pinv(X_w.T @ X_w)
+    coef = xtx_inv @ (X_w.T @ y_w)
+    residuals = y_w - X_w @ coef
+
+    # Ülke kümeli sandviç kovaryans: Σ_g (X_g' u_g)(X_g' u_g)'
+    _, clusters = np.unique(country_idx, return_inverse=True)
+    scores = np.zeros((n_countries, X_w.shape[1]))
+    np.add.at(scores, clusters, X_w * residuals[:, None])
+    n_obs, k = X_w.shape
+    correction = n_countries / (n_countries - 1) * (n_obs - 1) / (n_obs - k)
+    cov = correction * xtx_inv @ (scores.T @ scores) @ xtx_inv
+
+    r2 = 1 - residuals @ residuals / (y_w @ y_w)
+    return FixedEffectsResult(terms, coef, cov, n_obs, n_countries, float(r2), time_effects, max_lag,
+                              X_w.std(axis=0, ddof=1), float(y_w.std(ddof=1)))
+
+
+@memoize(maxsize=16)
+def fixed_effects(df: pd.DataFrame, max_lag=0, time_effects=True, factors=tuple(MODEL_FACTORS)) -> FixedEffectsResult:
+    """Veri sürümü başına önbelleğe alınan sabit etkili model."""
+    return fit_panel(get_panel(df), factors, max_lag, time_effects)
+
+
+def precompute(df: pd.DataFrame):
+    """Dashboard ve agent'ların kullandığı tüm gecikme yapılarını önceden kur."""
+    return {lag: fixed_effects(df, lag) for lag in range(MAX_LAG + 1)}
+
+
+def question_context(df: pd.DataFrame, question: str):
+    """Nedensellik sorularına baskın faktörler ve gecikmeli (uzun dönem) etkiler."""
+    lowered = question.lower()
+    if not any(word in lowered for word in REGRESSION_WORDS):
+        return None
+    try:
+        current = fixed_effects(df, 0)
+        lagged = fixed_effects(df, MAX_LAG)
+    except RegressionError:
+        return None
+
+    table = current.table()
+    table = table.reindex(table['standardized'].abs().sort_values(ascending=False).index)
+    lines = [f"- Ülke ve yıl sabit etkili panel regresyonu (ülke içi değişim; {current.n_obs} gözlem, "
+             f"{current.n_countries} ülke, within R²={current.r2_within:.2f}, ülke kümeli SE). "
+             f"Standartlaştırılmış katsayıya göre baskın faktörler:"]
+    for row in table.itertuples():
+        unit = "log birim" if row.factor in LOG_METRICS else "birim"
+        lines.append(f"  {row.factor}: {unit} başına {row.coef:+.4g} (SE {row.std_error:.3g}, {p_text(row.p_value)}), "
+                     f"standartlaştırılmış {row.standardized:+.3f}")
+    lines.append(f"- Gecikmeli model (0-{MAX_LAG} yıl gecikme, {lagged.n_obs} gözlem), uzun dönem etkisi "
+                 f"(gecikme katsayıları toplamı):")
+    for row in lagged.long_run().itertuples():
+        lines.append(f"  {row.factor}: {row.effect:+.4g} [{row.ci_low:+.4g}, {row.ci_high:+.4g}] ({p_text(row.p_value)})")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from .dataset import get_dataset
+    from .features import scale_frame
+
+    parser = argparse.ArgumentParser(description="Sabit etkili panel regresyonu.")
+    parser.add_argument("--max-lag", type=int, default=MAX_LAG, help="En büyük gecikme (yıl)")
+    parser.add_argument("--no-time-effects", action="store_true", help="Yıl sabit etkilerini kullanma")
+    parser.add_argument("--scale", type=int, default=1, help="Ülkeleri N kez kopyalayarak ölçek testi yap")
+    args = parser.parse_args(argv)
+
+    df = get_dataset().frame
+    if args.scale > 1:
+        df = scale_frame(df, args.scale)
+    start = time.perf_counter()
+    panel = Panel.from_frame(df)
+    result = fit_panel(panel, max_lag=args.max_lag, time_effects=not args.no_time_effects)
+    elapsed = time.perf_counter() - start
+    with pd.option_context('display.width', 140, 'display.float_format', '{:.4g}'.format):
+        print(result.table().to_string(index=False))
+        if args.max_lag:
+            print("\nUzun dönem etkileri\n" + result.long_run().to_string(index=False))
+    print(f"\n{result.n_obs:,d} gözlem, {result.n_countries} ülke, within R²={result.r2_within:.3f}, "
+          f"{elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
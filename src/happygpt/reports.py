@@ -0,0 +1,241 @@
+"""Ülke ve bölge raporlarının önceden hesaplanıp saklanması.
+
+Her ülke/bölge için deterministik istatistik raporu (ve isteğe bağlı LLM
+yanıtı) üretilir ve veri seti parmak iziyle birlikte diske yazılır. Yenileme
+artımlıdır: yalnızca verisi değişen varlıkların raporu yeniden üretilir.
+
+Kullanım (src/ dizininden):
+    python -m happygpt.reports [--llm] [--workers 4]
+"""
+
+import argparse
+import hashlib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .cache import VersionedStore, frame_fingerprint
+from .charts import extract_chart_specs
+from .countries import build_alias_index, extract_entities, normalize_text
+
+# Rapor sorusu dışında kalan ama anlamı değiştirmeyen kelimeler
+# ("Türkiye'nin mutluluk durumu nasıl?" -> hazır rapor)
+REPORT_WORDS = {
+    "hakkinda", "rapor", "raporu", "analiz", "analizi", "durum", "durumu", "genel", "bakis",
+    "nasil", "ozet", "ozeti", "nedir", "ne", "icin", "bilgi", "ver", "goster", "ulke",
+    "ulkesi", "bolge", "bolgesi", "mutluluk", "mutlulugu", "seviyesi", "skoru", "nin",
+    "in", "un", "nun", "da", "de", "ta", "te", "ki", "mi", "mu", "bana", "hakkindaki",
+}
+
+KEY_FACTORS = {
+    'social_support': 'Sosyal Destek',
+    'freedom_to_make_life_choices': 'Özgürlük',
+    'gdp_per_capita': 'GDP',
+    'life_expectancy': 'Yaşam Beklentisi',
+    'internet_users_percent': 'İnternet Kullanımı',
+}
+
+
+def _hash_frame(frame):
+    return hashlib.sha1(pd.util.hash_pandas_object(frame, index=False).values.tobytes()).hexdigest()[:16]
+
+
+def _slope(years, values):
+    mask = ~np.isnan(values)
+    if mask.sum() < 2:
+        return float("nan")
+    return float(np.polyfit(years[mask], values[mask], 1)[0])
+
+
+def entity_hashes(df):
+    """Her varlığın rapor girdilerinin parmak izi: {(tür, ad): hash}.
+
+    Ülke raporları küresel sıralama ve ortalamaları da içerdiği için bu
+    değerler rapordaki hassasiyetle (2 basamak) parmak izine eklenir; başka bir
+    ülkedeki küçük değişiklik raporu değiştirmiyorsa yeniden üretim yapılmaz.
+    """
+    year_means = df.groupby('year')[['life_ladder', *KEY_FACTORS]].mean().round(2)
+    year_sizes = df.groupby('year').size()
+    region_means = df.groupby(['year', 'regional_indicator'], observed=True)['life_ladder'].mean().round(2)
+    ranks = df.groupby('year')['life_ladder'].rank(method='min', ascending=False)
+
+    hashes = {}
+    for name, rows in df.groupby('country_name', sort=False, observed=True):
+        last = rows['year'].idxmax()
+        year, region = df.at[last, 'year'], df.at[last, 'regional_indicator']
+        context = (ranks[last], year_sizes[year], region_means[(year, region)], tuple(year_means.loc[year, list(KEY_FACTORS)]))
+        hashes[("country", name)] = _hash_frame(rows) + hashlib.sha1(repr(context).encode()).hexdigest()[:8]
+    for name, rows in df.groupby('regional_indicator', sort=False, observed=True):
+        context = year_means.at[rows['year'].max(), 'life_ladder']
+        hashes[("region", name)] = _hash_frame(rows) + hashlib.sha1(repr(context).encode()).hexdigest()[:8]
+    return hashes
+
+
+def country_report(df, name):
+    """Ülke için istatistik raporu (metin, grafik tanımları)."""
+    rows = df[df['country_name'] == name].sort_values('year')
+    last = rows.iloc[-1]
+    year = int(last['year'])
+    cross = df[df['year'] == year]
+    rank = int((cross['life_ladder'] > last['life_ladder']).sum()) + 1
+    region_mean = cross.loc[cross['regional_indicator'] == last['regional_indicator'], 'life_ladder'].mean()
+    first = rows.iloc[0]
+    slope = _slope(rows['year'].to_numpy(float), rows['life_ladder'].to_numpy(float))
+
+    lines = [
+        f"📊 **{name} Mutluluk Raporu ({year})**",
+        f"- Mutluluk skoru: {last['life_ladder']:.2f} (küresel sıralama: {rank}/{len(cross)})",
+        f"- {last['regional_indicator']} bölge ortalaması: {region_mean:.2f}",
+        f"- {int(first['year'])}-{year} değişimi: {last['life_ladder'] - first['life_ladder']:+.2f} "
+        f"(yıllık eğim: {slope:+.3f})",
+        f"- En yüksek: {rows['life_ladder'].max():.2f} ({int(rows.loc[rows['life_ladder'].idxmax(), 'year'])}), "
+        f"en düşük: {rows['life_ladder'].min():.2f} ({int(rows.loc[rows['life_ladder'].idxmin(), 'year'])})",
+        "",
+        "🔍 **Faktörler (küresel ortalamaya göre)**",
+    ]
+    for col, label in KEY_FACTORS.items():
+        if pd.notna(last[col]):
+            lines.append(f"- {label}: {last[col]:.2f} (küresel ort. {cross[col].mean():.2f})")
+    charts = [{"chart_type": "line", "x": "year", "y": "life_ladder", "countries": [name]}]
+    return "\n".join(lines), charts
+
+
+def region_report(df, name):
+    """Bölge için istatistik raporu (metin, grafik tanımları)."""
+    rows = df[df['regional_indicator'] == name]
+    yearly = rows.groupby('year')['life_ladder'].mean()
+    year = int(rows['year'].max())
+    latest = rows[rows['year'] == year].sort_values('life_ladder', ascending=False)
+    slope = _slope(yearly.index.to_numpy(float), yearly.to_numpy(float))
+
+    lines = [
+        f"🌍 **{name} Bölge Raporu ({year})**",
+        f"- Ülke sayısı: {rows['country_name'].nunique()}",
+        f"- Bölge mutluluk ortalaması: {yearly.iloc[-1]:.2f} (küresel: {df.loc[df['year'] == year, 'life_ladder'].mean():.2f})",
+        f"- {int(yearly.index[0])}-{year} değişimi: {yearly.iloc[-1] - yearly.iloc[0]:+.2f} (yıllık eğim: {slope:+.3f})",
+        "- En mutlu ülkeler: " + ", ".join(f"{r.country_name} ({r.life_ladder:.2f})" for r in latest.head(3).itertuples()),
+        "- En mutsuz ülkeler: " + ", ".join(f"{r.country_name} ({r.life_ladder:.2f})" for r in latest.tail(3).itertuples()),
+    ]
+    charts = [{"chart_type": "line", "x": "year", "y": "life_ladder",
+               "countries": latest['country_name'].head(3).tolist()}]
+    return "\n".join(lines), charts
+
+
+def report_question(kind, name):
+    """LLM yolu için standart rapor sorusu."""
+    if kind == "country":
+        return f"{name} ülkesinin mutluluk durumunu ve faktörlerini analiz et"
+    return f"{name} bölgesinin mutluluk durumunu ve ülkelerini analiz et"
+
+
+class ReportStore(VersionedStore):
+    """Veri seti sürümüne bağlı, diskte saklanan hazır rapor deposu."""
+
+    FILE_NAME = "reports.json"
+    THREAD_NAME = "happygpt-report-refresh"
+
+    def __init__(self, path=None):
+        self.entries = {}
+        self._alias_index = []
+        super().__init__(path)
+
+    def _state(self):
+        return {"entries": {f"{kind}:{name}": v for (kind, name), v in self.entries.items()}}
+
+    def _restore(self, data):
+        self.entries = {tuple(k.split(":", 1)): v for k, v in data.get("entries", {}).items()}
+
+    def refresh(self, df, use_llm=False, workers=4):
+        """Değişen varlıkların raporlarını yeniden üret; (güncellenen, değişmeyen, silinen) döndür."""
+        version = frame_fingerprint(df)
+        hashes = entity_hashes(df)
+        with self._lock:
+            stale = [key for key, h in hashes.items()
+                     if self.entries.get(key, {}).get("entity_hash") != h
+                     or (use_llm and "llm_answer" not in self.entries[key])]
+            removed = [key for key in self.entries if key not in hashes]
+
+        valid_countries = df['country_name'].unique().tolist()
+        new_entries = {}
+        for kind, name in stale:
+            report, charts = (country_report if kind == "country" else region_report)(df, name)
+            new_entries[(kind, name)] = {"entity_hash": hashes[(kind, name)], "report": report,
+                                         "charts": charts, "generated_at": time.time()}
+
+        if use_llm and stale:
+            from .agents import MultiAgentSystem
+            from .resilience import DEGRADED_ERRORS
+
+            system = MultiAgentSystem(df)
+
+            def llm_answer(key):
+                # LLM devre dışıysa yer tutucu saklanmaz; llm_answer eksik kalır ve sonraki yenilemede denenir
+                try:
+                    return system.get_answer(report_question(*key), allow_fallback=False)
+                except DEGRADED_ERRORS:
+                    return None
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                answers = pool.map(llm_answer, stale)
+                for key, answer in zip(stale, answers):
+                    if answer is None:
+                        continue
+                    new_entries[key]["llm_answer"] = answer
+                    new_entries[key]["llm_charts"] = extract_chart_specs(answer, valid_countries)
+
+        with self._lock:
+            for key in removed:
+                del self.entries[key]
+            self.entries.update(new_entries)
+            self.dataset_version = version
+            self._alias_index = []
+            self._save()
+        return len(stale), len(hashes) - len(stale), len(removed)
+
+    def get(self, kind, name, df=None):
+        """Varlığın raporunu döndür; depo verilen veri sürümünden eskiyse None."""
+        with self._lock:
+            if df is not None and frame_fingerprint(df) != self.dataset_version:
+                return None
+            return self.entries.get((kind, name))
+
+    def lookup(self, question, df):
+        """Soru tek bir ülke/bölge hakkında genel rapor istiyorsa hazır raporu döndür."""
+        if frame_fingerprint(df) != self.dataset_version:
+            return None
+        with self._lock:
+            if not self._alias_index:
+                self._alias_index = build_alias_index(df['country_name'].unique(), df['regional_indicator'].unique())
+            alias_index = self._alias_index
+        entities = extract_entities(question, alias_index)
+        if len(entities) != 1:
+            return None
+        kind, name, (start, end) = entities[0]
+        tokens = normalize_text(question)
+        rest = tokens[:start] + tokens[end:]
+        if any(token not in REPORT_WORDS for token in rest):
+            return None
+        entry = self.get(kind, name)
+        return dict(entry, kind=kind, name=name) if entry else None
+
+
+def main(argv=None):
+    from .dataset import get_dataset
+
+    parser = argparse.ArgumentParser(description="Ülke ve bölge raporlarını önceden üret.")
+    parser.add_argument("--llm", action="store_true", help="Raporlara LLM yanıtı da ekle")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Eşzamanlı LLM isteği sayısı")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    updated, unchanged, removed = ReportStore().refresh(get_dataset().frame, args.llm, args.workers)
+    print(f"{updated} rapor güncellendi, {unchanged} değişmedi, {removed} silindi "
+          f"({time.perf_counter() - start:.1f}s).", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""Bootstrap güven aralıkları: korelasyonlar, eğimler ve grup ortalamaları.
+
+Panel yapısı nedeniyle aynı ülkenin yılları bağımsız değildir; bu yüzden
+varsayılan olarak ülke kümeli yeniden örnekleme yapılır (bir ülke seçilirse
+tüm yılları birlikte gelir). Her yeniden örnek, satır ağırlıkları (seçilme
+sayısı) olarak ifade edilir; tüm istatistikler ağırlık matrisi ile veri
+matrislerinin çarpımından, yeniden örnekler boyunca vektörel olarak
+hesaplanır. Yeniden örnekler sabit boyutlu parçalara bölünüp süreç havuzunda
+işlenir; her parçanın tohumu SeedSequence ile türetildiğinden sonuç işçi
+sayısından bağımsızdır. Sonuçlar veri sürümü başına önbelleğe alınır.
+
+Kullanım (src/ dizininden):
+    python -m happygpt.resampling [-n 5000] [--workers 4] [--rows]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .schema import FACTORS, MEMBERSHIP_GROUPS, TARGET, p_text
+
+N_RESAMPLES = 2000
+CHUNK_SIZE = 250
+RANDOM_STATE = 42
+
+# Soruda bu kelimeler geçerse agent bağlamına korelasyon/eğim aralıkları eklenir
+STATISTICS_WORDS = ("neden", "etki", "faktör", "korelasyon", "ilişki", "anlamlı", "p-değer", "p değer", "güven aralı")
+
+
+def _inputs(df, factors):
+    """(y, X merkezlenmiş, küme kimlikleri, grup göstergeleri, grup adları)."""
+    factors = [f for f in factors if f in df.columns]
+    y = df[TARGET].to_numpy(dtype='float64')
+    X = df[factors].to_numpy(dtype='float64')
+    # Merkezleme r ve eğimi değiştirmez, kareler toplamındaki sayısal kaybı önler
+    X = X - np.nanmean(X, axis=0)
+    clusters = pd.factorize(df['country_name'])[0]
+
+    regions = df['regional_indicator'].astype(str).to_numpy()
+    labels = sorted(set(regions))
+    columns = [regions == label for label in labels]
+    for column, name in MEMBERSHIP_GROUPS.items():
+        if column in df.columns:
+            labels.append(name)
+            columns.append(df[column].to_numpy() == 1)
+    groups = np.column_stack(columns).astype('float64')
+    return y, X, clusters, groups, labels, factors
+
+
+def resample_weights(rng, clusters, size):
+    """(size × satır) ağırlık matrisi; her satır bir küme bootstrap örneğindeki seçilme sayıları."""
+    n_clusters = int(clusters.max()) + 1
+    draws = rng.integers(0, n_clusters, size=(size, n_clusters))
+    # Satır başına bincount yerine kaydırılmış tek bincount
+    offsets = np.arange(size)[:, None] * n_clusters
+    counts = np.bincount((draws + offsets).ravel(), minlength=size * n_clusters).reshape(size, n_clusters)
+    return counts[:, clusters].astype('float64')
+
+
+def weighted_statistics(weights, y, X, groups):
+    """Ağırlık satırları için (korelasyonlar, eğimler, grup ortalamaları); her biri (örnek × sütun).
+
+    Eksik değerler çift bazında dışlanır. Eğim, TARGET'ın faktöre göre OLS eğimidir.
+    """
+    valid = ~np.isnan(X) & ~np.isnan(y)[:, None]
+    x0 = np.where(valid, X, 0.0)
+    y0 = np.where(valid, y[:, None], 0.0)
+    m = valid.astype('float64')
+
+    sw = weights @ m
+    sx, sy = weights @ x0, weights @ y0
+    sxx, syy, sxy = weights @ (x0 * x0), weights @ (y0 * y0), weights @ (x0 * y0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sy / sw
+        var_x = sxx - sx * sx / sw
+        var_y = syy - sy * sy / sw
+        corr = cov / np.sqrt(var_x * var_y)
+        slope = cov / var_x
+
+        y_valid = ~np.isnan(y)
+        group_y = groups * np.where(y_valid, y, 0.0)[:, None]
+        group_n = groups * y_valid[:, None]
+        means = (weights @ group_y) / (weights @ group_n)  # Örnekte grubu hiç olmayan: NaN
+    return corr, slope, means
+
+
+def _resample_chunk(task):
+    """Bir parça yeniden örneğin istatistikleri (işçi süreçte çalışır)."""
+    y, X, clusters, groups, size, seed = task
+    weights = resample_weights(np.random.default_rng(seed), clusters, size)
+    return weighted_statistics(weights, y, X, groups)
+
+
+def _run(tasks, workers):
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers == 1:
+        return [_resample_chunk(task) for task in tasks]
+    # Streamlit gibi çok thread'li süreçlerde fork yerine spawn daha güvenli
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(_resample_chunk, tasks))
+
+
+def _summarize(names, estimate, draws, level, p_values=False):
+    alpha = (1 - level) / 2 * 100
+    with np.errstate(invalid='ignore'):
+        low, high = np.nanpercentile(draws, [alpha, 100 - alpha], axis=0)
+    result = pd.DataFrame({
+        'name': names,
+        'estimate': estimate,
+        'ci_low': low,
+        'ci_high': high,
+        'std_error': np.nanstd(draws, axis=0, ddof=1),
+    })
+    if p_values:
+        # İki yönlü bootstrap p-değeri: dağılımın sıfırın öbür yanında kalan payı
+        n = np.sum(~np.isnan(draws), axis=0)
+        tail = np.minimum(np.sum(draws <= 0, axis=0), np.sum(draws >= 0, axis=0))
+        result['p_value'] = np.minimum(1.0, 2 * (tail + 1) / (n + 1))
+    return result
+
+
+@memoize(maxsize=8)
+def bootstrap_statistics(df: pd.DataFrame, n_resamples=N_RESAMPLES, level=0.95, cluster=True,
+                         factors=tuple(FACTORS), seed=RANDOM_STATE, workers=None):
+    """Korelasyon, eğim ve grup ortalamaları için bootstrap aralıkları.
+
+    {'correlations', 'slopes', 'group_means'} sözlüğü döner; her biri name,
+    estimate, ci_low, ci_high, std_error (korelasyon ve eğimde p_value) sütunlu.
+    cluster=False ise satırlar bağımsız örneklenir.
+    """
+    y, X, clusters, groups, labels, factors = _inputs(df, factors)
+    if not cluster:
+        clusters = np.arange(len(y))
+
+    seeds = np.random.SeedSequence(seed).spawn(-(-n_resamples // CHUNK_SIZE))
+    sizes = [min(CHUNK_SIZE, n_resamples - i * CHUNK_SIZE) for i in range(len(seeds))]
+    chunks = _run([(y, X, clusters, groups, size, s) for size, s in zip(sizes, seeds)], workers)
+    corr, slope, means = (np.concatenate(parts) for parts in zip(*chunks))
+
+    full_corr, full_slope, full_means = weighted_statistics(np.ones((1, len(y))), y, X, groups)
+    return {
+        'correlations': _summarize(factors, full_corr[0], corr, level, p_values=True),
+        'slopes': _summarize(factors, full_slope[0], slope, level, p_values=True),
+        'group_means': _summarize(labels, full_means[0], means, level),
+    }
+
+
+def factor_interval(df, factor, n_resamples=N_RESAMPLES):
+    """Tek faktörün korelasyon ve eğim satırları: (korelasyon, eğim) ya da faktör yoksa None."""
+    factors = tuple(FACTORS) if factor in FACTORS else (*FACTORS, factor)
+    result = bootstrap_statistics(df, n_resamples, factors=factors)
+    corr = result['correlations'].set_index('name')
+    if factor not in corr.index:
+        return None
+    return corr.loc[factor], result['slopes'].set_index('name').loc[factor]
+
+
+def question_context(df: pd.DataFrame, question: str):
+    """Nedensellik/istatistik sorularına faktör korelasyonları ve eğimlerinin bootstrap aralıkları."""
+    lowered = question.lower()
+    if not any(word in lowered for word in STATISTICS_WORDS):
+        return None
+    result = bootstrap_statistics(df)
+    corr = result['correlations'].set_index('name')
+    slopes = result['slopes'].set_index('name')
+    lines = [f"- Mutluluk (life_ladder) ile faktörler; %95 ülke kümeli bootstrap aralıkları "
+             f"({N_RESAMPLES} yeniden örnek), p-değerleri bootstrap dağılımından:"]
+    for factor in corr['estimate'].abs().sort_values(ascending=False).index:
+        c, s = corr.loc[factor], slopes.loc[factor]
+        lines.append(f"  {factor}: r={c.estimate:+.3f} [{c.ci_low:+.3f}, {c.ci_high:+.3f}] ({p_text(c.p_value)}), "
+                     f"eğim {s.estimate:+.4g} [{s.ci_low:+.4g}, {s.ci_high:+.4g}]")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from .dataset import get_dataset
+
+    parser = argparse.ArgumentParser(description="Bootstrap güven aralıklarını hesapla.")
+    parser.add_argument("-n", "--resamples", type=int, default=N_RESAMPLES, help="Yeniden örnek sayısı")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--rows", action="store_true", help="Ülke kümeleri yerine satırları bağımsız örnekle")
+    parser.add_argument("--seed", type=int, default=RANDOM_STATE)
+    args = parser.parse_args(argv)
+
+    df = get_dataset().frame
+    start = time.perf_counter()
+    result = bootstrap_statistics(df, args.resamples, cluster=not args.rows, seed=args.seed, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    with pd.option_context('display.width', 120, 'display.float_format', '{:.4g}'.format):
+        for name, table in result.items():
+            print(f"\n{name}\n{table.to_string(index=False)}")
+    print(f"\n{args.resamples} yeniden örnek, {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
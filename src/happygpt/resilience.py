@@ -0,0 +1,279 @@
+"""LLM çağrıları için hedge'lenmiş istekler ve devre kesici.
+
+- Hedge: ilk deneme, gözlenen başarılı gecikmelerin yüzdeliğinden (varsayılan
+  p95) türetilen eşikte yanıt vermezse ikinci bir istek gönderilir; önce gelen
+  başarılı yanıt kullanılır. Kaybeden deneme arka planda biter (thread'ler
+  iptal edilemez) ve sonucu yalnızca metriklere yazılır.
+- Çağrı süresi sınırı: kullanıcı hiçbir zaman `timeout` saniyeden fazla
+  beklemez; istemcinin kendi zaman aşımı ve yeniden denemeleri bunun altında
+  kalır.
+- Devre kesici: kayan penceredeki hata oranı eşiği aşınca devre açılır ve
+  çağrılar sağlayıcıya gitmeden `CircuitOpenError` ile reddedilir (agent'lar
+  bu durumda deterministik/önbellekli yola düşer). Bekleme süresinden sonra
+  tek bir deneme çağrısına izin verilir (yarı açık); başarılıysa devre kapanır.
+- Her deneme (sıra, hedge mi, süre, sonuç) metriklere kaydedilir.
+
+Akış (stream) çağrıları hedge'lenmez; devre kesiciden geçer ve sonuçları
+kaydedilir.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+TIMEOUT = 60.0  # saniye; çağrı başına toplam bekleme
+HEDGE_PERCENTILE = 95
+MIN_HEDGE_DELAY = 1.0
+MAX_HEDGE_DELAY = 20.0
+DEFAULT_HEDGE_DELAY = 10.0  # Yeterli gözlem yokken
+MIN_LATENCY_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+FAILURE_THRESHOLD = 0.5
+MIN_CALLS = 10
+WINDOW_SECONDS = 60.0
+COOLDOWN_SECONDS = 30.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Devre açıkken sağlayıcıya istek gönderilmez."""
+
+
+# Sağlayıcıya ulaşılamadığını gösteren hatalar (devre açık, çağrı süresi ya da hız sınırı
+# dolmuş); çağıranlar bunlarda deterministik yanıta düşer ya da işi sonraya bırakır
+DEGRADED_ERRORS = (CircuitOpenError, TimeoutError)
+
+
+class LatencyTracker:
+    """Başarılı çağrı gecikmelerinin kayan penceresi."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q):
+        with self._lock:
+            samples = list(self._samples)
+        return float(np.percentile(samples, q)) if samples else None
+
+    def __len__(self):
+        return len(self._samples)
+
+    def hedge_delay(self, q=HEDGE_PERCENTILE):
+        """Hedge isteği için bekleme süresi (yüzdelik, sınırlar içinde)."""
+        if len(self) < MIN_LATENCY_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return min(max(self.percentile(q), MIN_HEDGE_DELAY), MAX_HEDGE_DELAY)
+
+
+class CircuitBreaker:
+    """Kayan zaman penceresindeki hata oranına göre açılan devre kesici."""
+
+    def __init__(self, threshold=FAILURE_THRESHOLD, min_calls=MIN_CALLS, window=WINDOW_SECONDS,
+                 cooldown=COOLDOWN_SECONDS, clock=time.monotonic):
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self._clock = clock
+        self._outcomes = deque()  # (zaman, başarılı mı)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+            return HALF_OPEN
+        return self._state
+
+    def is_open(self):
+        """İstek şu an reddedilir mi? (Durumu değiştirmez.)"""
+        with self._lock:
+            state = self._current_state()
+            return state == OPEN or (state == HALF_OPEN and self._probing)
+
+    def allow(self):
+        """İsteğe izin ver ya da CircuitOpenError; yarı açıkta yalnızca tek deneme geçer."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._probing:
+                self._state, self._probing = HALF_OPEN, True
+                return
+        raise CircuitOpenError("LLM sağlayıcısı geçici olarak devre dışı (yüksek hata oranı)")
+
+    def record(self, ok):
+        now = self._clock()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                # Deneme çağrısının sonucu devreyi kapatır ya da yeniden açar
+                self._probing = False
+                self._outcomes.clear()
+                if ok:
+                    self._state = CLOSED
+                else:
+                    self._state, self._opened_at = OPEN, now
+                return
+            self._outcomes.append((now, ok))
+            while self._outcomes and now - self._outcomes[0][0] > self.window:
+                self._outcomes.popleft()
+            failures = sum(1 for _, success in self._outcomes if not success)
+            if (self._state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.threshold):
+                self._state, self._opened_at = OPEN, now
+
+    def error_rate(self):
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+
+class ResilientCaller:
+    """Senkron çağrıları hedge, zaman sınırı ve devre kesiciyle saran yürütücü."""
+
+    def __init__(self, timeout=TIMEOUT, hedge=True, breaker=None, latency=None, max_workers=16,
+                 history=1000):
+        self.timeout = timeout
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = latency or LatencyTracker()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="happygpt-llm")
+        self.attempts = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "hedged": 0, "hedge_wins": 0, "failures": 0, "timeouts": 0, "rejected": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _attempt(self, fn, number, hedged):
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            self._record(number, hedged, time.perf_counter() - start, e)
+            raise
+        self._record(number, hedged, time.perf_counter() - start, None)
+        return result
+
+    def _record(self, number, hedged, seconds, error):
+        self.attempts.append({"attempt": number, "hedged": hedged, "latency_s": round(seconds, 4),
+                              "ok": error is None, "error": type(error).__name__ if error else None,
+                              "time": time.time()})
+        self.breaker.record(error is None)
+        if error is None:
+            self.latency.add(seconds)
+
+    def check(self):
+        """Devre açıksa CircuitOpenError (ör. hız sınırı token'ı harcanmadan önce)."""
+        if self.breaker.is_open():
+            self._count("rejected")
+            raise CircuitOpenError("LLM sağlayıcısı geçici olarak devre dışı (yüksek hata oranı)")
+
+    def call(self, fn, hedge_gate=None):
+        """fn()'i çalıştır; gecikirse hedge isteği gönder, ilk başarılı sonucu döndür.
+
+        `hedge_gate()` False döndürürse (ör. hız sınırında token yoksa) hedge isteği atılmaz.
+        """
+        try:
+            self.breaker.allow()
+        except CircuitOpenError:
+            self._count("rejected")
+            raise
+        self._count("calls")
+        deadline = time.monotonic() + self.timeout
+        first = self._pool.submit(self._attempt, fn, 1, False)
+        pending = {first}
+        if self.hedge:
+            done, _ = wait(pending, timeout=min(self.latency.hedge_delay(), self.timeout))
+            if not done and not self.breaker.is_open() and (hedge_gate is None or hedge_gate()):
+                self._count("hedged")
+                pending.add(self._pool.submit(self._attempt, fn, 2, True))
+
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is not first:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        if pending:
+            # Süren denemeler sonradan kendi sonuçlarını da kaydeder; zaman aşımı ayrıca hata sayılır
+            self._count("timeouts")
+            self.breaker.record(False)
+            raise TimeoutError(f"LLM yanıtı {self.timeout:g} saniyede gelmedi")
+        self._count("failures")
+        raise error
+
+    def stream(self, make_stream):
+        """Akış çağrısını devre kesiciden geçir; tamamlanınca ya da hata verince sonucu kaydet."""
+        try:
+            self.breaker.allow()
+        except CircuitOpenError:
+            self._count("rejected")
+            raise
+        self._count("calls")
+        start = time.perf_counter()
+        try:
+            yield from make_stream()
+        except Exception as e:
+            self._count("failures")
+            self._record(1, False, time.perf_counter() - start, e)
+            raise
+        self._record(1, False, time.perf_counter() - start, None)
+
+    def snapshot(self):
+        """Metrik özeti (sayaçlar, gecikme yüzdelikleri, devre durumu)."""
+        with self._lock:
+            counters = dict(self.counters)
+        p50, p95 = self.latency.percentile(50), self.latency.percentile(95)
+        return {
+            **counters,
+            "latency_p50_s": round(p50, 4) if p50 is not None else None,
+            "latency_p95_s": round(p95, 4) if p95 is not None else None,
+            "hedge_delay_s": round(self.latency.hedge_delay(), 4),
+            "error_rate": round(self.breaker.error_rate(), 4),
+            "circuit": self.breaker.state,
+        }
+
+
+_caller = None
+_caller_lock = threading.Lock()
+
+
+def get_caller() -> ResilientCaller:
+    """Süreç genelinde paylaşılan yürütücü (devre durumu ve gecikmeler tüm agent'lar için ortaktır)."""
+    global _caller
+    if _caller is None:
+        with _caller_lock:
+            if _caller is None:
+                _caller = ResilientCaller()
+    return _caller
+
+
+def reset_caller():
+    """Paylaşılan yürütücüyü bırak (ör. testler ya da model değişiminden sonra)."""
+    global _caller
+    with _caller_lock:
+        _caller = None
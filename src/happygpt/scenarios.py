@@ -0,0 +1,227 @@
+"""What-if senaryo simülasyonu.
+
+Veri sürümü başına bir kez `life_ladder` için çok değişkenli doğrusal model
+(GDP log ölçeğinde) kurulur. Katsayıların belirsizliği ülke kümeli
+bootstrap ile tahmin edilir. Senaryolar ("GDP +%10", "sosyal destek
++0.05") tüm ülkelere tek bir matris işlemiyle uygulanır: her senaryo ve
+ülke için faktör değişimi ΔX hesaplanır, mutluluk değişimi ΔX·β ve aralığı
+ΔX·β_bootstrap yüzdelikleridir.
+
+Senaryo yazımı (faktör -> değişim):
+    "+10%"  / "-5%"   oransal değişim
+    "+0.05" / "-2"    mutlak değişim
+    "=0.9"            değeri sabitle
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .schema import LOG_METRICS, MODEL_FACTORS
+
+# Senaryo sonrası değerlerin kırpıldığı geçerli aralıklar
+BOUNDS = {
+    'social_support': (0.0, 1.0),
+    'freedom_to_make_life_choices': (0.0, 1.0),
+    'perceptions_of_corruption': (0.0, 1.0),
+    'internet_users_percent': (0.0, 100.0),
+    'unemployment_rate': (0.0, 100.0),
+    'gdp_per_capita': (1.0, None),
+    'life_expectancy': (0.0, None),
+}
+
+N_BOOTSTRAP = 500
+RANDOM_STATE = 42
+# Bir seferde değerlendirilen senaryo × ülke × bootstrap hücre sayısı üst sınırı
+_CHUNK_CELLS = 4_000_000
+
+_CHANGE_PATTERN = re.compile(r"^\s*(?P<op>[+\-=])?\s*(?P<value>\d+(?:[.,]\d+)?)\s*(?P<pct>%)?\s*$")
+
+# Agent bağlamı: senaryo sorusu kelimeleri ve standart senaryolar
+SCENARIO_WORDS = ("senaryo", "simülasyon", "simulasyon", "olursa", "artarsa", "azalırsa", "ne olur", "what-if")
+STANDARD_SCENARIOS = {
+    "GDP +%10": {'gdp_per_capita': "+10%"},
+    "Sosyal destek +0.05": {'social_support': "+0.05"},
+    "Özgürlük +0.05": {'freedom_to_make_life_choices': "+0.05"},
+    "Yolsuzluk algısı -0.05": {'perceptions_of_corruption': "-0.05"},
+}
+
+
+class ScenarioError(ValueError):
+    """Geçersiz senaryo tanımı."""
+
+
+def parse_change(text):
+    """"+10%" -> ('pct', 10.0), "-0.05" -> ('abs', -0.05), "=0.9" -> ('set', 0.9)."""
+    if isinstance(text, (int, float)):
+        return ('abs', float(text))
+    match = _CHANGE_PATTERN.match(str(text))
+    if not match:
+        raise ScenarioError(f"Geçersiz değişim: {text!r}")
+    value = float(match['value'].replace(',', '.'))
+    op = match['op'] or '+'
+    if op == '=':
+        if match['pct']:
+            raise ScenarioError(f"Sabitleme yüzde olamaz: {text!r}")
+        return ('set', value)
+    value = -value if op == '-' else value
+    return ('pct', value) if match['pct'] else ('abs', value)
+
+
+def _design(values, factors):
+    """Ham faktör değerlerinden model tasarım matrisi (sabit terim + dönüştürülmüş faktörler)."""
+    columns = [np.log(np.clip(values[:, j], 1e-9, None)) if f in LOG_METRICS else values[:, j]
+               for j, f in enumerate(factors)]
+    return np.column_stack([np.ones(len(values)), *columns])
+
+
+class ScenarioModel:
+    """Katsayılar ve bootstrap katsayı örnekleri."""
+
+    def __init__(self, factors, coef, boot_coef, r2, n_obs, n_countries):
+        self.factors = list(factors)
+        self.coef = coef
+        self.boot_coef = boot_coef
+        self.r2 = r2
+        self.n_obs = n_obs
+        self.n_countries = n_countries
+
+    def summary(self, level=0.95):
+        """Faktör başına katsayı ve bootstrap aralığı (GDP için log birim başına)."""
+        alpha = (1 - level) / 2 * 100
+        low, high = np.percentile(self.boot_coef, [alpha, 100 - alpha], axis=0)
+        return pd.DataFrame({
+            'factor': ['intercept', *self.factors],
+            'coef': self.coef,
+            'ci_low': low,
+            'ci_high': high,
+        })
+
+
+@memoize(maxsize=4)
+def fit_model(df: pd.DataFrame, factors=tuple(MODEL_FACTORS), n_boot=N_BOOTSTRAP, seed=RANDOM_STATE) -> ScenarioModel:
+    """Modeli kur; bootstrap ülke kümelidir (ülkenin tüm yılları birlikte örneklenir)."""
+    factors = [f for f in factors if f in df.columns]
+    data = df[['country_name', 'life_ladder', *factors]].dropna()
+    X = _design(data[factors].to_numpy(dtype='float64'), factors)
+    y = data['life_ladder'].to_numpy(dtype='float64')
+    coef, *_ = np.linalg.lstsq(X, y, rcond=None)
+    residuals = y - X @ coef
+    r2 = 1 - residuals @ residuals / ((y - y.mean()) @ (y - y.mean()))
+
+    # Her bootstrap örneği için ülke ağırlıkları (kaç kez seçildiği); tüm örnekler tek seferde çözülür
+    clusters = pd.factorize(data['country_name'])[0]
+    n_clusters = clusters.max() + 1
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, n_clusters, size=(n_boot, n_clusters))
+    cluster_weights = np.apply_along_axis(np.bincount, 1, draws, minlength=n_clusters)
+    row_weights = cluster_weights[:, clusters].astype('float64')
+    xtwx = np.einsum('bn,ni,nj->bij', row_weights, X, X, optimize=True)
+    xtwy = np.einsum('bn,ni,n->bi', row_weights, X, y, optimize=True)
+    # Tekil örneklerde (ör. çok az ülke) küçük bir sırt terimi çözümü kararlı tutar
+    ridge = 1e-9 * np.eye(X.shape[1])
+    boot_coef = np.linalg.solve(xtwx + ridge, xtwy[..., None])[..., 0]
+    return ScenarioModel(factors, coef, boot_coef, float(r2), len(data), int(n_clusters))
+
+
+@memoize(maxsize=16)
+def baseline(df: pd.DataFrame, year=None) -> pd.DataFrame:
+    """Ülke başına başlangıç değerleri: verilen yıl ya da ülkenin son gözlemi."""
+    data = df if year is None else df[df['year'] == int(year)]
+    latest = data.loc[data.groupby('country_name', observed=True)['year'].idxmax()]
+    return latest[['country_name', 'year', 'life_ladder', *MODEL_FACTORS]].dropna().reset_index(drop=True)
+
+
+def _apply(values, factors, changes):
+    """(ülke × faktör) değerlerine senaryoyu uygula; kırpılmış yeni değerler."""
+    new = values.copy()
+    for factor, change in changes.items():
+        if factor not in factors:
+            raise ScenarioError(f"Senaryoda bilinmeyen faktör: {factor}")
+        j = factors.index(factor)
+        kind, amount = parse_change(change)
+        if kind == 'pct':
+            new[:, j] = values[:, j] * (1 + amount / 100)
+        elif kind == 'abs':
+            new[:, j] = values[:, j] + amount
+        else:
+            new[:, j] = amount
+        low, high = BOUNDS.get(factor, (None, None))
+        new[:, j] = np.clip(new[:, j], low, high)
+    return new
+
+
+def simulate(df: pd.DataFrame, scenarios, countries=None, year=None, level=0.95) -> pd.DataFrame:
+    """Senaryoları tüm (ya da seçili) ülkeler için değerlendir.
+
+    scenarios: {ad: {faktör: değişim}} ya da tek bir {faktör: değişim}.
+    Satır başına bir (senaryo, ülke): baseline, predicted, delta, ci_low, ci_high.
+    """
+    if scenarios and all(not isinstance(v, dict) for v in scenarios.values()):
+        scenarios = {"senaryo": scenarios}
+    if not scenarios:
+        raise ScenarioError("En az bir senaryo gerekli")
+    if not all(isinstance(changes, dict) for changes in scenarios.values()):
+        raise ScenarioError("Her senaryo {faktör: değişim} biçiminde olmalı")
+
+    model = fit_model(df)
+    base = baseline(df, year)
+    if countries is not None:
+        base = base[base['country_name'].isin(list(countries))]
+    names = list(scenarios)
+    values = base[model.factors].to_numpy(dtype='float64')
+    X0 = _design(values, model.factors)
+
+    # (senaryo, ülke, terim) boyutlu tasarım farkı; tüm senaryolar tek dizide
+    delta_x = np.stack([_design(_apply(values, model.factors, scenarios[name]), model.factors) - X0
+                        for name in names])
+    delta = delta_x @ model.coef
+
+    alpha = (1 - level) / 2 * 100
+    n_scen, n_countries, _ = delta_x.shape
+    low = np.empty_like(delta)
+    high = np.empty_like(delta)
+    step = max(1, _CHUNK_CELLS // max(1, n_countries * len(model.boot_coef)))
+    for start in range(0, n_scen, step):
+        boot = delta_x[start:start + step] @ model.boot_coef.T  # (senaryo, ülke, bootstrap)
+        low[start:start + step], high[start:start + step] = np.percentile(boot, [alpha, 100 - alpha], axis=2)
+
+    baseline_pred = X0 @ model.coef
+    return pd.DataFrame({
+        'scenario': np.repeat(names, n_countries),
+        'country_name': np.tile(base['country_name'].to_numpy(dtype=object), n_scen),
+        'year': np.tile(base['year'].to_numpy(), n_scen),
+        'life_ladder': np.tile(base['life_ladder'].to_numpy(), n_scen),
+        'baseline': np.tile(baseline_pred, n_scen),
+        'predicted': (baseline_pred + delta).ravel(),
+        'delta': delta.ravel(),
+        'ci_low': low.ravel(),
+        'ci_high': high.ravel(),
+    })
+
+
+def question_context(df: pd.DataFrame, question: str):
+    """Senaryo soruları için model özeti ve bahsedilen ülkeler için standart senaryolar."""
+    lowered = question.lower()
+    if not any(word in lowered for word in SCENARIO_WORDS):
+        return None
+    from .countries import dataset_alias_index, extract_entities
+
+    model = fit_model(df)
+    lines = [f"- Senaryo modeli (doğrusal, R²={model.r2:.2f}, {model.n_obs} gözlem, {model.n_countries} ülke; "
+             f"%95 aralıklar ülke kümeli bootstrap):"]
+    for row in model.summary().itertuples():
+        if row.factor == 'intercept':
+            continue
+        unit = "log birim" if row.factor in LOG_METRICS else "birim"
+        lines.append(f"  {row.factor}: {unit} başına {row.coef:+.3f} [{row.ci_low:+.3f}, {row.ci_high:+.3f}]")
+
+    countries = [name for kind, name, _ in extract_entities(question, dataset_alias_index(df)) if kind == "country"]
+    if countries:
+        result = simulate(df, STANDARD_SCENARIOS, countries=countries)
+        for row in result.itertuples():
+            lines.append(f"- {row.country_name} ({row.year}), {row.scenario}: mutluluk {row.delta:+.3f} "
+                         f"[{row.ci_low:+.3f}, {row.ci_high:+.3f}] -> tahmini {row.life_ladder + row.delta:.2f}")
+    return "\n".join(lines)
@@ -0,0 +1,182 @@
+"""Veri setinin kompakt bellek gösterimi.
+
+Metrikler hassasiyet izin verdiğinde float32, üyelik/aykırı değer bayrakları
+bool (isteğe bağlı tek baytlık bit kümesi), düşük kardinaliteli metinler
+sözlük kodlu kategori olarak tutulur. `expand` CSV'deki tiplere geri döner;
+`verify_roundtrip` bu dönüşümün kayıpsız (float'lar için tolerans içinde)
+olduğunu doğrular.
+
+Analiz modüllerinin paylaştığı metrik tanımları (hedef, faktör listeleri, log
+ölçeğinde kullanılan metrikler, üyelik grupları) da burada tutulur.
+
+Kullanım (src/ dizininden):
+    python -m happygpt.schema [veri.csv]
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Sözlük kodlu (kategori) saklanan metin sütunları
+CATEGORY_COLUMNS = [
+    'country_name', 'regional_indicator', 'country_code', 'continent',
+    'income_level', 'life_expectancy_category', 'internet_usage_category',
+]
+
+# Bit kümesindeki sıraları sabittir (bit 0 = g20_member ...)
+FLAG_COLUMNS = ['g20_member', 'oecd_member', 'brics_member', 'outlier_gdp', 'outlier_life_expectancy']
+
+INTEGER_COLUMNS = {'year': 'int16', 'population_total': 'int64'}
+
+# float32'ye dönüşte izin verilen en büyük göreli hata
+FLOAT32_RTOL = 1e-6
+
+TARGET = 'life_ladder'
+# Panel modellerinde (regresyon, senaryo, projeksiyon) kullanılan, kapsamı geniş faktörler
+MODEL_FACTORS = [
+    'gdp_per_capita', 'social_support', 'life_expectancy', 'freedom_to_make_life_choices',
+    'generosity', 'perceptions_of_corruption', 'internet_users_percent', 'unemployment_rate',
+]
+# İlişki ve benzerlik analizlerindeki faktörler (seyrek sütunlar dahil)
+FACTORS = [*MODEL_FACTORS, 'health_expenditure_per_capita', 'confidence_in_national_government']
+# Sıralama, anomali ve karşılaştırma tablolarındaki metrikler
+METRICS = [TARGET, *MODEL_FACTORS, 'positive_affect', 'negative_affect', 'health_expenditure_per_capita']
+# Sağa çarpık, oransal değişen metrikler: her modülde log ölçeğinde kullanılır
+LOG_METRICS = frozenset({'gdp_per_capita', 'health_expenditure_per_capita'})
+# Üyelik bayrak sütunu -> grup adı
+MEMBERSHIP_GROUPS = {'g20_member': 'G20', 'oecd_member': 'OECD', 'brics_member': 'BRICS'}
+
+
+def p_text(p):
+    """Agent bağlamları için p-değeri metni."""
+    return f"p={p:.3f}" if p >= 0.001 else "p<0.001"
+
+
+def _float32_ok(values):
+    values = values.to_numpy(dtype='float64')
+    return np.allclose(values.astype('float32').astype('float64'), values, rtol=FLOAT32_RTOL, atol=0, equal_nan=True)
+
+
+def compact(df: pd.DataFrame, bitset=False) -> pd.DataFrame:
+    """Kompakt tiplerle yeni DataFrame döndür (girdiyi değiştirmez).
+
+    Özgün tipler `attrs['source_dtypes']` içinde saklanır; bitset=True ise
+    bayrak sütunları tek bir uint8 `flags` sütununda toplanır.
+    """
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        if col in CATEGORY_COLUMNS:
+            out[col] = values.astype('category')
+        elif col in FLAG_COLUMNS:
+            out[col] = values.astype(str).str.lower().isin(['1', 'true', '1.0'])
+        elif col in INTEGER_COLUMNS and values.notna().all():
+            out[col] = values.astype(INTEGER_COLUMNS[col])
+        elif pd.api.types.is_float_dtype(values) and _float32_ok(values):
+            out[col] = values.astype('float32')
+        else:
+            out[col] = values
+    result = pd.DataFrame(out, index=df.index)
+    if bitset:
+        result = pack_flags(result)
+    result.attrs['source_dtypes'] = {col: str(dtype) for col, dtype in df.dtypes.items()}
+    return result
+
+
+def pack_flags(df: pd.DataFrame) -> pd.DataFrame:
+    """Bayrak sütunlarını uint8 `flags` bit kümesine topla."""
+    present = [col for col in FLAG_COLUMNS if col in df.columns]
+    bits = np.zeros(len(df), dtype='uint8')
+    for col in present:
+        bits |= df[col].to_numpy(dtype=bool).astype('uint8') << FLAG_COLUMNS.index(col)
+    return df.drop(columns=present).assign(flags=bits)
+
+
+def unpack_flags(df: pd.DataFrame) -> pd.DataFrame:
+    """`flags` bit kümesini ayrı bool sütunlara aç."""
+    bits = df['flags'].to_numpy()
+    flags = {col: (bits >> i & 1).astype(bool) for i, col in enumerate(FLAG_COLUMNS)}
+    return df.drop(columns='flags').assign(**flags)
+
+
+def expand(df: pd.DataFrame) -> pd.DataFrame:
+    """Kompakt çerçeveyi özgün (CSV) tiplerine ve sütun sırasına geri çevir."""
+    if 'flags' in df.columns:
+        df = unpack_flags(df)
+    source_dtypes = df.attrs.get('source_dtypes', {})
+    out = {}
+    for col, dtype in source_dtypes.items():
+        values = df[col]
+        if col in CATEGORY_COLUMNS:
+            out[col] = values.astype(object)
+        else:
+            out[col] = values.astype(dtype)
+    return pd.DataFrame(out, index=df.index)
+
+
+def verify_roundtrip(original: pd.DataFrame, bitset=False):
+    """compact -> expand dönüşümünü sütun bazında doğrula.
+
+    {'ok': bool, 'columns': {sütun: {'ok', 'max_rel_error'}}} döndürür.
+    """
+    restored = expand(compact(original, bitset=bitset))
+    report = {}
+    for col in original.columns:
+        a, b = original[col], restored[col]
+        if pd.api.types.is_float_dtype(a):
+            x, y = a.to_numpy(dtype='float64'), b.to_numpy(dtype='float64')
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rel = np.where(x != 0, np.abs(x - y) / np.abs(x), np.abs(y))
+            max_rel = float(np.nanmax(rel)) if len(rel) else 0.0
+            ok = bool(a.dtype == b.dtype and max_rel <= FLOAT32_RTOL and (a.isna() == b.isna()).all())
+        else:
+            max_rel = 0.0
+            ok = bool(a.dtype == b.dtype and a.equals(b))
+        report[col] = {"ok": ok, "max_rel_error": max_rel}
+    return {"ok": all(r["ok"] for r in report.values()), "columns": report}
+
+
+def memory_report(original: pd.DataFrame, compacted: pd.DataFrame):
+    """Sütun bazında bellek karşılaştırması (bayt) ve satır başına ayak izi."""
+    before = original.memory_usage(deep=True, index=False)
+    after = compacted.memory_usage(deep=True, index=False)
+    rows = max(len(original), 1)
+    return {
+        "rows": len(original),
+        "before_bytes": int(before.sum()),
+        "after_bytes": int(after.sum()),
+        "bytes_per_row_before": float(before.sum() / rows),
+        "bytes_per_row_after": float(after.sum() / rows),
+        "columns": {col: {"before": int(before.get(col, 0)), "after": int(after.get(col, 0)),
+                          "dtype": str(compacted[col].dtype) if col in compacted else None}
+                    for col in original.columns},
+    }
+
+
+def main(argv=None):
+    from .config import get_data_path
+
+    parser = argparse.ArgumentParser(description="Kompakt şema için bellek raporu ve dönüşüm doğrulaması.")
+    parser.add_argument("path", nargs="?", default=None, help="CSV dosyası (varsayılan: veri seti)")
+    parser.add_argument("--bitset", action="store_true", help="Bayrakları tek baytlık bit kümesinde topla")
+    args = parser.parse_args(argv)
+
+    original = pd.read_csv(args.path or get_data_path())
+    report = memory_report(original, compact(original, bitset=args.bitset))
+    check = verify_roundtrip(original, bitset=args.bitset)
+    for col, info in report["columns"].items():
+        status = "✓" if check["columns"][col]["ok"] else "✗"
+        print(f"{status} {col:36s} {str(original[col].dtype):8s} -> {str(info['dtype']):9s} "
+              f"{info['before']:>9,d} -> {info['after']:>9,d} B")
+    if args.bitset:
+        print(f"  {'flags':36s} {'':8s} -> uint8     {'':>9s} -> {len(original):>9,d} B")
+    print(f"Toplam: {report['before_bytes']:,d} -> {report['after_bytes']:,d} B "
+          f"({report['bytes_per_row_before']:.0f} -> {report['bytes_per_row_after']:.0f} B/satır)")
+    print("Dönüşüm doğrulaması:", "başarılı" if check["ok"] else "BAŞARISIZ")
+    return 0 if check["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
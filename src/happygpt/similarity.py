@@ -0,0 +1,149 @@
+"""Standartlaştırılmış faktör profillerine göre benzer ülkeler (k-NN).
+
+Her ülke, seçilen yıldaki (ya da tüm yılların ortalamasındaki) faktör
+değerlerinden oluşan bir vektörle temsil edilir. Vektörler StandardScaler
+ile ölçeklenir; GDP ve sağlık harcaması çarpık dağıldığı için önce
+logaritmaları alınır. Küçük veri setlerinde sorgu NumPy ile kaba kuvvet,
+büyüklerde scikit-learn BallTree ile yanıtlanır. İndeks veri sürümü ve yıl
+başına bir kez kurulur.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .cache import memoize
+from .countries import dataset_alias_index, extract_entities
+from .panel import get_panel
+from .schema import FACTORS, LOG_METRICS
+
+# Grafiklerde kullanılan kısa Türkçe adlar
+FACTOR_LABELS = {
+    'social_support': 'Sosyal Destek',
+    'freedom_to_make_life_choices': 'Özgürlük',
+    'generosity': 'Cömertlik',
+    'perceptions_of_corruption': 'Yolsuzluk Algısı',
+    'gdp_per_capita': 'GDP (log)',
+    'life_expectancy': 'Yaşam Beklentisi',
+    'internet_users_percent': 'İnternet Kullanımı',
+    'unemployment_rate': 'İşsizlik',
+    'health_expenditure_per_capita': 'Sağlık Harcaması (log)',
+    'confidence_in_national_government': 'Hükümete Güven',
+}
+
+# Bu sayıdan fazla ülkede BallTree kullanılır
+BRUTE_FORCE_LIMIT = 2000
+
+# Soruda bu kelimeler geçerse agent bağlamına benzer ülkeler eklenir
+SIMILARITY_WORDS = ("benzer", "benzeyen", "yakın", "andıran")
+
+
+class SimilarityIndex:
+    """Ülke vektörleri üzerinde en yakın komşu indeksi."""
+
+    def __init__(self, countries, vectors, factors, method="auto"):
+        self.countries = np.asarray(countries, dtype=object)
+        self.vectors = np.ascontiguousarray(vectors, dtype='float64')
+        self.factors = list(factors)
+        self.country_index = {name: i for i, name in enumerate(self.countries)}
+        if method == "auto":
+            method = "ball_tree" if len(self.countries) > BRUTE_FORCE_LIMIT else "brute"
+        self.method = method
+        self._tree = None
+        if method == "ball_tree":
+            from sklearn.neighbors import BallTree
+
+            self._tree = BallTree(self.vectors)
+        self._norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+
+    def __len__(self):
+        return len(self.countries)
+
+    def __contains__(self, country):
+        return country in self.country_index
+
+    def query(self, vector, k=5):
+        """Vektöre en yakın k ülke: (indeksler, uzaklıklar), yakından uzağa."""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.array([], dtype=int), np.array([])
+        vector = np.asarray(vector, dtype='float64')
+        if self._tree is not None:
+            distances, indices = self._tree.query(vector.reshape(1, -1), k=k)
+            return indices[0], distances[0]
+        # |a-b|^2 = |a|^2 - 2ab + |b|^2; önceden hesaplanan normlarla tek matris-vektör çarpımı
+        squared = np.maximum(self._norms - 2 * self.vectors @ vector + vector @ vector, 0)
+        nearest = np.argpartition(squared, k - 1)[:k] if k < len(self) else np.arange(len(self))
+        nearest = nearest[np.argsort(squared[nearest], kind='stable')]
+        return nearest, np.sqrt(squared[nearest])
+
+    def neighbors(self, country, k=5):
+        """Ülkeye en benzer k ülke (kendisi hariç): [(ülke, uzaklık)]."""
+        i = self.country_index[country]
+        indices, distances = self.query(self.vectors[i], k + 1)
+        return [(self.countries[j], float(d)) for j, d in zip(indices, distances) if j != i][:k]
+
+
+def _profiles(df, year, factors):
+    panel = get_panel(df)
+    factors = [f for f in factors if f in panel.metric_index]
+    if year is None:
+        matrix = np.column_stack([panel.country_means(f) for f in factors])
+    else:
+        if int(year) not in panel.year_index:
+            return np.array([], dtype=object), np.empty((0, len(factors))), factors
+        matrix = np.column_stack([panel.cross_section(year, f) for f in factors])
+    for j, name in enumerate(factors):
+        if name in LOG_METRICS:
+            matrix[:, j] = np.log(np.clip(matrix[:, j], 1e-9, None))
+    complete = ~np.isnan(matrix).any(axis=1)
+    return panel.countries[complete], matrix[complete], factors
+
+
+@memoize(maxsize=32)
+def standardized_profiles(df: pd.DataFrame, year=None, factors=tuple(FACTORS)):
+    """(ülkeler, ölçeklenmiş matris, faktörler, ölçekleyici); tüm faktörleri eksiksiz ülkeler dahil edilir."""
+    countries, matrix, factors = _profiles(df, year, factors)
+    scaler = None
+    if len(countries):
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler().fit(matrix)
+        matrix = scaler.transform(matrix)
+    return countries, matrix, factors, scaler
+
+
+@memoize(maxsize=32)
+def build_index(df: pd.DataFrame, year=None, factors=tuple(FACTORS), method="auto") -> SimilarityIndex:
+    """Yıl (None: tüm yılların ortalaması) için indeks."""
+    countries, matrix, factors, _ = standardized_profiles(df, year, factors)
+    return SimilarityIndex(countries, matrix, factors, method)
+
+
+def similar_countries(df: pd.DataFrame, country, k=5, year=None) -> pd.DataFrame:
+    """Ülkeye en benzer k ülke; country_name, distance ve similarity (0-1) sütunları.
+
+    Ülke o yıl için indekste yoksa boş DataFrame döner.
+    """
+    index = build_index(df, year)
+    if country not in index:
+        return pd.DataFrame(columns=['country_name', 'distance', 'similarity'])
+    rows = index.neighbors(country, k)
+    result = pd.DataFrame(rows, columns=['country_name', 'distance'])
+    result['similarity'] = 1 / (1 + result['distance'])
+    return result
+
+
+def question_context(df: pd.DataFrame, question: str, k=5):
+    """Benzerlik soran sorular için agent'lara eklenecek bağlam metni; yoksa None."""
+    lowered = question.lower()
+    if not any(word in lowered for word in SIMILARITY_WORDS):
+        return None
+    countries = [name for kind, name, _ in extract_entities(question, dataset_alias_index(df)) if kind == "country"]
+    lines = []
+    for country in countries:
+        similar = similar_countries(df, country, k)
+        if len(similar):
+            listed = ", ".join(f"{row.country_name} ({row.distance:.2f})" for row in similar.itertuples())
+            lines.append(f"- {country} ile faktör profili en benzer ülkeler (tüm yılların ortalaması, "
+                         f"standartlaştırılmış uzaklık): {listed}")
+    return "\n".join(lines) or None
@@ -0,0 +1,39 @@
+import asyncio
+import json
+
+import pytest
+
+from happygpt.api import HappyAPI
+from happygpt.rankings import rank_index
+
+
+def _get(app, path, query=b""):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": query, "headers": []}
+    asyncio.run(app(scope, receive, send))
+    return sent[0]["status"], json.loads(b"".join(m.get("body", b"") for m in sent[1:]))
+
+
+@pytest.mark.parametrize("path, query", [
+    ("/v1/aggregates/top", b"n=-3"),
+    ("/v1/aggregates/top", b"n=-3&year=2020"),
+    ("/v1/ranks/changes", b"n=-1"),
+    ("/v1/rows", b"offset=-5"),
+    ("/v1/rows", b"limit=-1"),
+])
+def test_negative_counts_rejected(path, query):
+    status, payload = _get(HappyAPI(), path, query)
+    assert status == 400
+    assert "negatif" in payload["error"]
+
+
+def test_rank_top_clamps_negative_k():
+    index = rank_index(HappyAPI().df)
+    assert index.top('life_ladder', 2020, k=-3).empty
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from happygpt import breaks, clustering
+from happygpt.cache import VersionedStore, frame_fingerprint
+
+
+class _CounterStore(VersionedStore):
+    FILE_NAME = "counter.json"
+
+    def __init__(self, path=None):
+        self.count = 0
+        super().__init__(path)
+
+    def _state(self):
+        return {"count": self.count}
+
+    def _restore(self, data):
+        self.count = data.get("count", 0)
+
+    def refresh(self, df, step=1):
+        with self._lock:
+            self.count += step
+            self.dataset_version = frame_fingerprint(df)
+            self._save()
+        return self.count
+
+
+def test_versioned_store_round_trip(tmp_path):
+    df = pd.DataFrame({'x': [1, 2, 3]})
+    store = _CounterStore(tmp_path / "counter.json")
+    assert not store.ready(df)
+    store.ensure(df, 5).join()
+    assert store.ready(df) and store.ensure(df) is None
+
+    reloaded = _CounterStore(tmp_path / "counter.json")
+    assert reloaded.count == 5 and reloaded.ready(df)
+    assert not reloaded.ready(pd.DataFrame({'x': [1, 2, 4]}))
+
+
+def test_question_context_starts_refresh(monkeypatch):
+    df = pd.DataFrame({'country_name': ['Turkey'], 'year': [2020]})
+    for module, question in ((clustering, "Türkiye hangi kümede?"), (breaks, "Türkiye'de kırılma var mı?")):
+        started = []
+        store = module.get_store()
+        monkeypatch.setattr(store, "ready", lambda df=None: False)
+        monkeypatch.setattr(store, "ensure", lambda df, *args: started.append(df))
+        assert module.question_context(df, question) is None
+        assert len(started) == 1 and started[0] is df
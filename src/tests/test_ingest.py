@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from happygpt.data import load_dataset
+from happygpt.ingest import ingest
+
+
+def _source(path, rows=120):
+    df = pd.DataFrame({
+        'country_code': [f"C{i % 30:02d}" for i in range(rows)],
+        'country_name': [f"Country {i % 30}" for i in range(rows)],
+        'year': [2000 + i // 30 for i in range(rows)],
+        'perceptions_of_corruption': [0.5] * rows,
+        'note': [None] * rows,
+    })
+    # Seyrek metin sütunu: ilk parçada tamamen boş
+    df.loc[df.index[60::7], 'note'] = 'x'
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_sparse_text_column_is_widened(tmp_path):
+    source = _source(tmp_path / "source.csv")
+    manifest = ingest([tmp_path / "source.csv"], tmp_path / "out", chunksize=40, partitions=4, workers=1)
+    result = load_dataset(tmp_path / "out")
+    assert manifest["rows"] == len(source) == len(result)
+    assert sorted(result['note'].dropna().unique()) == ['x']
+    assert result['note'].notna().sum() == source['note'].notna().sum()
+
+
+def test_refuses_to_replace_foreign_directory(tmp_path):
+    _source(tmp_path / "source.csv")
+    foreign = tmp_path / "data"
+    foreign.mkdir()
+    (foreign / "cleaned_dataset.csv").write_text("keep")
+    with pytest.raises(ValueError):
+        ingest([tmp_path / "source.csv"], foreign, workers=1)
+    assert (foreign / "cleaned_dataset.csv").read_text() == "keep"
+
+    # Önceki ingest çıktısının yerine yazılabilir
+    ingest([tmp_path / "source.csv"], tmp_path / "out", workers=1)
+    ingest([tmp_path / "source.csv"], tmp_path / "out", workers=1)
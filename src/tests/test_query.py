@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from happygpt.query import QueryEngine, QueryError, extract_sql, normalize_sql
+
+
+@pytest.fixture
+def engine():
+    df = pd.DataFrame({
+        'country_name': ['Turkiye', 'Turkiye', 'Germany', 'Germany'],
+        'year': [2020, 2021, 2020, 2021],
+        'life_ladder': [4.9, 4.7, 7.3, 7.1],
+        'regional_indicator': ['Middle East', 'Middle East', 'Western Europe', 'Western Europe'],
+    })
+    return QueryEngine(df)
+
+
+def test_extract_sql_strips_line_comments():
+    text = "SELECT year, -- yil\n AVG(life_ladder)\nFROM happiness GROUP BY year"
+    assert extract_sql(text) == "SELECT year, AVG(life_ladder) FROM happiness GROUP BY year"
+
+
+def test_normalize_sql_keeps_comment_markers_in_literals():
+    sql = "```sql\nSELECT '--x' AS a, /* blok\n yorum */ 1 AS b -- son\n```"
+    assert extract_sql(sql) == "SELECT '--x' AS a, 1 AS b"
+    assert normalize_sql("SELECT 1; -- son") == "SELECT 1"
+
+
+def test_commented_query_runs(engine):
+    sql = extract_sql("SELECT year, -- yil\n AVG(life_ladder) AS mean\nFROM happiness GROUP BY year ORDER BY year")
+    frame, truncated = engine.run(sql)
+    assert list(frame['year']) == [2020, 2021]
+    assert not truncated
+
+
+def test_negative_limit_rejected(engine):
+    with pytest.raises(QueryError):
+        engine.run("SELECT * FROM happiness", limit=-1)